@@ -0,0 +1,66 @@
+import hashlib
+import pickle
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from rest_framework.authentication import TokenAuthentication
+from invalidation.bus import LocalCache, bump
+from monitoring.metrics import CACHE_LOOKUPS
+
+TOKEN_KEY = 'auth-token:{digest}'
+
+_local_tokens = LocalCache(
+    'tokens',
+    size=settings.TOKEN_LOCAL_CACHE_SIZE,
+    timeout=settings.TOKEN_LOCAL_CACHE_TIMEOUT,
+)
+
+
+def get_cache_key(key):
+    # В ключ кеша попадает хеш, а не сам токен.
+    digest = hashlib.sha1(key.encode()).hexdigest()
+    return TOKEN_KEY.format(digest=digest)
+
+
+def invalidate_token(key):
+    cache_key = get_cache_key(key)
+    _local_tokens.delete(cache_key)
+    # До коммита другой запрос ещё прочитает токен из базы и вернёт
+    # его в общий кеш, поэтому удаляем после коммита.
+    transaction.on_commit(lambda: cache.delete(cache_key))
+    bump('tokens')
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """TokenAuthentication без запроса к базе на каждый запрос.
+
+    Пара (пользователь, токен) хранится в памяти процесса и в общем
+    кеше Django. При выходе, смене пароля и блокировке пользователя
+    общий кеш сбрасывается после коммита, локальные во всех воркерах —
+    через шину инвалидации. В памяти процесса пара лежит упакованной:
+    каждый запрос получает свою копию пользователя, а не общий на все
+    потоки объект.
+    """
+
+    def authenticate_credentials(self, key):
+        cache_key = get_cache_key(key)
+        state = _local_tokens.get_state()
+        packed = _local_tokens.get(cache_key)
+        if packed is not None:
+            CACHE_LOOKUPS.labels('token', 'local').inc()
+            return pickle.loads(packed)
+        credentials = cache.get(cache_key)
+        if credentials is not None:
+            CACHE_LOOKUPS.labels('token', 'shared').inc()
+        else:
+            CACHE_LOOKUPS.labels('token', 'miss').inc()
+            credentials = super().authenticate_credentials(key)
+            cache.set(
+                cache_key, credentials, settings.TOKEN_CACHE_TIMEOUT
+            )
+        _local_tokens.set(
+            cache_key, pickle.dumps(credentials, pickle.HIGHEST_PROTOCOL),
+            state,
+        )
+        return credentials
@@ -0,0 +1,117 @@
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from invalidation.bus import LocalCache, bump
+from monitoring.metrics import CACHE_LOOKUPS
+
+# Версия меняется вместе с составом фрагмента, чтобы не читать старые.
+FRAGMENT_VERSION = 3
+FRAGMENT_KEY = 'recipe-fragment:{version}:{generation}:{pk}:{revision}'
+GENERATION_KEY = 'recipe-fragment-generation'
+# Ревизия рецепта меняется после коммита его изменения. Фрагмент, который
+# запрос, начатый до коммита, положит в кеш позже, лежит под старой
+# ревизией и больше не читается.
+REVISION_KEY = 'recipe-fragment-revision:{pk}'
+
+# Память процесса перед общим кешем, сбрасывается шиной инвалидации.
+_local_fragments = LocalCache('recipes', size=settings.RECIPE_LOCAL_CACHE_SIZE)
+
+
+def get_generation():
+    return cache.get_or_set(GENERATION_KEY, 1, None)
+
+
+def new_revision():
+    # Случайная, а не счётчик: после вытеснения ключа ревизия не
+    # совпадёт с прежней.
+    return uuid.uuid4().hex
+
+
+def get_revisions(pks):
+    keys = {pk: REVISION_KEY.format(pk=pk) for pk in pks}
+    revisions = cache.get_many(keys.values())
+    for key in keys.values():
+        if key not in revisions:
+            revision = new_revision()
+            if not cache.add(key, revision, None):
+                revision = cache.get(key, revision)
+            revisions[key] = revision
+    return {pk: revisions[key] for pk, key in keys.items()}
+
+
+def get_keys(pks):
+    generation = get_generation()
+    return {
+        pk: FRAGMENT_KEY.format(
+            version=FRAGMENT_VERSION,
+            generation=generation,
+            pk=pk,
+            revision=revision,
+        )
+        for pk, revision in get_revisions(pks).items()
+    }
+
+
+def get_recipe_fragments(pks, build):
+    """Готовые представления рецептов без полей, зависящих от пользователя.
+
+    Отсутствующие в кеше фрагменты строятся одним вызовом build(pks),
+    который возвращает словарь {pk: fragment}.
+    """
+    state = _local_fragments.get_state()
+    fragments = _local_fragments.get_many(pks)
+    CACHE_LOOKUPS.labels('recipe', 'local').inc(len(fragments))
+    pks = [pk for pk in pks if pk not in fragments]
+    if not pks:
+        return fragments
+    # Ключи читаются до базы: построенное позже попадёт под ревизию,
+    # которая была до коммита, если коммит случится между ними.
+    keys = get_keys(pks)
+    cached = cache.get_many(keys.values())
+    shared = {pk: cached[key] for pk, key in keys.items() if key in cached}
+    missing = [pk for pk in pks if pk not in shared]
+    CACHE_LOOKUPS.labels('recipe', 'hit').inc(len(shared))
+    CACHE_LOOKUPS.labels('recipe', 'miss').inc(len(missing))
+    if missing:
+        built = build(missing)
+        cache.set_many(
+            {keys[pk]: fragment for pk, fragment in built.items()},
+            settings.RECIPE_CACHE_TIMEOUT,
+        )
+        shared.update(built)
+    _local_fragments.set_many(shared, state)
+    fragments.update(shared)
+    return fragments
+
+
+def invalidate_recipes(pks):
+    """Меняет ревизии рецептов после коммита.
+
+    Список pk вычисляется сразу: после коммита связей может уже не быть.
+    До коммита параллельный запрос положил бы в кеш старую строку.
+    """
+    pks = list(pks)
+    if not pks:
+        return
+
+    def change_revisions():
+        cache.set_many(
+            {REVISION_KEY.format(pk=pk): new_revision() for pk in pks}, None
+        )
+
+    transaction.on_commit(change_revisions)
+    bump('recipes')
+
+
+def _next_generation():
+    try:
+        cache.incr(GENERATION_KEY)
+    except ValueError:
+        cache.set(GENERATION_KEY, 1, None)
+
+
+def invalidate_all_recipes():
+    transaction.on_commit(_next_generation)
+    bump('recipes')
@@ -1,6 +1,13 @@
+from django.db.models import Exists, F, OuterRef
 from django_filters import rest_framework
 from rest_framework import filters
-from recipes.models import Cart, Favorite, Recipe, Tag
+from recipes.models import Cart, Favorite, Recipe, RecipeTag, Tag
+from recipes.tags import get_mask
+
+TAGS_MODE_CHOICES = (
+    ('any', 'Любой из тегов'),
+    ('all', 'Все теги'),
+)
 
 
 class IngredientSearchFilter(filters.SearchFilter):
@@ -16,12 +23,59 @@ class RecipeFilter(rest_framework.FilterSet):
         method='filter_shopping_cart',
         label='Корзина'
     )
+    min_calories = rest_framework.NumberFilter(
+        field_name='calories', lookup_expr='gte', label='Калорий от'
+    )
+    max_calories = rest_framework.NumberFilter(
+        field_name='calories', lookup_expr='lte', label='Калорий до'
+    )
+    max_cost = rest_framework.NumberFilter(
+        field_name='cost', lookup_expr='lte', label='Стоимость до'
+    )
     tags = rest_framework.ModelMultipleChoiceFilter(
         field_name='tags__slug',
         to_field_name='slug',
         queryset=Tag.objects.all(),
+        method='filter_tags',
         label='Теги',
     )
+    tags_mode = rest_framework.ChoiceFilter(
+        choices=TAGS_MODE_CHOICES,
+        method='filter_tags_mode',
+        label='Режим тегов',
+    )
+
+    def filter_tags(self, queryset, name, value):
+        # Одно условие по маске рецепта вместо JOIN с тегами и DISTINCT.
+        if not value:
+            return queryset
+        match_all = self.form.cleaned_data.get('tags_mode') == 'all'
+        if any(tag.bit is None for tag in value):
+            return self.filter_tags_by_links(queryset, value, match_all)
+        mask = get_mask(value)
+        queryset = queryset.annotate(tags_match=F('tags_mask').bitand(mask))
+        if match_all:
+            return queryset.filter(tags_match=mask)
+        return queryset.filter(tags_match__gt=0)
+
+    def filter_tags_by_links(self, queryset, tags, match_all):
+        # Тега без бита (сверх 63 или из bulk_create) нет в масках:
+        # проверяем связи с тегами подзапросами EXISTS.
+        links = RecipeTag.objects.filter(recipes=OuterRef('pk'))
+        if not match_all:
+            return queryset.annotate(
+                has_tags=Exists(links.filter(tags__in=tags))
+            ).filter(has_tags=True)
+        for number, tag in enumerate(tags):
+            field = f'has_tag_{number}'
+            queryset = queryset.annotate(
+                **{field: Exists(links.filter(tags=tag))}
+            ).filter(**{field: True})
+        return queryset
+
+    def filter_tags_mode(self, queryset, name, value):
+        # Учитывается в filter_tags.
+        return queryset
 
     def filter_favorited(self, queryset, name, value):
         user = self.request.user
@@ -41,4 +95,13 @@ class RecipeFilter(rest_framework.FilterSet):
 
     class Meta:
         model = Recipe
-        fields = ('is_favorited', 'is_in_shopping_cart', 'tags', 'author')
+        fields = (
+            'is_favorited',
+            'is_in_shopping_cart',
+            'tags',
+            'tags_mode',
+            'author',
+            'min_calories',
+            'max_calories',
+            'max_cost',
+        )
@@ -0,0 +1,39 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.hashers import get_hashers, make_password
+from django.core.management import BaseCommand
+
+
+class Command(BaseCommand):
+    help = "Measures password hashing cost and registrations per second"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--count', type=int, default=50,
+                            help='Passwords to hash in the throughput run')
+        parser.add_argument('--threads', type=int, default=8,
+                            help='Concurrent request threads')
+
+    def handle(self, *args, **options):
+        self.stdout.write(f'{"hasher":<32}{"ms per hash":>12}')
+        for hasher in get_hashers():
+            started = time.perf_counter()
+            hasher.encode('benchmark-password', hasher.salt())
+            elapsed = time.perf_counter() - started
+            self.stdout.write(
+                f'{hasher.__class__.__name__:<32}{elapsed * 1000:>12.1f}'
+            )
+        # Регистрация упирается в make_password: столько паролей в секунду
+        # процесс хеширует при PASSWORD_HASHING_THREADS потоках пула.
+        count = options['count']
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options['threads']) as pool:
+            passwords = (f'password-{number}' for number in range(count))
+            list(pool.map(make_password, passwords))
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            f'{count} registrations, {options["threads"]} threads, '
+            f'{settings.PASSWORD_HASHING_THREADS} hashing threads: '
+            f'{count / elapsed:.1f} per second'
+        )
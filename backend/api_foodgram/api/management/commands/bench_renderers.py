@@ -0,0 +1,59 @@
+import gzip
+import time
+
+from django.core.management import BaseCommand
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from api.renderers import MessagePackRenderer, ORJSONRenderer
+from api.serializers import GetRecipeSerializer, IngredientSerializer
+from recipes.models import Ingredient, Recipe
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+class Command(BaseCommand):
+    help = "Compares payload size and render time of the API renderers"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument('--recipes', type=int, default=100)
+
+    def get_payloads(self, recipes_count):
+        request = Request(APIRequestFactory().get('/'))
+        return {
+            'ingredients': IngredientSerializer(
+                Ingredient.objects.all(), many=True
+            ).data,
+            'recipes': GetRecipeSerializer(
+                Recipe.objects.all()[:recipes_count],
+                many=True,
+                context={'request': request},
+            ).data,
+        }
+
+    def handle(self, *args, **options):
+        renderers = (JSONRenderer(), ORJSONRenderer(), MessagePackRenderer())
+        payloads = self.get_payloads(options['recipes'])
+        self.stdout.write(
+            f'{"payload":<12}{"renderer":<22}{"ms":>8}'
+            f'{"bytes":>10}{"gzip":>10}{"br":>10}'
+        )
+        for name, data in payloads.items():
+            for renderer in renderers:
+                started = time.perf_counter()
+                for _ in range(options['repeat']):
+                    body = renderer.render(data)
+                elapsed = (time.perf_counter() - started) / options['repeat']
+                gzipped = len(gzip.compress(body, compresslevel=6))
+                brotlied = 0
+                if brotli is not None:
+                    brotlied = len(brotli.compress(body, quality=5))
+                self.stdout.write(
+                    f'{name:<12}{renderer.__class__.__name__:<22}'
+                    f'{elapsed * 1000:>8.2f}{len(body):>10}'
+                    f'{gzipped:>10}{brotlied:>10}'
+                )
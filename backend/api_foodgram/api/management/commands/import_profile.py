@@ -0,0 +1,67 @@
+import os
+import re
+import subprocess
+import sys
+from collections import Counter
+
+from django.core.management import BaseCommand, CommandError
+
+IMPORT_TIME = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)$')
+# То, что делает воркер gunicorn до первого ответа: приложение и URL.
+WORKER_STARTUP = (
+    'import api_foodgram.wsgi; '
+    'from django.urls import get_resolver; '
+    'get_resolver().url_patterns'
+)
+
+
+class Command(BaseCommand):
+    help = "Reports import time of a worker startup by package (-X importtime)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top', type=int, default=20)
+        parser.add_argument('--code', default=WORKER_STARTUP,
+                            help='Python code to profile')
+
+    def run_profiled(self, code):
+        env = dict(
+            os.environ,
+            DJANGO_SETTINGS_MODULE=os.environ.get(
+                'DJANGO_SETTINGS_MODULE', 'api_foodgram.settings'
+            ),
+        )
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', code],
+            env=env,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+            universal_newlines=True,
+        )
+        if result.returncode:
+            raise CommandError(result.stderr[-2000:])
+        return [
+            match.groups()
+            for match in map(IMPORT_TIME.match, result.stderr.splitlines())
+            if match
+        ]
+
+    def handle(self, *args, **options):
+        rows = self.run_profiled(options['code'])
+        packages = Counter()
+        modules = Counter()
+        for own, cumulative, _, name in rows:
+            packages[name.split('.')[0]] += int(own)
+            modules[name] = int(cumulative)
+        total = sum(packages.values())
+        self.stdout.write(
+            f'Total import time: {total / 1000:.1f} ms, '
+            f'{len(rows)} modules'
+        )
+        self.stdout.write(f'\n{"package":<40}{"self ms":>10}{"%":>7}')
+        for package, own in packages.most_common(options['top']):
+            self.stdout.write(
+                f'{package:<40}{own / 1000:>10.1f}{own / total:>7.1%}'
+            )
+        self.stdout.write(f'\n{"module":<40}{"cumulative ms":>17}')
+        for name, cumulative in modules.most_common(options['top']):
+            self.stdout.write(f'{name:<40}{cumulative / 1000:>17.1f}')
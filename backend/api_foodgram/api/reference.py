@@ -0,0 +1,47 @@
+from django.conf import settings
+from invalidation.bus import LocalCache, bump
+from monitoring.metrics import CACHE_LOOKUPS
+from recipes.models import Ingredient, Tag
+
+from .serializers import IngredientSerializer, TagSerializer
+
+LOADERS = {
+    'tags': lambda: TagSerializer(Tag.objects.all(), many=True).data,
+    'ingredients': lambda: IngredientSerializer(
+        Ingredient.objects.all(), many=True
+    ).data,
+}
+
+# Справочники целиком в памяти процесса, по кешу на справочник.
+_references = {
+    name: LocalCache(name, size=1, timeout=settings.REFERENCE_CACHE_TIMEOUT)
+    for name in LOADERS
+}
+
+
+def get_reference(name):
+    """Сериализованный справочник из памяти процесса.
+
+    Изменение справочника сбрасывает его во всех воркерах через
+    шину инвалидации.
+    """
+    cache = _references[name]
+    state = cache.get_state()
+    data = cache.get(name)
+    if data is not None:
+        CACHE_LOOKUPS.labels(name, 'hit').inc()
+        return data
+    CACHE_LOOKUPS.labels(name, 'miss').inc()
+    data = [dict(item) for item in LOADERS[name]()]
+    cache.set(name, data, state)
+    return data
+
+
+def invalidate_reference(name):
+    bump(name)
+
+
+def warm_up():
+    """Загружает справочники до fork, чтобы воркеры делили эти страницы."""
+    for name in LOADERS:
+        get_reference(name)
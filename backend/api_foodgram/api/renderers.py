@@ -0,0 +1,56 @@
+import msgpack
+import orjson
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+
+class ORJSONRenderer(JSONRenderer):
+    """JSONRenderer на orjson.
+
+    Типы, которых orjson не знает (ленивые строки, QuerySet), кодирует
+    стандартный кодировщик DRF. Запрос с отступами отдаётся как раньше.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        renderer_context = renderer_context or {}
+        if self.get_indent(accepted_media_type, renderer_context):
+            return super().render(
+                data, accepted_media_type, renderer_context
+            )
+        # Ошибки ListField приходят с ключами-индексами: {'recipes': {0: ...}}.
+        return orjson.dumps(
+            data,
+            default=JSONEncoder().default,
+            option=orjson.OPT_NON_STR_KEYS,
+        )
+
+
+def str_keys(data):
+    """Приводит ключи словарей к строкам, как это делает JSON."""
+    if isinstance(data, dict):
+        return {
+            key if isinstance(key, str) else str(key): str_keys(value)
+            for key, value in data.items()
+        }
+    if isinstance(data, (list, tuple)):
+        return [str_keys(item) for item in data]
+    return data
+
+
+class MessagePackRenderer(BaseRenderer):
+    """Ключи-числа msgpack упаковал бы как есть, но msgpack.unpackb
+    по умолчанию (strict_map_key=True) такие карты не читает."""
+
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return msgpack.packb(
+            str_keys(data), default=JSONEncoder().default, use_bin_type=True
+        )
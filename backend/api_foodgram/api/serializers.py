@@ -1,17 +1,38 @@
 import base64
+import re
+from datetime import timedelta
 
+from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.core.files.base import ContentFile
 from django.core.validators import MinValueValidator
 from django.contrib.auth.hashers import make_password
+from django.db.models import (ExpressionWrapper, F, FloatField, Manager,
+                              Prefetch, Value)
+from django.utils import timezone
+from api_foodgram.db_router import PRIMARY_DB
 from rest_framework import serializers
 from rest_framework.validators import UniqueValidator
-from recipes.models import (Cart, Favorite, Ingredient, Recipe,
+from jobs.models import Job
+from outbox.events import record_bulk
+from recipes.meal_plan import rebuild_plans_for_recipes
+from recipes.models import (AuthorStats, Cart, Favorite, ImageUpload,
+                            Ingredient, MealPlan, MealPlanEntry, Recipe,
                             RecipeIngredient, RecipeTag, Subscription, Tag)
+from recipes.nutrition import update_nutrition
+from recipes.tags import get_mask
+from recipes.utils import get_scale
 from users.models import CustomUser
 
+from .cache import get_recipe_fragments
+
 User = get_user_model()
 
+MAX_SERVINGS = 100
+# Рецептов в одном пакетном запросе к корзине и избранному.
+BULK_RECIPES_LIMIT = 500
+UPLOAD_TOKEN = re.compile(r'[0-9a-f]{32}')
+
 
 class CustomUserSerializer(serializers.ModelSerializer):
     is_subscribed = serializers.SerializerMethodField()
@@ -79,15 +100,159 @@ class CreateRecipeIngredientSerializer(serializers.Serializer):
 
 
 class Base64ImageField(serializers.ImageField):
+    """Картинка в base64 или токен заранее загруженного файла.
+
+    По токену возвращается имя уже сохранённого файла: он не читается
+    и не копируется.
+    """
+
     def to_internal_value(self, data):
+        if isinstance(data, str) and UPLOAD_TOKEN.fullmatch(data):
+            return self.get_upload(data)
         if isinstance(data, str) and data.startswith('data:image'):
             format, imgstr = data.split(';base64,')
             ext = format.split('/')[-1]
             data = ContentFile(base64.b64decode(imgstr), name='temp.' + ext)
         return super().to_internal_value(data)
 
+    def get_upload(self, token):
+        request = self.context.get('request')
+        expired = timezone.now() - timedelta(
+            seconds=settings.IMAGE_UPLOAD_TTL
+        )
+        # Строка заблокирована до конца транзакции запроса: очистка
+        # prune_image_uploads не удалит файл, пока он переходит рецепту.
+        name = ImageUpload.objects.select_for_update().filter(
+            token=token, user=request.user.id, created__gte=expired
+        ).values_list('image', flat=True).first()
+        if name is None:
+            raise serializers.ValidationError(
+                'Загрузка не найдена или устарела'
+            )
+        return name
+
+
+def consume_upload(image):
+    """Загрузка использована рецептом, файл остаётся за рецептом.
+
+    Параллельный запрос с тем же токеном ничего не удалит и откатится.
+    """
+    if isinstance(image, str):
+        deleted, _ = ImageUpload.objects.filter(image=image).delete()
+        if not deleted:
+            raise serializers.ValidationError(
+                {'image': 'Загрузка уже использована'}
+            )
+
+
+class ImageUploadSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ImageUpload
+        fields = ('token', 'image')
+        read_only_fields = ('token',)
+
+    def validate_image(self, image):
+        if image.size > settings.MAX_IMAGE_UPLOAD_SIZE:
+            raise serializers.ValidationError(
+                f'Размер файла больше '
+                f'{settings.MAX_IMAGE_UPLOAD_SIZE // 2 ** 20} МБ'
+            )
+        return image
+
+
+class ServingsSerializer(serializers.Serializer):
+    servings = serializers.IntegerField(
+        min_value=1, max_value=MAX_SERVINGS, required=False
+    )
+
+
+def round_amount(amount):
+    amount = round(amount, 2)
+    return int(amount) if amount == int(amount) else amount
+
+
+def get_scaled_ingredients(pks, servings):
+    """Количества ингредиентов на servings порций, посчитанные в запросе.
+
+    Читаются с той же базы, что и фрагменты в build_recipe_fragments.
+    """
+    rows = (
+        RecipeIngredient.objects.using(PRIMARY_DB).filter(recipes__in=pks)
+        .annotate(scaled=ExpressionWrapper(
+            F('amount') * get_scale(Value(servings)),
+            output_field=FloatField(),
+        ))
+        .values_list('recipes', 'ingredients', 'scaled')
+    )
+    scaled = {}
+    for recipe, ingredient, amount in rows:
+        scaled.setdefault(recipe, {})[ingredient] = round_amount(amount)
+    return scaled
+
+
+def build_recipe_fragments(pks):
+    # Кеш наполняется с основной базы: строка отстающей реплики
+    # пережила бы инвалидацию и жила бы до RECIPE_CACHE_TIMEOUT.
+    recipes = (
+        Recipe.objects.using(PRIMARY_DB).filter(pk__in=pks)
+        .select_related('author')
+        .prefetch_related(
+            Prefetch('tags', queryset=Tag.objects.using(PRIMARY_DB)),
+            Prefetch(
+                'recipeingredient_recipe',
+                queryset=RecipeIngredient.objects.using(PRIMARY_DB)
+                .select_related('ingredients'),
+            ),
+        )
+    )
+    fragments = {}
+    for recipe in recipes:
+        author = recipe.author
+        fragments[recipe.pk] = {
+            'id': recipe.pk,
+            'tags': [dict(tag) for tag in TagSerializer(
+                recipe.tags.all(), many=True
+            ).data],
+            'author': {
+                'email': author.email,
+                'id': author.pk,
+                'username': author.username,
+                'first_name': author.first_name,
+                'last_name': author.last_name,
+            },
+            'ingredients': [
+                {
+                    'id': ingr.ingredients.pk,
+                    'name': ingr.ingredients.name,
+                    'measurement_unit': ingr.ingredients.measurement_unit,
+                    'amount': ingr.amount,
+                }
+                for ingr in recipe.recipeingredient_recipe.all()
+            ],
+            'name': recipe.name,
+            'image': recipe.image.url if recipe.image else None,
+            'text': recipe.text,
+            'cooking_time': recipe.cooking_time,
+            'servings': recipe.servings,
+            'calories': round(recipe.calories, 1),
+            'proteins': round(recipe.proteins, 1),
+            'fats': round(recipe.fats, 1),
+            'carbohydrates': round(recipe.carbohydrates, 1),
+            'cost': round(recipe.cost, 2),
+        }
+    return fragments
+
+
+class GetRecipeListSerializer(serializers.ListSerializer):
+    def to_representation(self, data):
+        recipes = list(data.all() if isinstance(data, Manager) else data)
+        self.child.prepare(recipes)
+        return [self.child.to_representation(recipe) for recipe in recipes]
+
 
 class GetRecipeSerializer(serializers.ModelSerializer):
+    """Рецепт из кеша фрагментов с флагами текущего пользователя."""
+
     tags = TagSerializer(many=True)
     author = CustomUserSerializer()
     ingredients = serializers.SerializerMethodField()
@@ -99,6 +264,7 @@ class GetRecipeSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Recipe
+        list_serializer_class = GetRecipeListSerializer
         fields = (
             'id',
             'tags',
@@ -110,34 +276,92 @@ class GetRecipeSerializer(serializers.ModelSerializer):
             'image',
             'text',
             'cooking_time',
+            'servings',
+            'calories',
+            'proteins',
+            'fats',
+            'carbohydrates',
+            'cost',
         )
 
-    def get_ingredients(self, obj):
-        ingredients = RecipeIngredient.objects.filter(recipes=obj.id)
-        ingredients_data = []
-        for ingr in ingredients:
-            ingr_info = Ingredient.objects.get(name=ingr.ingredients)
-            ingredients_data.append(
-                {
-                    'id': ingr_info.pk,
-                    'name': ingr_info.name,
-                    'measurement_unit': ingr_info.measurement_unit,
-                    'amount': ingr.amount,
-                }
+    def prepare(self, recipes):
+        pks = [recipe.pk for recipe in recipes]
+        if self.context.get('fresh'):
+            # Ответ на запись: кеш сбросится только после коммита.
+            self._fragments = build_recipe_fragments(pks)
+        else:
+            self._fragments = get_recipe_fragments(
+                pks, build_recipe_fragments
             )
-        return ingredients_data
-
-    def get_is_favorited(self, obj):
-        request = self.context.get('request')
-        is_favorited = Favorite.objects.filter(users=request.user.id,
-                                               recipes=obj)
-        return is_favorited.exists()
+        servings = ServingsSerializer(
+            data=self.context.get('request').query_params
+        )
+        servings.is_valid(raise_exception=True)
+        self._servings = servings.validated_data.get('servings')
+        if self._servings:
+            self._scaled = get_scaled_ingredients(pks, self._servings)
+        user_id = self.context.get('request').user.id
+        if user_id is None:
+            self._favorited = self._in_cart = self._subscribed = set()
+            return
+        self._favorited = set(
+            Favorite.objects.filter(users=user_id, recipes__in=pks)
+            .values_list('recipes', flat=True)
+        )
+        self._in_cart = set(
+            Cart.objects.filter(users=user_id, recipes__in=pks)
+            .values_list('recipes', flat=True)
+        )
+        self._subscribed = set(
+            Subscription.objects.filter(
+                users=user_id,
+                authors__in={recipe.author_id for recipe in recipes},
+            ).values_list('authors', flat=True)
+        )
 
-    def get_is_in_shopping_cart(self, obj):
+    def to_representation(self, instance):
+        if instance.pk not in getattr(self, '_fragments', {}):
+            self.prepare([instance])
+        fragment = self._fragments[instance.pk]
         request = self.context.get('request')
-        is_in_shopping_cart = Cart.objects.filter(users=request.user.id,
-                                                  recipes=obj)
-        return is_in_shopping_cart.exists()
+        image = fragment['image']
+        ingredients = fragment['ingredients']
+        servings = fragment['servings']
+        ratio = 1
+        if self._servings:
+            ratio = self._servings / servings
+            # Фрагмент из кеша может разойтись с составом в базе:
+            # такой ингредиент масштабируется по самому фрагменту.
+            scaled = self._scaled.get(instance.pk, {})
+            ingredients = [
+                dict(ingredient, amount=scaled.get(
+                    ingredient['id'],
+                    round_amount(ingredient['amount'] * ratio),
+                ))
+                for ingredient in ingredients
+            ]
+            servings = self._servings
+        return {
+            'id': fragment['id'],
+            'tags': fragment['tags'],
+            'author': dict(
+                fragment['author'],
+                is_subscribed=instance.author_id in self._subscribed,
+            ),
+            'ingredients': ingredients,
+            'is_favorited': instance.pk in self._favorited,
+            'is_in_shopping_cart': instance.pk in self._in_cart,
+            'name': fragment['name'],
+            'image': request.build_absolute_uri(image) if image else None,
+            'text': fragment['text'],
+            'cooking_time': fragment['cooking_time'],
+            'servings': servings,
+            'calories': round(fragment['calories'] * ratio, 1),
+            'proteins': round(fragment['proteins'] * ratio, 1),
+            'fats': round(fragment['fats'] * ratio, 1),
+            'carbohydrates': round(fragment['carbohydrates'] * ratio, 1),
+            'cost': round(fragment['cost'] * ratio, 2),
+        }
 
 
 class CreateRecipeSerializer(serializers.ModelSerializer):
@@ -161,7 +385,8 @@ class CreateRecipeSerializer(serializers.ModelSerializer):
             'image',
             'name',
             'text',
-            'cooking_time'
+            'cooking_time',
+            'servings',
         )
 
     def get_fields(self, *args, **kwargs):
@@ -178,9 +403,16 @@ class CreateRecipeSerializer(serializers.ModelSerializer):
         ingredients_data = validated_data.pop('ingredients')
         tags_data = validated_data.pop('tags')
         recipe = Recipe.objects.create(author=request.user, **validated_data)
+        consume_upload(validated_data['image'])
 
-        for tags in tags_data:
-            RecipeTag.objects.create(recipes=recipe, tags=tags)
+        tags_list = [
+            RecipeTag(recipes=recipe, tags=tags) for tags in tags_data
+        ]
+        RecipeTag.objects.bulk_create(tags_list)
+        # bulk_create на SQLite не возвращает pk, строки перечитываются.
+        record_bulk(RecipeTag.objects.filter(recipes=recipe), 'created')
+        recipe.tags_mask = get_mask(tags_data)
+        Recipe.objects.filter(pk=recipe.pk).update(tags_mask=recipe.tags_mask)
 
         ingredients_list = []
         for ingredients in ingredients_data:
@@ -190,6 +422,10 @@ class CreateRecipeSerializer(serializers.ModelSerializer):
                 amount=ingredients['amount']
             ))
         RecipeIngredient.objects.bulk_create(ingredients_list)
+        record_bulk(
+            RecipeIngredient.objects.filter(recipes=recipe), 'created'
+        )
+        update_nutrition([recipe.pk])
 
         return recipe
 
@@ -226,6 +462,7 @@ class CreateRecipeSerializer(serializers.ModelSerializer):
                 )
                 if ingr.exists():
                     ingr.update(amount=ingredient['amount'])
+                    record_bulk(ingr, 'updated')
                 else:
                     ingr.create(
                         recipes=instance,
@@ -242,13 +479,20 @@ class CreateRecipeSerializer(serializers.ModelSerializer):
                 RecipeTag.objects.get_or_create(recipes=instance, tags=tag)
                 data.append(tag.id)
             instance.tags.set(data)
+            # Маску в базе обновили сигналы, save() не должен её затереть.
+            instance.tags_mask = get_mask(tags_data)
         instance.save()
-        return super().update(instance, validated_data)
+        instance = super().update(instance, validated_data)
+        consume_upload(validated_data.get('image'))
+        update_nutrition([instance.pk])
+        rebuild_plans_for_recipes([instance.pk])
+        return instance
 
     def to_representation(self, instance):
         request = self.context.get('request')
         context = {
             'request': request,
+            'fresh': True,
         }
         serializers = GetRecipeSerializer(instance, context=context)
         return serializers.data
@@ -262,6 +506,25 @@ class UniversalRecipeSerializer(serializers.ModelSerializer):
         fields = ('id', 'name', 'image', 'cooking_time')
 
 
+class BulkRecipesSerializer(serializers.Serializer):
+    recipes = serializers.ListField(
+        child=serializers.IntegerField(),
+        allow_empty=False,
+        max_length=BULK_RECIPES_LIMIT,
+    )
+
+    def validate_recipes(self, recipes):
+        pks = set(recipes)
+        found = set(
+            Recipe.objects.filter(pk__in=pks).values_list('pk', flat=True)
+        )
+        if found != pks:
+            raise serializers.ValidationError(
+                f'Рецепты не найдены: {sorted(pks - found)}'
+            )
+        return sorted(pks)
+
+
 class SubscriptionSerializer(serializers.ModelSerializer):
     email = serializers.CharField(
         source='authors.email'
@@ -315,5 +578,91 @@ class SubscriptionSerializer(serializers.ModelSerializer):
         return recipes_data
 
     def get_recipes_count(self, obj):
-        recipes = Recipe.objects.filter(author=obj.authors)
-        return recipes.count()
+        try:
+            return obj.authors.stats.recipes_count
+        except AuthorStats.DoesNotExist:
+            return Recipe.objects.filter(author=obj.authors).count()
+
+
+class AuthorStatsSerializer(serializers.ModelSerializer):
+    id = serializers.IntegerField(source='author_id')
+    username = serializers.CharField(source='author.username')
+    first_name = serializers.CharField(source='author.first_name')
+    last_name = serializers.CharField(source='author.last_name')
+
+    class Meta:
+        model = AuthorStats
+        fields = (
+            'id',
+            'username',
+            'first_name',
+            'last_name',
+            'recipes_count',
+            'followers_count',
+            'favorites_count',
+        )
+
+
+class JobSerializer(serializers.ModelSerializer):
+    USER_KINDS = ('shopping_list',)
+    ADMIN_KINDS = ('export_data', 'load_data')
+    PRIORITIES = {'shopping_list': 10}
+
+    kind = serializers.ChoiceField(choices=USER_KINDS + ADMIN_KINDS)
+
+    class Meta:
+        model = Job
+        fields = (
+            'id',
+            'kind',
+            'status',
+            'priority',
+            'attempts',
+            'error',
+            'created',
+            'updated',
+        )
+        read_only_fields = (
+            'status', 'priority', 'attempts', 'error', 'created', 'updated'
+        )
+
+    def validate_kind(self, kind):
+        request = self.context.get('request')
+        if kind in self.ADMIN_KINDS and not request.user.is_staff:
+            raise serializers.ValidationError(
+                'Задача доступна только администратору'
+            )
+        return kind
+
+
+class MealPlanEntrySerializer(serializers.ModelSerializer):
+    recipe = serializers.PrimaryKeyRelatedField(queryset=Recipe.objects.all())
+    name = serializers.ReadOnlyField(source='recipe.name')
+
+    class Meta:
+        model = MealPlanEntry
+        fields = ('id', 'date', 'slot', 'recipe', 'name', 'servings')
+
+    def validate_date(self, date):
+        plan = self.context['plan']
+        if not 0 <= (date - plan.week_start).days < 7:
+            raise serializers.ValidationError('Дата вне недели плана')
+        return date
+
+
+class MealPlanSerializer(serializers.ModelSerializer):
+    entries = MealPlanEntrySerializer(many=True, read_only=True)
+
+    class Meta:
+        model = MealPlan
+        fields = ('id', 'week_start', 'entries')
+
+    def validate_week_start(self, week_start):
+        if week_start.weekday() != 0:
+            raise serializers.ValidationError(
+                'Неделя должна начинаться с понедельника'
+            )
+        user = self.context['request'].user
+        if MealPlan.objects.filter(user=user, week_start=week_start).exists():
+            raise serializers.ValidationError('План на эту неделю уже есть')
+        return week_start
@@ -0,0 +1,103 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+from recipes.models import Ingredient, Recipe, RecipeIngredient, RecipeTag, Tag
+from recipes.signals import recipes_updated
+from users.models import CustomUser
+
+from .authentication import invalidate_token
+from .cache import invalidate_all_recipes, invalidate_recipes
+from .reference import invalidate_reference
+
+
+@receiver(post_save, sender=Recipe)
+@receiver(post_delete, sender=Recipe)
+def recipe_changed(sender, instance, **kwargs):
+    invalidate_recipes([instance.pk])
+
+
+@receiver(recipes_updated, sender=Recipe)
+def recipes_bulk_updated(sender, pks, **kwargs):
+    if pks is None:
+        invalidate_all_recipes()
+    else:
+        invalidate_recipes(pks)
+
+
+@receiver(post_save, sender=RecipeIngredient)
+@receiver(post_delete, sender=RecipeIngredient)
+@receiver(post_save, sender=RecipeTag)
+@receiver(post_delete, sender=RecipeTag)
+def recipe_relation_changed(sender, instance, **kwargs):
+    invalidate_recipes([instance.recipes_id])
+
+
+@receiver(m2m_changed, sender=RecipeIngredient)
+@receiver(m2m_changed, sender=RecipeTag)
+def recipe_relations_changed(sender, instance, action, pk_set, **kwargs):
+    if isinstance(instance, Recipe):
+        if action.startswith('post_'):
+            invalidate_recipes([instance.pk])
+    elif action == 'pre_clear':
+        field = 'tags' if isinstance(instance, Tag) else 'ingredients'
+        invalidate_recipes(
+            Recipe.objects.filter(**{field: instance})
+            .values_list('pk', flat=True)
+        )
+    elif action.startswith('post_') and pk_set:
+        invalidate_recipes(pk_set)
+
+
+@receiver(post_save, sender=Tag)
+def tag_changed(sender, instance, created, **kwargs):
+    if not created:
+        invalidate_recipes(
+            RecipeTag.objects.filter(tags=instance)
+            .values_list('recipes', flat=True)
+        )
+
+
+@receiver(post_save, sender=Ingredient)
+def ingredient_changed(sender, instance, created, **kwargs):
+    if not created:
+        invalidate_recipes(
+            RecipeIngredient.objects.filter(ingredients=instance)
+            .values_list('recipes', flat=True)
+        )
+
+
+@receiver(post_save, sender=CustomUser)
+def author_changed(sender, instance, created, update_fields, **kwargs):
+    if created or update_fields == frozenset(('last_login',)):
+        return
+    invalidate_recipes(
+        Recipe.objects.filter(author=instance).values_list('pk', flat=True)
+    )
+
+
+@receiver(post_delete, sender=Token)
+def token_deleted(sender, instance, **kwargs):
+    invalidate_token(instance.key)
+
+
+@receiver(post_save, sender=CustomUser)
+def user_changed(sender, instance, created, update_fields, **kwargs):
+    # Пароль, is_active и поля профиля в закешированном пользователе.
+    if created or update_fields == frozenset(('last_login',)):
+        return
+    for key in Token.objects.filter(user=instance).values_list(
+        'key', flat=True
+    ):
+        invalidate_token(key)
+
+
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+def tags_changed(sender, **kwargs):
+    invalidate_reference('tags')
+
+
+@receiver(post_save, sender=Ingredient)
+@receiver(post_delete, sender=Ingredient)
+def ingredients_changed(sender, **kwargs):
+    invalidate_reference('ingredients')
@@ -0,0 +1,36 @@
+from django.core.cache import cache
+from django.db import transaction
+from django.test import TransactionTestCase
+from rest_framework.authtoken.models import Token
+from api.authentication import (CachedTokenAuthentication, _local_tokens,
+                                get_cache_key, invalidate_token)
+
+from .utils import FoodgramTestMixin
+
+
+class CachedTokenTests(FoodgramTestMixin, TransactionTestCase):
+    def setUp(self):
+        super().setUp()
+        _local_tokens.clear()
+        self.user = self.create_user('user')
+        self.token = Token.objects.create(user=self.user)
+        self.authentication = CachedTokenAuthentication()
+
+    def authenticate(self):
+        return self.authentication.authenticate_credentials(self.token.key)
+
+    def test_shared_cache_dropped_after_commit(self):
+        self.authenticate()
+        cache_key = get_cache_key(self.token.key)
+        with transaction.atomic():
+            invalidate_token(self.token.key)
+            self.assertIsNotNone(cache.get(cache_key))
+        self.assertIsNone(cache.get(cache_key))
+
+    def test_local_hit_returns_copy(self):
+        self.authenticate()
+        first, _ = self.authenticate()
+        second, _ = self.authenticate()
+        self.assertIsNot(first, second)
+        first.first_name = 'changed'
+        self.assertNotEqual(second.first_name, 'changed')
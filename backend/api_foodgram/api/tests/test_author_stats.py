@@ -0,0 +1,93 @@
+from django.test import TestCase
+from recipes.models import AuthorStats, Recipe
+from recipes.stats import COUNTERS, rebuild_author_stats
+
+from .utils import FoodgramTestMixin, get_image
+
+
+class AuthorStatsTests(FoodgramTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.author = self.create_user('author')
+        self.reader = self.create_user('reader')
+        self.client = self.get_client(self.reader)
+        self.tag = self.create_tag('breakfast', '#111111')
+        self.ingredient = self.create_ingredient('sugar')
+        self.recipes = [
+            self.create_recipe(self.author, f'recipe {number}', [self.tag])
+            for number in range(3)
+        ]
+
+    def get_stats(self):
+        return list(
+            AuthorStats.objects.order_by('author')
+            .values_list('author', *COUNTERS)
+        )
+
+    def assert_consistent(self):
+        stats = self.get_stats()
+        rebuild_author_stats()
+        self.assertEqual(stats, self.get_stats())
+
+    def test_invalid_pk(self):
+        for pk in ('abc', '999999'):
+            response = self.client.get(f'/api/users/{pk}/stats/')
+            self.assertEqual(response.status_code, 404, pk)
+
+    def test_favorite(self):
+        recipe = self.recipes[0]
+        response = self.client.post(f'/api/recipes/{recipe.pk}/favorite/')
+        self.assertEqual(response.status_code, 201)
+        self.assert_consistent()
+        response = self.client.get(f'/api/users/{self.author.pk}/stats/')
+        self.assertEqual(response.data['favorites_count'], 1)
+        response = self.client.delete(f'/api/recipes/{recipe.pk}/favorite/')
+        self.assertEqual(response.status_code, 204)
+        self.assert_consistent()
+
+    def test_bulk_favorite(self):
+        self.client.post(f'/api/recipes/{self.recipes[0].pk}/favorite/')
+        pks = [recipe.pk for recipe in self.recipes]
+        response = self.client.post(
+            '/api/recipes/favorite/', {'recipes': pks}, format='json'
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assert_consistent()
+        self.assertEqual(
+            AuthorStats.objects.get(author=self.author).favorites_count, 3
+        )
+        response = self.client.delete(
+            '/api/recipes/favorite/', {'recipes': pks[:2]}, format='json'
+        )
+        self.assertEqual(response.status_code, 204)
+        self.assert_consistent()
+
+    def test_subscription(self):
+        url = f'/api/users/{self.author.pk}/subscribe/'
+        self.assertEqual(self.client.post(url).status_code, 201)
+        self.assert_consistent()
+        self.assertEqual(
+            AuthorStats.objects.get(author=self.author).followers_count, 1
+        )
+        self.assertEqual(self.client.delete(url).status_code, 204)
+        self.assert_consistent()
+
+    def test_recipe_create_and_delete(self):
+        response = self.client.post('/api/recipes/', {
+            'name': 'soup',
+            'text': 'text',
+            'cooking_time': 5,
+            'image': get_image(),
+            'tags': [self.tag.pk],
+            'ingredients': [{'id': self.ingredient.pk, 'amount': 10}],
+        }, format='json')
+        self.assertEqual(response.status_code, 201, response.data)
+        self.assert_consistent()
+        recipe = Recipe.objects.get(pk=response.data['id'])
+        self.client.post(f'/api/recipes/{recipe.pk}/favorite/')
+        response = self.client.delete(f'/api/recipes/{recipe.pk}/')
+        self.assertEqual(response.status_code, 204)
+        self.assert_consistent()
+        self.assertEqual(
+            AuthorStats.objects.get(author=self.reader).recipes_count, 0
+        )
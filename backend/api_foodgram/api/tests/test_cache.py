@@ -0,0 +1,108 @@
+from django.core.cache import cache
+from django.db import transaction
+from django.test import TransactionTestCase
+from recipes.models import Recipe
+from api.cache import get_keys, get_recipe_fragments
+from api.serializers import build_recipe_fragments
+
+from .utils import FoodgramTestMixin, get_image
+
+
+class RecipeFragmentInvalidationTests(FoodgramTestMixin, TransactionTestCase):
+    def setUp(self):
+        super().setUp()
+        self.author = self.create_user('author')
+        self.tag = self.create_tag('breakfast', '#111111')
+        self.ingredient = self.create_ingredient('sugar')
+        self.recipe = self.create_recipe(
+            self.author, 'old', [self.tag], [self.ingredient]
+        )
+
+    def get_key(self):
+        return get_keys([self.recipe.pk])[self.recipe.pk]
+
+    def get_fragment(self):
+        return get_recipe_fragments(
+            [self.recipe.pk], build_recipe_fragments
+        )[self.recipe.pk]
+
+    def assert_dropped_after_commit(self, change):
+        self.get_fragment()
+        key = self.get_key()
+        with transaction.atomic():
+            change()
+            # Параллельный запрос ещё видит старую строку.
+            self.assertIsNotNone(cache.get(key))
+            self.assertEqual(self.get_key(), key)
+        self.assertIsNone(cache.get(self.get_key()))
+
+    def test_recipe_save(self):
+        def change():
+            self.recipe.name = 'renamed'
+            self.recipe.save()
+
+        self.assert_dropped_after_commit(change)
+        self.assertEqual(self.get_fragment()['name'], 'renamed')
+
+    def test_tag_rename(self):
+        def change():
+            self.tag.name = 'renamed'
+            self.tag.save()
+
+        self.assert_dropped_after_commit(change)
+        self.assertEqual(self.get_fragment()['tags'][0]['name'], 'renamed')
+
+    def test_tags_clear(self):
+        self.assert_dropped_after_commit(self.tag.recipes_tags.clear)
+        self.assertEqual(self.get_fragment()['tags'], [])
+
+    def test_rollback_keeps_fragment(self):
+        self.get_fragment()
+        key = self.get_key()
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            self.recipe.name = 'renamed'
+            self.recipe.save()
+            raise RuntimeError
+        self.assertEqual(self.get_key(), key)
+        self.assertIsNotNone(cache.get(key))
+
+    def test_late_fill_not_served(self):
+        def build_then_commit(pks):
+            # Читатель построил фрагмент до коммита, а в кеш кладёт после.
+            fragments = build_recipe_fragments(pks)
+            with transaction.atomic():
+                Recipe.objects.get(pk=self.recipe.pk).save()
+                Recipe.objects.filter(pk=self.recipe.pk).update(name='new')
+            return fragments
+
+        stale = get_recipe_fragments([self.recipe.pk], build_then_commit)
+        self.assertEqual(stale[self.recipe.pk]['name'], 'old')
+        self.assertEqual(self.get_fragment()['name'], 'new')
+
+    def test_patch_response_shows_new_values(self):
+        client = self.get_client(self.author)
+        url = f'/api/recipes/{self.recipe.pk}/'
+        self.assertEqual(client.get(url).data['name'], 'old')
+        response = client.patch(url, {
+            'name': 'new',
+            'text': 'text',
+            'cooking_time': 5,
+            'tags': [self.tag.pk],
+            'ingredients': [{'id': self.ingredient.pk, 'amount': 10}],
+        }, format='json')
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(response.data['name'], 'new')
+        self.assertEqual(response.data['ingredients'][0]['amount'], 10)
+        self.assertEqual(client.get(url).data['name'], 'new')
+
+    def test_create_response(self):
+        response = self.get_client(self.author).post('/api/recipes/', {
+            'name': 'soup',
+            'text': 'text',
+            'cooking_time': 5,
+            'image': get_image(),
+            'tags': [self.tag.pk],
+            'ingredients': [{'id': self.ingredient.pk, 'amount': 10}],
+        }, format='json')
+        self.assertEqual(response.status_code, 201, response.data)
+        self.assertEqual(response.data['name'], 'soup')
@@ -0,0 +1,37 @@
+from django.test import TestCase
+from recipes.models import Cart
+from api.serializers import BULK_RECIPES_LIMIT
+
+from .utils import FoodgramTestMixin
+
+
+class CartBulkTests(FoodgramTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = self.create_user('user')
+        self.client = self.get_client(self.user)
+        self.recipes = [
+            self.create_recipe(self.user, f'recipe {number}')
+            for number in range(3)
+        ]
+
+    def test_add_and_clear(self):
+        response = self.client.post(
+            '/api/recipes/shopping_cart/',
+            {'recipes': [recipe.pk for recipe in self.recipes]},
+            format='json',
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['count'], 3)
+        response = self.client.delete('/api/recipes/shopping_cart/clear/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['count'], 0)
+        self.assertFalse(Cart.objects.exists())
+
+    def test_limit(self):
+        response = self.client.post(
+            '/api/recipes/shopping_cart/',
+            {'recipes': [self.recipes[0].pk] * (BULK_RECIPES_LIMIT + 1)},
+            format='json',
+        )
+        self.assertEqual(response.status_code, 400)
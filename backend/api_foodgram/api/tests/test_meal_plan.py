@@ -0,0 +1,50 @@
+from datetime import date, timedelta
+
+from django.test import TestCase
+from recipes.meal_plan import add_entry, remove_entry
+from recipes.models import MealPlan, MealPlanItem
+
+from .utils import FoodgramTestMixin
+
+
+class PastPlanTests(FoodgramTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.author = self.create_user('author')
+        self.tag = self.create_tag('breakfast', '#111111')
+        self.ingredient = self.create_ingredient('sugar')
+        self.recipe = self.create_recipe(
+            self.author, tags=[self.tag], ingredients=[self.ingredient]
+        )
+        today = date.today()
+        week_start = today - timedelta(days=today.weekday() + 14)
+        self.plan = MealPlan.objects.create(
+            user=self.author, week_start=week_start
+        )
+        self.entry = add_entry(
+            self.plan, date=week_start, slot='lunch', recipe=self.recipe
+        )
+
+    def get_amounts(self):
+        return list(
+            MealPlanItem.objects.filter(plan=self.plan)
+            .values_list('amount', flat=True)
+        )
+
+    def test_recipe_edit_then_remove_entry(self):
+        self.assertEqual(self.get_amounts(), [100])
+        response = self.get_client(self.author).patch(
+            f'/api/recipes/{self.recipe.pk}/',
+            {
+                'name': 'recipe',
+                'text': 'text',
+                'cooking_time': 5,
+                'tags': [self.tag.pk],
+                'ingredients': [{'id': self.ingredient.pk, 'amount': 300}],
+            },
+            format='json',
+        )
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(self.get_amounts(), [300])
+        remove_entry(self.entry)
+        self.assertEqual(self.get_amounts(), [])
@@ -0,0 +1,48 @@
+import msgpack
+import orjson
+from django.test import SimpleTestCase, TestCase
+from rest_framework.exceptions import ErrorDetail
+from api.renderers import MessagePackRenderer, ORJSONRenderer
+
+from .utils import FoodgramTestMixin
+
+# Так ListField отдаёт ошибку элемента: ключ — индекс в списке.
+INDEX_KEYED_ERRORS = {
+    'recipes': {0: [ErrorDetail('Неверный pk.', code='invalid')]},
+}
+
+
+class RendererTests(SimpleTestCase):
+    def test_orjson_index_keys(self):
+        rendered = ORJSONRenderer().render(INDEX_KEYED_ERRORS)
+        self.assertEqual(
+            orjson.loads(rendered), {'recipes': {'0': ['Неверный pk.']}}
+        )
+
+    def test_msgpack_index_keys(self):
+        rendered = MessagePackRenderer().render(INDEX_KEYED_ERRORS)
+        self.assertEqual(
+            msgpack.unpackb(rendered), {'recipes': {'0': ['Неверный pk.']}}
+        )
+
+
+class InvalidItemTests(FoodgramTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.client = self.get_client(self.create_user('user'))
+
+    def test_invalid_recipe_in_cart(self):
+        decoders = {
+            'application/json': orjson.loads,
+            'application/msgpack': msgpack.unpackb,
+        }
+        for accept, loads in decoders.items():
+            with self.subTest(accept=accept):
+                response = self.client.post(
+                    '/api/recipes/shopping_cart/',
+                    {'recipes': ['abc']},
+                    format='json',
+                    HTTP_ACCEPT=accept,
+                )
+                self.assertEqual(response.status_code, 400)
+                self.assertIn('0', loads(response.content)['recipes'])
@@ -0,0 +1,34 @@
+from unittest import mock
+
+from django.test import TestCase
+
+from .utils import FoodgramTestMixin
+
+
+class ServingsTests(FoodgramTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.author = self.create_user('author')
+        self.ingredient = self.create_ingredient('sugar')
+        self.recipe = self.create_recipe(
+            self.author, ingredients=[self.ingredient]
+        )
+        self.recipe.servings = 4
+        self.recipe.save()
+        self.url = f'/api/recipes/{self.recipe.pk}/?servings=6'
+
+    def get_amount(self):
+        response = self.get_client().get(self.url)
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(response.data['servings'], 6)
+        return response.data['ingredients'][0]['amount']
+
+    def test_scaled(self):
+        self.assertEqual(self.get_amount(), 150)
+
+    def test_ingredient_missing_from_scaled(self):
+        # Состав во фрагменте новее, чем прочитанный при масштабировании.
+        with mock.patch(
+            'api.serializers.get_scaled_ingredients', return_value={}
+        ):
+            self.assertEqual(self.get_amount(), 150)
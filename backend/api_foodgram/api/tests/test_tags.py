@@ -0,0 +1,144 @@
+import json
+
+from django.core.management import call_command
+from django.test import TestCase
+from recipes.backup import import_stream, iter_export
+from recipes.models import Recipe, Tag
+from recipes.tags import get_mask
+
+from .utils import FoodgramTestMixin, get_image
+
+
+def export_without_masks():
+    """Выгрузка, как до появления масок: без битов тегов и масок."""
+    lines = []
+    columns = []
+    for line in ''.join(iter_export()).splitlines():
+        item = json.loads(line)
+        if isinstance(item, dict):
+            columns = [
+                number for number, field in enumerate(item['fields'])
+                if field in ('bit', 'tags_mask')
+            ]
+        row = item['fields'] if isinstance(item, dict) else item
+        for number in reversed(columns):
+            del row[number]
+        lines.append(json.dumps(item))
+    return lines
+
+
+class TagsMaskTests(FoodgramTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.author = self.create_user('author')
+        self.client = self.get_client(self.author)
+        self.ingredient = self.create_ingredient('sugar')
+        self.breakfast = self.create_tag('breakfast', '#111111')
+        self.lunch = self.create_tag('lunch', '#222222')
+        self.dinner = self.create_tag('dinner', '#333333')
+
+    def get_recipe_data(self, name, tags):
+        return {
+            'name': name,
+            'text': 'text',
+            'cooking_time': 5,
+            'image': get_image(),
+            'tags': [tag.pk for tag in tags],
+            'ingredients': [{'id': self.ingredient.pk, 'amount': 10}],
+        }
+
+    def create_via_api(self, name, tags):
+        response = self.client.post(
+            '/api/recipes/', self.get_recipe_data(name, tags), format='json'
+        )
+        self.assertEqual(response.status_code, 201, response.data)
+        return Recipe.objects.get(pk=response.data['id'])
+
+    def assert_mask(self, recipe):
+        recipe.refresh_from_db()
+        self.assertEqual(recipe.tags_mask, get_mask(recipe.tags.all()))
+
+    def filter_names(self, query):
+        response = self.get_client().get(f'/api/recipes/?{query}')
+        self.assertEqual(response.status_code, 200)
+        return sorted(recipe['name'] for recipe in response.data['results'])
+
+    def test_create_and_update(self):
+        recipe = self.create_via_api('soup', [self.breakfast, self.lunch])
+        self.assert_mask(recipe)
+        self.assertNotEqual(recipe.tags_mask, 0)
+        data = self.get_recipe_data('soup', [self.dinner])
+        del data['image']
+        response = self.client.patch(
+            f'/api/recipes/{recipe.pk}/', data, format='json'
+        )
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assert_mask(recipe)
+        self.assertEqual(recipe.tags_mask, 1 << self.dinner.bit)
+
+    def test_tag_delete_frees_bit(self):
+        recipe = self.create_recipe(
+            self.author, tags=[self.breakfast, self.lunch]
+        )
+        bit = self.lunch.bit
+        self.lunch.delete()
+        self.assert_mask(recipe)
+        brunch = self.create_tag('brunch', '#444444')
+        self.assertEqual(brunch.bit, bit)
+        self.assertEqual(self.filter_names('tags=brunch'), [])
+
+    def test_tags_clear(self):
+        recipe = self.create_recipe(
+            self.author, tags=[self.breakfast, self.lunch]
+        )
+        other = self.create_recipe(self.author, 'other', tags=[self.lunch])
+        recipe.tags.clear()
+        self.assert_mask(recipe)
+        self.assertEqual(recipe.tags_mask, 0)
+        self.lunch.recipes_tags.clear()
+        self.assert_mask(other)
+        self.assertEqual(other.tags_mask, 0)
+
+    def test_filter_any_and_all(self):
+        self.create_recipe(self.author, 'both', [self.breakfast, self.lunch])
+        self.create_recipe(self.author, 'breakfast', [self.breakfast])
+        self.create_recipe(self.author, 'dinner', [self.dinner])
+        query = 'tags=breakfast&tags=lunch'
+        self.assertEqual(self.filter_names(query), ['both', 'breakfast'])
+        self.assertEqual(
+            self.filter_names(f'{query}&tags_mode=any'), ['both', 'breakfast']
+        )
+        self.assertEqual(self.filter_names(f'{query}&tags_mode=all'), ['both'])
+        self.assertEqual(
+            self.filter_names('tags=dinner&tags_mode=all'), ['dinner']
+        )
+
+    def test_tags_without_bit(self):
+        Tag.objects.bulk_create(
+            [Tag(name='snack', slug='snack', color='#555555')]
+        )
+        snack = Tag.objects.get(slug='snack')
+        self.assertIsNone(snack.bit)
+        self.assertEqual(get_mask([snack, self.breakfast]),
+                         1 << self.breakfast.bit)
+        recipe = self.create_recipe(self.author, 'snack', tags=[snack])
+        self.assert_mask(recipe)
+        self.create_recipe(self.author, 'breakfast', [self.breakfast])
+        self.create_recipe(self.author, 'both', [snack, self.breakfast])
+        self.assertEqual(
+            self.filter_names('tags=snack&tags_mode=all'), ['both', 'snack']
+        )
+        query = 'tags=snack&tags=breakfast'
+        self.assertEqual(
+            self.filter_names(query), ['both', 'breakfast', 'snack']
+        )
+        self.assertEqual(self.filter_names(f'{query}&tags_mode=all'), ['both'])
+
+    def test_import_assigns_bits(self):
+        recipe = self.create_recipe(self.author, tags=[self.lunch])
+        lines = export_without_masks()
+        call_command('flush', interactive=False, verbosity=0)
+        import_stream(lines)
+        self.assertFalse(Tag.objects.filter(bit=None).exists())
+        self.assert_mask(recipe)
+        self.assertEqual(self.filter_names('tags=lunch'), ['recipe'])
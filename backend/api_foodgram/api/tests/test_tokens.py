@@ -0,0 +1,70 @@
+from datetime import datetime, timedelta, timezone
+
+from django.db import transaction
+from django.test import TestCase
+from rest_framework import exceptions
+from rest_framework.test import APIRequestFactory
+from users.models import RevokedToken
+from api.tokens import REFRESH, decode, issue_tokens, revoke
+from api.views import refresh_token
+
+from .utils import FoodgramTestMixin
+
+
+class RevokeTests(FoodgramTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = self.create_user('user')
+        self.token = issue_tokens(self.user)['refresh_token']
+        self.claims = decode(self.token, REFRESH)
+
+    def test_revoked_token_rejected(self):
+        revoke(self.claims)
+        with self.assertRaises(exceptions.AuthenticationFailed):
+            decode(self.token, REFRESH)
+
+    def test_revoke_twice_keeps_transaction(self):
+        # Токен уже отозвал другой воркер: строка в базе есть.
+        RevokedToken.objects.create(
+            jti=self.claims['jti'],
+            expires=datetime.now(timezone.utc) + timedelta(days=1),
+        )
+        with transaction.atomic():
+            with self.assertRaises(exceptions.AuthenticationFailed):
+                revoke(self.claims)
+            self.assertEqual(
+                RevokedToken.objects.filter(jti=self.claims['jti']).count(), 1
+            )
+        with self.assertRaises(exceptions.AuthenticationFailed):
+            decode(self.token, REFRESH)
+
+
+class RefreshTests(FoodgramTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = self.create_user('user')
+        self.token = issue_tokens(self.user)['refresh_token']
+
+    def post_refresh(self):
+        request = APIRequestFactory().post(
+            '/api/auth/token/refresh/',
+            {'refresh_token': self.token},
+            format='json',
+        )
+        return refresh_token(request)
+
+    def test_refresh_once(self):
+        response = self.post_refresh()
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('refresh_token', response.data)
+        self.assertEqual(self.post_refresh().status_code, 401)
+
+    def test_password_change_rejects_old_refresh(self):
+        self.user.set_password('new-pass12345!')
+        self.user.save(update_fields=['password'])
+        self.assertEqual(self.post_refresh().status_code, 401)
+        self.assertFalse(
+            RevokedToken.objects.filter(
+                jti=decode(self.token, REFRESH)['jti']
+            ).exists()
+        )
@@ -0,0 +1,93 @@
+import base64
+import io
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TransactionTestCase
+from django.utils import timezone
+from recipes.models import ImageUpload, Recipe
+
+from .utils import FoodgramTestMixin, get_image
+
+
+class ImageUploadTests(FoodgramTestMixin, TransactionTestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = self.create_user('user')
+        self.client = self.get_client(self.user)
+        self.tag = self.create_tag('breakfast', '#111111')
+        self.ingredient = self.create_ingredient('sugar')
+
+    def upload(self, client=None):
+        content = base64.b64decode(get_image().split(';base64,')[1])
+        response = (client or self.client).post(
+            '/api/recipes/images/',
+            {'image': SimpleUploadedFile('dish.png', content)},
+            format='multipart',
+        )
+        self.assertEqual(response.status_code, 201, response.data)
+        return ImageUpload.objects.get(token=response.data['token'])
+
+    def create_recipe_with(self, token, client=None):
+        return (client or self.client).post('/api/recipes/', {
+            'name': 'soup',
+            'text': 'text',
+            'cooking_time': 5,
+            'image': token,
+            'tags': [self.tag.pk],
+            'ingredients': [{'id': self.ingredient.pk, 'amount': 10}],
+        }, format='json')
+
+    def test_token_used_once(self):
+        upload = self.upload()
+        name = upload.image.name
+        response = self.create_recipe_with(upload.token)
+        self.assertEqual(response.status_code, 201, response.data)
+        self.assertEqual(Recipe.objects.get().image.name, name)
+        self.assertFalse(ImageUpload.objects.exists())
+        self.assertTrue(default_storage.exists(name))
+        response = self.create_recipe_with(upload.token)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('image', response.data)
+
+    def test_expired_token(self):
+        upload = self.upload()
+        ImageUpload.objects.update(created=timezone.now() - timedelta(
+            seconds=settings.IMAGE_UPLOAD_TTL + 1
+        ))
+        response = self.create_recipe_with(upload.token)
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Recipe.objects.exists())
+
+    def test_other_users_token(self):
+        upload = self.upload()
+        other = self.get_client(self.create_user('other'))
+        response = self.create_recipe_with(upload.token, other)
+        self.assertEqual(response.status_code, 400)
+        self.assertTrue(ImageUpload.objects.filter(pk=upload.pk).exists())
+
+    def test_prune_keeps_fresh_uploads(self):
+        fresh = self.upload()
+        stale = self.upload()
+        ImageUpload.objects.filter(pk=stale.pk).update(
+            created=timezone.now() - timedelta(
+                seconds=settings.IMAGE_UPLOAD_TTL + 1
+            )
+        )
+        call_command('prune_image_uploads', stdout=io.StringIO())
+        self.assertEqual(
+            list(ImageUpload.objects.values_list('pk', flat=True)),
+            [fresh.pk],
+        )
+        self.assertFalse(default_storage.exists(stale.image.name))
+        self.assertTrue(default_storage.exists(fresh.image.name))
+
+    def test_user_delete_removes_files(self):
+        name = self.upload().image.name
+        self.assertTrue(default_storage.exists(name))
+        self.user.delete()
+        self.assertFalse(ImageUpload.objects.exists())
+        self.assertFalse(default_storage.exists(name))
@@ -0,0 +1,75 @@
+import base64
+import io
+import shutil
+import tempfile
+
+from django.core.cache import cache
+from django.test import override_settings
+from PIL import Image
+from recipes.models import Ingredient, Recipe, RecipeIngredient, RecipeTag, Tag
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+from users.models import CustomUser
+from api.cache import _local_fragments
+
+
+def get_image():
+    buffer = io.BytesIO()
+    Image.new('RGB', (2, 2)).save(buffer, 'PNG')
+    encoded = base64.b64encode(buffer.getvalue()).decode()
+    return f'data:image/png;base64,{encoded}'
+
+
+class FoodgramTestMixin:
+    """Общие данные тестов API: временный MEDIA_ROOT и пустой кеш."""
+
+    password = 'pass12345!'
+
+    def setUp(self):
+        super().setUp()
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        media = override_settings(MEDIA_ROOT=media_root)
+        media.enable()
+        self.addCleanup(media.disable)
+        cache.clear()
+        _local_fragments.clear()
+
+    def create_user(self, username, **kwargs):
+        return CustomUser.objects.create_user(
+            username=username,
+            email=f'{username}@example.com',
+            password=self.password,
+            **kwargs,
+        )
+
+    def create_tag(self, slug, color):
+        return Tag.objects.create(name=slug, slug=slug, color=color)
+
+    def create_ingredient(self, name, measurement_unit='г'):
+        return Ingredient.objects.create(
+            name=name, measurement_unit=measurement_unit
+        )
+
+    def create_recipe(self, author, name='recipe', tags=(), ingredients=()):
+        recipe = Recipe.objects.create(
+            author=author,
+            name=name,
+            text='text',
+            cooking_time=5,
+            image='recipes/images/test.jpg',
+        )
+        for tag in tags:
+            RecipeTag.objects.create(recipes=recipe, tags=tag)
+        for ingredient in ingredients:
+            RecipeIngredient.objects.create(
+                recipes=recipe, ingredients=ingredient, amount=100
+            )
+        return recipe
+
+    def get_client(self, user=None):
+        client = APIClient()
+        if user is not None:
+            token, _ = Token.objects.get_or_create(user=user)
+            client.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
+        return client
@@ -0,0 +1,59 @@
+import logging
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.throttling import BaseThrottle
+from monitoring.metrics import THROTTLED
+
+logger = logging.getLogger(__name__)
+
+
+def get_endpoint_name(view):
+    return f'{view.__class__.__name__}.{getattr(view, "action", None)}'
+
+
+class CostRateThrottle(BaseThrottle):
+    """Token bucket на клиента с ценой запроса по действию представления.
+
+    Представление задаёт цены в throttle_costs = {'action': жетоны},
+    остальные запросы стоят один жетон. Корзины хранятся в кеше Django:
+    для нескольких воркеров он должен быть общим. Чтение и запись
+    корзины не атомарны, при гонке клиент может потратить чуть больше.
+    """
+
+    cache = cache
+    cache_format = 'throttle:bucket:{ident}'
+
+    def get_cache_key(self, request):
+        if request.user and request.user.is_authenticated:
+            ident = f'user:{request.user.pk}'
+        else:
+            ident = f'ip:{self.get_ident(request)}'
+        return self.cache_format.format(ident=ident)
+
+    def get_cost(self, view):
+        costs = getattr(view, 'throttle_costs', {})
+        return costs.get(getattr(view, 'action', None), 1)
+
+    def allow_request(self, request, view):
+        capacity = settings.COST_THROTTLE['CAPACITY']
+        rate = settings.COST_THROTTLE['REFILL_RATE']
+        cost = self.get_cost(view)
+        key = self.get_cache_key(request)
+        now = time.time()
+        tokens, updated = self.cache.get(key, (capacity, now))
+        tokens = min(capacity, tokens + (now - updated) * rate)
+        timeout = int(capacity / rate) + 1
+        if tokens < cost:
+            self.wait_seconds = (cost - tokens) / rate
+            self.cache.set(key, (tokens, now), timeout)
+            endpoint = get_endpoint_name(view)
+            THROTTLED.labels(endpoint).inc()
+            logger.warning('Throttled %s for %s', endpoint, key)
+            return False
+        self.cache.set(key, (tokens - cost, now), timeout)
+        return True
+
+    def wait(self):
+        return self.wait_seconds
@@ -0,0 +1,197 @@
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils.crypto import salted_hmac
+from rest_framework import exceptions
+from rest_framework.authentication import (BaseAuthentication,
+                                           get_authorization_header)
+from users.models import CustomUser, RevokedToken
+
+ACCESS = 'access'
+REFRESH = 'refresh'
+# Поля пользователя в access-токене: из них он собирается без базы.
+USER_CLAIMS = (
+    'username',
+    'email',
+    'first_name',
+    'last_name',
+    'is_staff',
+    'is_superuser',
+)
+
+
+class RevocationList:
+    """Идентификаторы отозванных токенов в памяти процесса.
+
+    Хранятся 16-байтовые jti ещё не истёкших токенов; набор целиком
+    перечитывается из базы не чаще раза в REVOCATION_SYNC_INTERVAL.
+    Токен, отозванный в другом воркере, перестаёт приниматься здесь
+    после ближайшей синхронизации.
+    """
+
+    def __init__(self):
+        self.jtis = frozenset()
+        self.synced_at = None
+        self.lock = threading.Lock()
+
+    def sync(self, force=False):
+        interval = settings.JWT['REVOCATION_SYNC_INTERVAL']
+        now = time.monotonic()
+        if (
+            not force
+            and self.synced_at is not None
+            and now - self.synced_at < interval
+        ):
+            return
+        with self.lock:
+            self.jtis = frozenset(
+                bytes.fromhex(jti) for jti in RevokedToken.objects.filter(
+                    expires__gt=datetime.now(timezone.utc)
+                ).values_list('jti', flat=True)
+            )
+            self.synced_at = now
+
+    def add(self, jti):
+        with self.lock:
+            self.jtis = self.jtis | {bytes.fromhex(jti)}
+
+    def __contains__(self, jti):
+        self.sync()
+        return bytes.fromhex(jti) in self.jtis
+
+
+revoked = RevocationList()
+
+
+def get_password_marker(user):
+    """Отпечаток хеша пароля для refresh-токена.
+
+    Меняется при любой смене пароля (API, сброс, админка): выданные до
+    неё refresh-токены больше не обмениваются на новую пару.
+    """
+    return salted_hmac('api.tokens.password', user.password).hexdigest()[:16]
+
+
+def encode(user, token_type, lifetime):
+    now = datetime.now(timezone.utc)
+    claims = {
+        'sub': str(user.pk),
+        'type': token_type,
+        'jti': uuid.uuid4().hex,
+        'iat': now,
+        'exp': now + lifetime,
+    }
+    if token_type == ACCESS:
+        claims.update(
+            {field: getattr(user, field) for field in USER_CLAIMS}
+        )
+    else:
+        claims['pwd'] = get_password_marker(user)
+    import jwt
+
+    return jwt.encode(
+        claims,
+        settings.JWT['SIGNING_KEY'],
+        algorithm=settings.JWT['ALGORITHM'],
+    )
+
+
+def issue_tokens(user):
+    return {
+        'auth_token': encode(
+            user, ACCESS, timedelta(seconds=settings.JWT['ACCESS_LIFETIME'])
+        ),
+        'refresh_token': encode(
+            user, REFRESH, timedelta(seconds=settings.JWT['REFRESH_LIFETIME'])
+        ),
+    }
+
+
+def decode(token, token_type):
+    # PyJWT тянет cryptography: импорт только в режиме jwt, а не при
+    # старте каждого воркера.
+    import jwt
+
+    try:
+        claims = jwt.decode(
+            token,
+            settings.JWT['SIGNING_KEY'],
+            algorithms=[settings.JWT['ALGORITHM']],
+            options={'require': ['exp', 'iat', 'jti', 'sub']},
+        )
+    except jwt.ExpiredSignatureError:
+        raise exceptions.AuthenticationFailed('Срок действия токена истёк.')
+    except jwt.InvalidTokenError:
+        raise exceptions.AuthenticationFailed('Недопустимый токен.')
+    if claims.get('type') != token_type:
+        raise exceptions.AuthenticationFailed('Недопустимый токен.')
+    if claims['jti'] in revoked:
+        raise exceptions.AuthenticationFailed('Токен отозван.')
+    return claims
+
+
+def revoke(claims):
+    """Отзывает токен; уже отозванный — AuthenticationFailed.
+
+    Строку вставляет ровно один запрос: из двух параллельных обменов
+    одного refresh-токена второй получит 401. Вставка идёт в точке
+    сохранения, иначе ошибка уникальности прервала бы транзакцию
+    запроса на PostgreSQL.
+    """
+    expires = datetime.fromtimestamp(claims['exp'], timezone.utc)
+    try:
+        with transaction.atomic():
+            RevokedToken.objects.create(jti=claims['jti'], expires=expires)
+    except IntegrityError:
+        revoked.add(claims['jti'])
+        raise exceptions.AuthenticationFailed('Токен отозван.')
+    revoked.add(claims['jti'])
+    RevokedToken.objects.filter(
+        expires__lte=datetime.now(timezone.utc)
+    ).delete()
+
+
+def get_user(claims):
+    """Пользователь из полей токена, без запроса к базе.
+
+    У такого пользователя нет хеша пароля и остальных полей: для их
+    изменения пользователя нужно загрузить из базы.
+    """
+    user = CustomUser(
+        pk=int(claims['sub']),
+        **{field: claims[field] for field in USER_CLAIMS}
+    )
+    user._state.adding = False
+    return user
+
+
+class JWTAuthentication(BaseAuthentication):
+    """Проверка подписанного access-токена без обращения к базе.
+
+    Принимает заголовок "Token <jwt>", как и TokenAuthentication, чтобы
+    фронтенду не пришлось меняться, а также "Bearer <jwt>".
+    """
+
+    keywords = (b'token', b'bearer')
+
+    def authenticate(self, request):
+        auth = get_authorization_header(request).split()
+        if not auth or auth[0].lower() not in self.keywords:
+            return None
+        if len(auth) != 2:
+            raise exceptions.AuthenticationFailed(
+                'Недопустимый заголовок токена.'
+            )
+        try:
+            token = auth[1].decode()
+        except UnicodeError:
+            raise exceptions.AuthenticationFailed('Недопустимый токен.')
+        claims = decode(token, ACCESS)
+        return get_user(claims), claims
+
+    def authenticate_header(self, request):
+        return 'Bearer'
@@ -1,27 +1,53 @@
-from django.urls import include, path
+from django.conf import settings
+from django.urls import include, path, re_path
 from djoser import views
 from rest_framework.routers import SimpleRouter
+from monitoring.views import metrics
 
-from .views import (CustomUserViewSet, IngredientViewSet, RecipeViewSet,
-                    TagViewSet, set_password)
+from .views import (CustomUserViewSet, IngredientViewSet, JobViewSet,
+                    JWTTokenCreateView, JWTTokenDestroyView, MealPlanViewSet,
+                    RecipeViewSet, TagViewSet, export_data, refresh_token,
+                    set_password)
 
 router = SimpleRouter()
 router.register(r'users', CustomUserViewSet, basename='users')
 router.register(r'tags', TagViewSet)
 router.register(r'ingredients', IngredientViewSet)
 router.register(r'recipes', RecipeViewSet)
+router.register(r'jobs', JobViewSet, basename='jobs')
+router.register(r'meal_plans', MealPlanViewSet, basename='meal_plans')
 
-urlpatterns = [
-    path('auth/token/login/', views.TokenCreateView.as_view(), name='login'),
-    path(
-        'auth/token/logout/',
-        views.TokenDestroyView.as_view(),
-        name='logout'
-    ),
+if settings.AUTH_MODE == 'jwt':
+    auth_urls = [
+        path('auth/token/login/', JWTTokenCreateView.as_view(), name='login'),
+        path(
+            'auth/token/logout/',
+            JWTTokenDestroyView.as_view(),
+            name='logout'
+        ),
+        path('auth/token/refresh/', refresh_token, name='refresh'),
+    ]
+else:
+    auth_urls = [
+        path(
+            'auth/token/login/',
+            views.TokenCreateView.as_view(),
+            name='login'
+        ),
+        path(
+            'auth/token/logout/',
+            views.TokenDestroyView.as_view(),
+            name='logout'
+        ),
+    ]
+
+urlpatterns = auth_urls + [
     path(
         'users/set_password/',
         set_password,
         name='set_password_profile'
     ),
+    path('export/', export_data, name='export_data'),
+    re_path(r'^metrics/?$', metrics, name='metrics'),
     path('', include(router.urls)),
 ]
@@ -1,22 +1,83 @@
 from io import StringIO
 
-from django.db.models import Count
-from django.http import HttpResponse
+from django.contrib.auth.signals import user_logged_in
+from django.db import IntegrityError, transaction
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
 from djoser.conf import settings
+from djoser.views import TokenCreateView, TokenDestroyView
 from rest_framework import mixins, permissions, status, viewsets
 from rest_framework.decorators import action, api_view, permission_classes
+from rest_framework.parsers import MultiPartParser
 from rest_framework.response import Response
-from recipes.models import (Cart, Favorite, Ingredient, Recipe, Subscription,
-                            Tag)
+from jobs.models import Job
+from jobs.queue import enqueue
+from outbox.events import record_bulk
+from recipes.backup import iter_export
+from recipes.meal_plan import (add_entry, change_entry,
+                               get_plan_shopping_list, remove_entry)
+from recipes.models import (AuthorStats, Cart, Favorite, Ingredient,
+                            MealPlan, Recipe, Subscription, Tag)
+from recipes.stats import change_favorites
+from recipes.utils import get_shopping_list
 from users.models import CustomUser
 
 from .filters import IngredientSearchFilter, RecipeFilter
-from .serializers import (CreateCustomUserSerializer, CreateRecipeSerializer,
-                          CustomUserSerializer, GetRecipeSerializer,
-                          IngredientSerializer, SubscriptionSerializer,
+from .reference import get_reference
+from .serializers import (BULK_RECIPES_LIMIT, AuthorStatsSerializer,
+                          BulkRecipesSerializer, CreateCustomUserSerializer,
+                          CreateRecipeSerializer, CustomUserSerializer,
+                          GetRecipeSerializer, ImageUploadSerializer,
+                          IngredientSerializer, JobSerializer,
+                          MealPlanEntrySerializer, MealPlanSerializer,
+                          ServingsSerializer, SubscriptionSerializer,
                           TagSerializer, UniversalRecipeSerializer)
+from .tokens import (REFRESH, decode, get_password_marker, issue_tokens,
+                     revoke)
+
+TOP_AUTHORS_ORDERING = ('recipes_count', 'followers_count', 'favorites_count')
+
+
+def create_unique(model, **fields):
+    """Вставка одной строкой INSERT: дубль отсекает уникальный индекс.
+
+    Возвращает созданный объект или None, если такая запись уже есть.
+    """
+    try:
+        with transaction.atomic():
+            return model.objects.create(**fields)
+    except IntegrityError:
+        return None
+
+
+def create_bulk(model, user, pks):
+    """Добавляет пачку рецептов пользователю, пропуская уже добавленные.
+
+    bulk_create не вызывает сигналы, поэтому события outbox и счётчики
+    обновляются явно и только для новых строк.
+    """
+    existing = set(
+        model.objects.filter(users=user, recipes__in=pks)
+        .values_list('recipes_id', flat=True)
+    )
+    new_pks = [pk for pk in pks if pk not in existing]
+    try:
+        with transaction.atomic():
+            model.objects.bulk_create(
+                [model(users=user, recipes_id=pk) for pk in new_pks]
+            )
+    except IntegrityError:
+        # Часть строк вставил параллельный запрос: добавляем по одной,
+        # события и счётчики запишут сигналы post_save.
+        for pk in new_pks:
+            create_unique(model, users=user, recipes_id=pk)
+        return
+    # Все строки вставлены этим запросом; перечитываем ради pk.
+    created = list(model.objects.filter(users=user, recipes__in=new_pks))
+    record_bulk(created, 'created')
+    if model is Favorite:
+        change_favorites([instance.recipes_id for instance in created], 1)
 
 
 class CreateListRetrieveViewSet(
@@ -30,6 +91,8 @@ class CreateListRetrieveViewSet(
 
 class CustomUserViewSet(CreateListRetrieveViewSet):
     queryset = CustomUser.objects.all()
+    # Нечисловой id — 404 на уровне маршрута, а не ValueError в запросе.
+    lookup_value_regex = r'\d+'
 
     def get_serializer_class(self):
         if self.request.method in permissions.SAFE_METHODS:
@@ -62,7 +125,9 @@ class CustomUserViewSet(CreateListRetrieveViewSet):
     )
     def subscriptions(self, request, *args, **kwargs):
         user = self.request.user
-        subscription = Subscription.objects.filter(users=user)
+        subscription = Subscription.objects.filter(
+            users=user
+        ).select_related('authors__stats')
         paginate = self.paginate_queryset(subscription)
         context = {'request': request}
         serializer = SubscriptionSerializer(
@@ -76,55 +141,150 @@ class CustomUserViewSet(CreateListRetrieveViewSet):
         permission_classes=[permissions.IsAuthenticated],
     )
     def subscribe(self, request, *args, **kwargs):
-        instance = self.get_object()
-        author = get_object_or_404(CustomUser, id=instance.id)
+        author = self.get_object()
         user = self.request.user
-        subscribe = Subscription.objects.filter(users=user, authors=author)
-        if subscribe.exists() or author == user:
+        subscription = None
+        if author != user:
+            subscription = create_unique(
+                Subscription, users=user, authors=author
+            )
+        if subscription is None:
             return Response(
                 {'errors': 'string'}, status=status.HTTP_400_BAD_REQUEST
             )
-        subscribe.create(users=user, authors=author)
-        new_subs = subscribe.get(users=user, authors=author)
         serializer = SubscriptionSerializer(
-            new_subs, context={'request': request}
+            subscription, context={'request': request}
         )
         return Response(data=serializer.data, status=status.HTTP_201_CREATED)
 
     @subscribe.mapping.delete
     def subscribe_delete(self, request, *args, **kwargs):
-        instance = self.get_object()
-        author = get_object_or_404(CustomUser, id=instance.id)
-        user = self.request.user
-        subscribe = Subscription.objects.filter(users=user, authors=author)
-        if subscribe.exists():
-            subscribe.delete()
+        deleted, _ = Subscription.objects.filter(
+            users=self.request.user, authors=self.get_object()
+        ).delete()
+        if deleted:
             return Response(status=status.HTTP_204_NO_CONTENT)
         return Response(
             {'errors': 'string'}, status=status.HTTP_400_BAD_REQUEST
         )
 
+    @action(
+        methods=('get',),
+        detail=True,
+        permission_classes=[permissions.IsAuthenticated],
+    )
+    def stats(self, request, *args, **kwargs):
+        stats = get_object_or_404(
+            AuthorStats.objects.select_related('author'),
+            author=self.kwargs['pk'],
+        )
+        return Response(AuthorStatsSerializer(stats).data)
+
+    @action(
+        methods=('get',),
+        detail=False,
+        permission_classes=[permissions.AllowAny],
+    )
+    def top(self, request, *args, **kwargs):
+        ordering = request.query_params.get('ordering', 'followers_count')
+        if ordering not in TOP_AUTHORS_ORDERING:
+            return Response(
+                {'errors': f'ordering: одно из {TOP_AUTHORS_ORDERING}'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        # Сортировка по индексу (-счётчик, автор), без подсчётов по таблицам.
+        queryset = AuthorStats.objects.select_related('author').order_by(
+            f'-{ordering}', 'author'
+        )
+        paginate = self.paginate_queryset(queryset)
+        serializer = AuthorStatsSerializer(paginate, many=True)
+        return self.get_paginated_response(serializer.data)
+
 
 @api_view(['POST'])
 @permission_classes([permissions.IsAuthenticated])
 def set_password(request):
+    if not request.user.password:
+        # В режиме JWT пользователь собран из токена, без хеша пароля.
+        request.user = CustomUser.objects.get(pk=request.user.pk)
     context = {'request': request}
     serializer = settings.SERIALIZERS.set_password(
         data=request.data, context=context
     )
     serializer.is_valid(raise_exception=True)
     new_password = serializer.validated_data.get('new_password')
-    user = CustomUser.objects.get(username=request.user)
+    user = request.user
     user.set_password(new_password)
-    user.save()
+    user.save(update_fields=['password'])
     return Response(status=status.HTTP_204_NO_CONTENT)
 
 
+class JWTTokenCreateView(TokenCreateView):
+    """Вход в режиме AUTH_MODE=jwt: auth_token — access-токен."""
+
+    def _action(self, serializer):
+        user = serializer.user
+        user_logged_in.send(
+            sender=user.__class__, request=self.request, user=user
+        )
+        return Response(data=issue_tokens(user), status=status.HTTP_200_OK)
+
+
+class JWTTokenDestroyView(TokenDestroyView):
+    """Выход: отзывает access-токен и переданный refresh_token."""
+
+    def post(self, request):
+        revoke(request.auth)
+        refresh_token = request.data.get('refresh_token')
+        if refresh_token:
+            revoke(decode(refresh_token, REFRESH))
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+@api_view(['POST'])
+@permission_classes([permissions.AllowAny])
+def refresh_token(request):
+    """Новая пара токенов по refresh_token, старый отзывается."""
+    token = request.data.get('refresh_token')
+    if not token:
+        return Response(
+            {'errors': 'Не передан refresh_token'},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    claims = decode(token, REFRESH)
+    user = CustomUser.objects.filter(pk=claims['sub'], is_active=True).first()
+    if user is None:
+        return Response(
+            {'errors': 'Пользователь не найден'},
+            status=status.HTTP_401_UNAUTHORIZED,
+        )
+    if claims.get('pwd') != get_password_marker(user):
+        return Response(
+            {'errors': 'Пароль изменён, войдите заново'},
+            status=status.HTTP_401_UNAUTHORIZED,
+        )
+    revoke(claims)
+    return Response(issue_tokens(user))
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAdminUser])
+def export_data(request):
+    response = StreamingHttpResponse(
+        iter_export(), content_type='application/x-ndjson; charset=utf-8'
+    )
+    response['Content-Disposition'] = 'attachment; filename="foodgram.ndjson"'
+    return response
+
+
 class TagViewSet(viewsets.ReadOnlyModelViewSet):
     queryset = Tag.objects.all()
     serializer_class = TagSerializer
     pagination_class = None
 
+    def list(self, request, *args, **kwargs):
+        return Response(get_reference('tags'))
+
 
 class IngredientViewSet(viewsets.ReadOnlyModelViewSet):
     queryset = Ingredient.objects.all()
@@ -132,6 +292,22 @@ class IngredientViewSet(viewsets.ReadOnlyModelViewSet):
     pagination_class = None
     filter_backends = (IngredientSearchFilter,)
     search_fields = ['name']
+    throttle_costs = {'list': 5}
+
+    def list(self, request, *args, **kwargs):
+        # Поиск как у SearchFilter (icontains по каждому слову), но по
+        # справочнику в памяти.
+        terms = [
+            term.lower()
+            for term in IngredientSearchFilter().get_search_terms(request)
+        ]
+        ingredients = get_reference('ingredients')
+        if terms:
+            ingredients = [
+                ingredient for ingredient in ingredients
+                if all(term in ingredient['name'].lower() for term in terms)
+            ]
+        return Response(ingredients)
 
 
 class RecipeViewSet(viewsets.ModelViewSet):
@@ -139,6 +315,13 @@ class RecipeViewSet(viewsets.ModelViewSet):
     permission_classes = (permissions.IsAuthenticatedOrReadOnly,)
     filter_backends = (DjangoFilterBackend,)
     filterset_class = RecipeFilter
+    throttle_costs = {
+        'create': 10,
+        'update': 10,
+        'partial_update': 10,
+        'download_shopping_cart': 20,
+        'upload_image': 10,
+    }
 
     def get_serializer_class(self):
         if self.request.method in permissions.SAFE_METHODS:
@@ -170,58 +353,153 @@ class RecipeViewSet(viewsets.ModelViewSet):
         permission_classes=[permissions.IsAuthenticated],
     )
     def download_shopping_cart(self, request, *args, **kwargs):
-        cart_data = (
-            self.request.user.users_cart.all()
-            .annotate(num_ingredients=Count(
-                'recipes__recipeingredient_recipe'
-            ))
-            .order_by('recipes')
-        )
-        text = '-----------------------Корзина------------------------'
-        for cart in cart_data:
-            text += f'\nНазвание рецепта: {cart.recipes.name}'
-            for nuber in range(cart.num_ingredients):
-                ingr = cart.recipes.recipeingredient_recipe.all().order_by(
-                    'ingredients'
-                )[nuber]
-                measurement_unit = ingr.ingredients.measurement_unit
-                amount = ingr.amount
-                text += f'\n - {ingr}, {measurement_unit} - {amount}'
-            text += '\n------------------------------------------------------'
-        file = StringIO(text)
+        file = StringIO(get_shopping_list(self.request.user))
         response = HttpResponse(file, content_type='text/plain; charset=utf8')
         return response
 
     @action(
         methods=('post',),
-        detail=True,
+        detail=False,
+        url_path='images',
+        parser_classes=(MultiPartParser,),
         permission_classes=[permissions.IsAuthenticated],
     )
-    def shopping_cart(self, request, *args, **kwargs):
+    def upload_image(self, request, *args, **kwargs):
+        """Картинка multipart-запросом, токен передаётся в поле image.
+
+        Файл больше FILE_UPLOAD_MAX_MEMORY_SIZE Django пишет на диск
+        частями, а не держит в памяти.
+        """
+        serializer = ImageUploadSerializer(
+            data=request.data, context={'request': request}
+        )
+        serializer.is_valid(raise_exception=True)
+        serializer.save(user=request.user)
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+    def add_recipe(self, model, error, **fields):
         instance = self.get_object()
-        cart = Cart.objects.filter(users=self.request.user, recipes=instance)
-        if cart.exists():
+        if create_unique(
+            model, users=self.request.user, recipes=instance, **fields
+        ):
+            serializer = UniversalRecipeSerializer(
+                instance, context={'request': self.request}
+            )
             return Response(
-                {'errors': 'Этот рецепт уже добавлен в корзину'},
-                status=status.HTTP_400_BAD_REQUEST,
+                data=serializer.data, status=status.HTTP_201_CREATED
             )
-        cart.create(users=self.request.user, recipes=instance)
+        return Response({'errors': error}, status=status.HTTP_400_BAD_REQUEST)
+
+    def remove_recipe(self, model, error):
+        deleted, _ = model.objects.filter(
+            users=self.request.user, recipes=self.get_object()
+        ).delete()
+        if deleted:
+            return Response(status=status.HTTP_204_NO_CONTENT)
+        return Response({'errors': error}, status=status.HTTP_400_BAD_REQUEST)
+
+    def change_recipes(self, model):
+        """Добавляет или удаляет пачку рецептов одним запросом к базе."""
+        serializer = BulkRecipesSerializer(data=self.request.data)
+        serializer.is_valid(raise_exception=True)
+        pks = serializer.validated_data['recipes']
+        user = self.request.user
+        if self.request.method == 'DELETE':
+            model.objects.filter(users=user, recipes__in=pks).delete()
+        else:
+            create_bulk(model, user, pks)
+        return pks
+
+    def get_cart_summary(self, status_code=status.HTTP_200_OK):
+        recipes = Recipe.objects.filter(recipes_cart__users=self.request.user)
         serializer = UniversalRecipeSerializer(
-            instance, context={'request': request}
+            recipes, many=True, context={'request': self.request}
+        )
+        return Response(
+            data={'count': len(serializer.data), 'recipes': serializer.data},
+            status=status_code,
+        )
+
+    @action(
+        methods=('post',),
+        detail=True,
+        permission_classes=[permissions.IsAuthenticated],
+    )
+    def shopping_cart(self, request, *args, **kwargs):
+        serializer = ServingsSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        return self.add_recipe(
+            Cart,
+            'Этот рецепт уже добавлен в корзину',
+            **serializer.validated_data,
         )
-        return Response(data=serializer.data, status=status.HTTP_201_CREATED)
+
+    @shopping_cart.mapping.patch
+    def shopping_cart_servings(self, request, *args, **kwargs):
+        serializer = ServingsSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        cart = Cart.objects.filter(
+            users=request.user, recipes=self.get_object()
+        )
+        updated = cart.update(
+            servings=serializer.validated_data.get('servings')
+        )
+        record_bulk(cart, 'updated')
+        if not updated:
+            return Response(
+                {'errors': 'Этого рецепта нет в корзине'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        return Response(serializer.data)
 
     @shopping_cart.mapping.delete
     def shopping_cart_delete(self, request, *args, **kwargs):
-        instance = self.get_object()
-        cart = Cart.objects.filter(users=self.request.user, recipes=instance)
-        if cart.exists():
-            cart.delete()
-            return Response(status=status.HTTP_204_NO_CONTENT)
-        return Response(
-            {'errors': 'Этот рецепт уже удален из корзины'},
-            status=status.HTTP_400_BAD_REQUEST,
+        return self.remove_recipe(Cart, 'Этот рецепт уже удален из корзины')
+
+    @action(
+        methods=('post', 'delete'),
+        detail=False,
+        url_path='shopping_cart',
+        permission_classes=[permissions.IsAuthenticated],
+    )
+    @transaction.atomic
+    def shopping_cart_bulk(self, request, *args, **kwargs):
+        self.change_recipes(Cart)
+        if request.method == 'DELETE':
+            return self.get_cart_summary()
+        return self.get_cart_summary(status.HTTP_201_CREATED)
+
+    @action(
+        methods=('post',),
+        detail=False,
+        url_path='shopping_cart/by_filter',
+        permission_classes=[permissions.IsAuthenticated],
+    )
+    @transaction.atomic
+    def shopping_cart_by_filter(self, request, *args, **kwargs):
+        pks = list(
+            self.filter_queryset(self.get_queryset())
+            .values_list('pk', flat=True)[:BULK_RECIPES_LIMIT + 1]
         )
+        if len(pks) > BULK_RECIPES_LIMIT:
+            return Response(
+                {'errors': f'Фильтру подходит больше {BULK_RECIPES_LIMIT} '
+                           f'рецептов'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        create_bulk(Cart, request.user, pks)
+        return self.get_cart_summary(status.HTTP_201_CREATED)
+
+    @action(
+        methods=('delete',),
+        detail=False,
+        url_path='shopping_cart/clear',
+        permission_classes=[permissions.IsAuthenticated],
+    )
+    @transaction.atomic
+    def shopping_cart_clear(self, request, *args, **kwargs):
+        Cart.objects.filter(users=request.user).delete()
+        return self.get_cart_summary()
 
     @action(
         methods=('post',),
@@ -229,31 +507,120 @@ class RecipeViewSet(viewsets.ModelViewSet):
         permission_classes=[permissions.IsAuthenticated],
     )
     def favorite(self, request, *args, **kwargs):
-        instance = self.get_object()
-        favorite = Favorite.objects.filter(
-            users=self.request.user, recipes=instance
+        return self.add_recipe(
+            Favorite, 'Этот рецепт уже добавлен в избранное'
+        )
+
+    @favorite.mapping.delete
+    def favorite_delete(self, request, *args, **kwargs):
+        return self.remove_recipe(
+            Favorite, 'Этот рецепт уже удален из избранного'
         )
-        if favorite.exists():
+
+    @action(
+        methods=('post', 'delete'),
+        detail=False,
+        url_path='favorite',
+        permission_classes=[permissions.IsAuthenticated],
+    )
+    @transaction.atomic
+    def favorite_bulk(self, request, *args, **kwargs):
+        pks = self.change_recipes(Favorite)
+        if request.method == 'DELETE':
+            return Response(status=status.HTTP_204_NO_CONTENT)
+        serializer = UniversalRecipeSerializer(
+            Recipe.objects.filter(pk__in=pks),
+            many=True,
+            context={'request': request},
+        )
+        return Response(data=serializer.data, status=status.HTTP_201_CREATED)
+
+
+class JobViewSet(
+    mixins.CreateModelMixin,
+    mixins.ListModelMixin,
+    mixins.RetrieveModelMixin,
+    viewsets.GenericViewSet,
+):
+    serializer_class = JobSerializer
+    permission_classes = (permissions.IsAuthenticated,)
+
+    def get_queryset(self):
+        return Job.objects.filter(user=self.request.user)
+
+    def perform_create(self, serializer):
+        kind = serializer.validated_data['kind']
+        serializer.instance = enqueue(
+            kind,
+            user=self.request.user,
+            priority=JobSerializer.PRIORITIES.get(kind, 0),
+        )
+
+    @action(methods=('get',), detail=True)
+    def download(self, request, *args, **kwargs):
+        job = self.get_object()
+        if job.status != Job.DONE or not job.result:
             return Response(
-                {'errors': 'Этот рецепт уже добавлен в избранное'},
+                {'errors': 'Результат задачи ещё не готов'},
                 status=status.HTTP_400_BAD_REQUEST,
             )
-        favorite.create(users=self.request.user, recipes=instance)
-        serializer = UniversalRecipeSerializer(
-            instance, context={'request': request}
+        return FileResponse(
+            job.result.open('rb'),
+            as_attachment=True,
+            filename=job.result.name.rsplit('/', 1)[-1],
         )
-        return Response(data=serializer.data, status=status.HTTP_201_CREATED)
 
-    @favorite.mapping.delete
-    def favorite_delete(self, request, *args, **kwargs):
-        instance = self.get_object()
-        favorite = Favorite.objects.filter(
-            users=self.request.user, recipes=instance
+
+class MealPlanViewSet(
+    mixins.CreateModelMixin,
+    mixins.ListModelMixin,
+    mixins.RetrieveModelMixin,
+    mixins.DestroyModelMixin,
+    viewsets.GenericViewSet,
+):
+    serializer_class = MealPlanSerializer
+    permission_classes = (permissions.IsAuthenticated,)
+
+    def get_queryset(self):
+        return MealPlan.objects.filter(
+            user=self.request.user
+        ).prefetch_related('entries__recipe')
+
+    def perform_create(self, serializer):
+        serializer.save(user=self.request.user)
+
+    @action(methods=('post',), detail=True)
+    def entries(self, request, *args, **kwargs):
+        plan = self.get_object()
+        serializer = MealPlanEntrySerializer(
+            data=request.data, context={'request': request, 'plan': plan}
         )
-        if favorite.exists():
-            favorite.delete()
+        serializer.is_valid(raise_exception=True)
+        serializer.instance = add_entry(plan, **serializer.validated_data)
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+    @action(
+        methods=('patch', 'delete'),
+        detail=True,
+        url_path=r'entries/(?P<entry_id>\d+)',
+    )
+    def entry(self, request, entry_id, *args, **kwargs):
+        plan = self.get_object()
+        entry = get_object_or_404(plan.entries, pk=entry_id)
+        if request.method == 'DELETE':
+            remove_entry(entry)
             return Response(status=status.HTTP_204_NO_CONTENT)
-        return Response(
-            {'errors': 'Этот рецепт уже удален из избранного'},
-            status=status.HTTP_400_BAD_REQUEST,
+        serializer = MealPlanEntrySerializer(
+            entry,
+            data=request.data,
+            partial=True,
+            context={'request': request, 'plan': plan},
         )
+        serializer.is_valid(raise_exception=True)
+        change_entry(entry, **serializer.validated_data)
+        return Response(serializer.data)
+
+    @action(methods=('get',), detail=True)
+    def download_shopping_list(self, request, *args, **kwargs):
+        file = StringIO(get_plan_shopping_list(self.get_object()))
+        return HttpResponse(file, content_type='text/plain; charset=utf8')
@@ -0,0 +1,76 @@
+import random
+import threading
+import time
+
+from django.conf import settings
+from django.db import connections
+
+PRIMARY_DB = 'default'
+
+_state = threading.local()
+_replica_lag = {}
+
+
+def use_primary(value=True):
+    """Направляет чтение текущего потока на основную базу."""
+    _state.use_primary = value
+
+
+def is_primary_pinned():
+    # Вне HTTP-запросов (команды, воркеры) читаем с основной базы.
+    return getattr(_state, 'use_primary', True)
+
+
+def get_replica_lag(alias):
+    """Отставание реплики в секундах, кешируется на несколько секунд."""
+    if alias in _replica_lag:
+        checked_at, lag = _replica_lag[alias]
+        if time.monotonic() - checked_at < settings.REPLICA_LAG_CHECK_INTERVAL:
+            return lag
+    connection = connections[alias]
+    if connection.vendor == 'postgresql':
+        try:
+            with connection.cursor() as cursor:
+                # Без новых записей на основной базе время последней
+                # применённой транзакции растёт: догнавшая реплика
+                # (принятый WAL применён целиком) не отстаёт.
+                cursor.execute(
+                    'SELECT CASE WHEN pg_last_wal_receive_lsn() '
+                    '= pg_last_wal_replay_lsn() THEN 0 '
+                    'ELSE COALESCE(EXTRACT(EPOCH FROM '
+                    'now() - pg_last_xact_replay_timestamp()), 0) END'
+                )
+                lag = float(cursor.fetchone()[0])
+        except Exception:
+            lag = float('inf')
+    else:
+        lag = 0.0
+    _replica_lag[alias] = (time.monotonic(), lag)
+    return lag
+
+
+def get_replicas():
+    return [
+        alias for alias in settings.DATABASES
+        if alias.startswith('replica_')
+        and get_replica_lag(alias) <= settings.REPLICA_MAX_LAG
+    ]
+
+
+class PrimaryReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if is_primary_pinned():
+            return PRIMARY_DB
+        replicas = get_replicas()
+        if not replicas:
+            return PRIMARY_DB
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        return PRIMARY_DB
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == PRIMARY_DB
@@ -0,0 +1,90 @@
+import hashlib
+import re
+
+from django.conf import settings
+from django.core.cache import cache
+from django.middleware.gzip import GZipMiddleware
+from django.utils.cache import patch_vary_headers
+
+from .db_router import use_primary
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+PIN_COOKIE = 'primary_db_pin'
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+def get_pin_key(request):
+    authorization = request.META.get('HTTP_AUTHORIZATION')
+    if not authorization:
+        return None
+    digest = hashlib.sha1(authorization.encode()).hexdigest()
+    return f'primary-db-pin:{digest}'
+
+
+class ReplicaPinMiddleware:
+    """Чтение с реплик для безопасных запросов.
+
+    После собственной записи клиент несколько секунд читает с основной
+    базы (cookie и кеш по заголовку Authorization), чтобы сразу видеть
+    свои изменения.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        pin_key = get_pin_key(request)
+        pinned = (
+            request.method not in SAFE_METHODS
+            or PIN_COOKIE in request.COOKIES
+            or (pin_key is not None and cache.get(pin_key, False))
+        )
+        use_primary(pinned)
+        try:
+            response = self.get_response(request)
+        finally:
+            use_primary()
+        if request.method not in SAFE_METHODS and response.status_code < 400:
+            response.set_cookie(
+                PIN_COOKIE, '1', max_age=settings.REPLICA_PIN_SECONDS
+            )
+            if pin_key is not None:
+                cache.set(pin_key, True, settings.REPLICA_PIN_SECONDS)
+        return response
+
+
+class CompressionMiddleware(GZipMiddleware):
+    """Brotli для клиентов, которые его принимают, иначе gzip.
+
+    Потоковые ответы всегда сжимаются gzip.
+    """
+
+    accepts_brotli = re.compile(r'\bbr\b')
+
+    def process_response(self, request, response):
+        if (
+            brotli is None
+            or response.streaming
+            or response.has_header('Content-Encoding')
+            or len(response.content) < 200
+            or not self.accepts_brotli.search(
+                request.META.get('HTTP_ACCEPT_ENCODING', '')
+            )
+        ):
+            return super().process_response(request, response)
+        patch_vary_headers(response, ('Accept-Encoding',))
+        compressed = brotli.compress(
+            response.content, quality=settings.BROTLI_QUALITY
+        )
+        if len(compressed) >= len(response.content):
+            return response
+        response.content = compressed
+        response['Content-Length'] = str(len(compressed))
+        if response.has_header('ETag'):
+            response['ETag'] = re.sub(r'"$', ';br"', response['ETag'])
+        response['Content-Encoding'] = 'br'
+        return response
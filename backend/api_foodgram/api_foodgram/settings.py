@@ -1,3 +1,4 @@
+import importlib.util
 import os
 from pathlib import Path
 
@@ -25,6 +26,10 @@ INSTALLED_APPS = [
     "api.apps.ApiConfig",
     "recipes.apps.RecipesConfig",
     "users.apps.UsersConfig",
+    "jobs.apps.JobsConfig",
+    "outbox.apps.OutboxConfig",
+    "invalidation.apps.InvalidationConfig",
+    "monitoring.apps.MonitoringConfig",
     "colorfield",
     "rest_framework",
     "rest_framework.authtoken",
@@ -33,6 +38,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "monitoring.middleware.MetricsMiddleware",
+    "api_foodgram.middleware.CompressionMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -40,6 +47,7 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "api_foodgram.middleware.ReplicaPinMiddleware",
 ]
 
 ROOT_URLCONF = "api_foodgram.urls"
@@ -87,6 +95,91 @@ else:
         }
     }
 
+# Изменения запроса и события outbox фиксируются одной транзакцией.
+DATABASES['default']['ATOMIC_REQUESTS'] = True
+
+# Реплики только для чтения: хосты PostgreSQL или файлы SQLite
+# через запятую, например DB_REPLICAS=replica1,replica2.
+DB_REPLICAS = [
+    replica for replica in os.getenv('DB_REPLICAS', default='').split(',')
+    if replica
+]
+for number, replica in enumerate(DB_REPLICAS, start=1):
+    DATABASES[f'replica_{number}'] = dict(
+        DATABASES['default'],
+        TEST={'MIRROR': 'default'},
+        **(
+            {'HOST': replica} if 'DB_ENGINE' in os.environ
+            else {'NAME': str(BASE_DIR / replica)}
+        ),
+    )
+
+DATABASE_ROUTERS = ["api_foodgram.db_router.PrimaryReplicaRouter"]
+
+# Сколько секунд после записи пользователь читает с основной базы.
+REPLICA_PIN_SECONDS = int(os.getenv('REPLICA_PIN_SECONDS', default=5))
+# Максимально допустимое отставание реплики в секундах.
+REPLICA_MAX_LAG = float(os.getenv('REPLICA_MAX_LAG', default=2))
+REPLICA_LAG_CHECK_INTERVAL = 10
+
+
+# Cache
+# В продакшене нужен общий для всех воркеров бэкенд (memcached, база данных).
+
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv(
+            'CACHE_BACKEND',
+            default='django.core.cache.backends.locmem.LocMemCache'
+        ),
+        'LOCATION': os.getenv('CACHE_LOCATION', default=''),
+    }
+}
+
+RECIPE_CACHE_TIMEOUT = 60 * 60
+RECIPE_LOCAL_CACHE_SIZE = 1000
+
+# Кеши в памяти воркеров сбрасываются по версиям из таблицы
+# invalidation, версии перечитываются не чаще раза в секунду.
+INVALIDATION_POLL_INTERVAL = 1
+
+# Теги и ингредиенты в памяти воркера.
+REFERENCE_CACHE_TIMEOUT = 60 * 60
+
+# Кеш токенов: в общем кеше сбрасывается при выходе и смене пароля,
+# в памяти воркеров — через шину инвалидации.
+TOKEN_CACHE_TIMEOUT = 5 * 60
+TOKEN_LOCAL_CACHE_TIMEOUT = 5 * 60
+TOKEN_LOCAL_CACHE_SIZE = 10000
+
+
+# Password hashing
+
+# Первый хешер используется для новых паролей, остальные только
+# проверяют старые хеши и при входе заменяются первым.
+PASSWORD_HASHERS = [
+    "users.hashers.BoundedPBKDF2PasswordHasher",
+    "django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher",
+]
+if importlib.util.find_spec("argon2") is not None:
+    PASSWORD_HASHERS.insert(0, "users.hashers.BoundedArgon2PasswordHasher")
+
+# Параметры argon2: память в КиБ на один хеш.
+ARGON2 = {
+    "TIME_COST": int(os.getenv("ARGON2_TIME_COST", default=2)),
+    "MEMORY_COST": int(os.getenv("ARGON2_MEMORY_COST", default=19456)),
+    "PARALLELISM": int(os.getenv("ARGON2_PARALLELISM", default=1)),
+}
+
+# Сколько паролей процесс хеширует одновременно.
+PASSWORD_HASHING_THREADS = int(
+    os.getenv("PASSWORD_HASHING_THREADS", default=2)
+)
+# Сколько запросов ждут места в пуле хеширования, сверх них — 429.
+PASSWORD_HASHING_QUEUE = int(
+    os.getenv("PASSWORD_HASHING_QUEUE", default=16)
+)
+
 
 # Password validation
 
@@ -130,7 +223,41 @@ STATIC_URL = "/static/"
 STATIC_ROOT = os.path.join(BASE_DIR, "static")
 
 MEDIA_URL = "/media/"
-MEDIA_ROOT = os.path.join(BASE_DIR, "media")
+MEDIA_ROOT = os.getenv("MEDIA_ROOT", default=os.path.join(BASE_DIR, "media"))
+
+# Загрузки больше FILE_UPLOAD_MAX_MEMORY_SIZE пишутся во временный файл
+# частями, в памяти процесса остаётся не больше этого размера.
+FILE_UPLOAD_MAX_MEMORY_SIZE = 256 * 1024
+MAX_IMAGE_UPLOAD_SIZE = 10 * 1024 * 1024
+# Сколько секунд токен загруженной картинки ждёт рецепта.
+IMAGE_UPLOAD_TTL = 24 * 60 * 60
+
+
+# Metrics
+
+# Сборщик Prometheus передаёт заголовок "Authorization: Metrics <токен>",
+# без токена /api/metrics доступен только администраторам.
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", default="")
+METRICS_WORKER_THREADS = int(os.getenv("GUNICORN_THREADS", default=1))
+
+# Журнал медленных запросов: порог в мс, доля запросов с EXPLAIN и
+# число хранимых записей (старые перезаписываются).
+SLOW_QUERY_THRESHOLD = float(os.getenv("SLOW_QUERY_THRESHOLD", default=200))
+SLOW_QUERY_EXPLAIN_RATE = float(
+    os.getenv("SLOW_QUERY_EXPLAIN_RATE", default=0.1)
+)
+SLOW_QUERY_LOG_SIZE = 500
+
+
+# Background jobs
+
+JOB_RESULTS_ROOT = os.path.join(BASE_DIR, "job_results")
+# Воркер обновляет время выполняемой задачи раз в JOB_HEARTBEAT_INTERVAL
+# секунд; задача без обновлений дольше JOB_TIMEOUT возвращается в очередь.
+JOB_HEARTBEAT_INTERVAL = 60
+JOB_TIMEOUT = 10 * 60
+# Базовая задержка повтора, удваивается с каждой попыткой.
+JOB_RETRY_DELAY = 30
 
 
 # Djozer
@@ -142,14 +269,50 @@ DJOSER = {
 
 # Django REST framework
 
+# token — токены в базе (rest_framework.authtoken), jwt — подписанные
+# access/refresh-токены, которые проверяются без обращения к базе.
+AUTH_MODE = os.getenv("AUTH_MODE", default="token")
+
+AUTHENTICATION_CLASSES = {
+    "token": "api.authentication.CachedTokenAuthentication",
+    "jwt": "api.tokens.JWTAuthentication",
+}
+
+JWT = {
+    "SIGNING_KEY": os.getenv("JWT_SIGNING_KEY", default=SECRET_KEY),
+    "ALGORITHM": "HS256",
+    "ACCESS_LIFETIME": 15 * 60,
+    "REFRESH_LIFETIME": 14 * 24 * 60 * 60,
+    "REVOCATION_SYNC_INTERVAL": 30,
+}
+
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework.authentication.TokenAuthentication",
+        AUTHENTICATION_CLASSES[AUTH_MODE],
     ],
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.AllowAny",
     ],
+    "DEFAULT_RENDERER_CLASSES": [
+        "api.renderers.ORJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+        "api.renderers.MessagePackRenderer",
+    ],
     "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
     "PAGE_SIZE": 6,
     "DEFAULT_FILTER_BACKENDS": ["django_filters.rest_framework.DjangoFilterBackend"],
+    "DEFAULT_THROTTLE_CLASSES": [
+        "api.throttles.CostRateThrottle",
+    ],
+    "NUM_PROXIES": int(os.getenv("NUM_PROXIES", default=1)),
+}
+
+# Уровень сжатия brotli (0-11): 5 быстрее gzip -6 и даёт меньший ответ.
+BROTLI_QUALITY = 5
+
+# Token bucket: ёмкость в жетонах и пополнение в жетонах в секунду.
+# Цены тяжёлых действий заданы в throttle_costs представлений.
+COST_THROTTLE = {
+    "CAPACITY": int(os.getenv("THROTTLE_CAPACITY", default=120)),
+    "REFILL_RATE": float(os.getenv("THROTTLE_REFILL_RATE", default=2)),
 }
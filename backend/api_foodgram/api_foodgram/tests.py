@@ -0,0 +1,107 @@
+from unittest import mock, skipUnless
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+from django.http import HttpResponse
+from django.test import (RequestFactory, SimpleTestCase, TestCase,
+                         override_settings)
+from django.test.utils import CaptureQueriesContext
+
+from . import db_router
+from .db_router import PRIMARY_DB, PrimaryReplicaRouter, use_primary
+from .middleware import PIN_COOKIE, ReplicaPinMiddleware
+
+REPLICA = 'replica_1'
+TWO_DATABASES = dict(settings.DATABASES, **{
+    REPLICA: dict(settings.DATABASES['default'], TEST={'MIRROR': 'default'})
+})
+
+
+class ReplicaLagTests(SimpleTestCase):
+    def setUp(self):
+        db_router._replica_lag.clear()
+        self.addCleanup(db_router._replica_lag.clear)
+
+    def get_lag(self, row):
+        connection = mock.MagicMock(vendor='postgresql')
+        cursor = connection.cursor.return_value.__enter__.return_value
+        cursor.fetchone.return_value = row
+        connections = {REPLICA: connection}
+        with mock.patch.object(db_router, 'connections', connections):
+            lag = db_router.get_replica_lag(REPLICA)
+        return lag, cursor.execute.call_args[0][0]
+
+    def test_caught_up_replica_compares_wal_positions(self):
+        lag, sql = self.get_lag((0,))
+        self.assertEqual(lag, 0)
+        self.assertIn('pg_last_wal_receive_lsn()', sql)
+        self.assertIn('pg_last_wal_replay_lsn()', sql)
+
+    def test_lag_is_cached(self):
+        self.assertEqual(self.get_lag((5.5,))[0], 5.5)
+        self.assertEqual(db_router.get_replica_lag(REPLICA), 5.5)
+
+
+@override_settings(DATABASES=TWO_DATABASES)
+class RouterTests(SimpleTestCase):
+    router = PrimaryReplicaRouter()
+
+    def setUp(self):
+        self.addCleanup(use_primary)
+
+    def route(self, lag):
+        with mock.patch.object(db_router, 'get_replica_lag', return_value=lag):
+            return self.router.db_for_read(None)
+
+    def test_reads_go_to_fresh_replica(self):
+        use_primary(False)
+        self.assertEqual(self.route(0), REPLICA)
+        self.assertEqual(self.route(settings.REPLICA_MAX_LAG + 1), PRIMARY_DB)
+
+    def test_pinned_reads_and_writes_go_to_primary(self):
+        use_primary(True)
+        self.assertEqual(self.route(0), PRIMARY_DB)
+        self.assertEqual(self.router.db_for_write(None), PRIMARY_DB)
+
+
+class ReplicaPinMiddlewareTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.factory = RequestFactory()
+        self.pinned = []
+
+        def view(request):
+            self.pinned.append(db_router.is_primary_pinned())
+            return HttpResponse()
+
+        self.middleware = ReplicaPinMiddleware(view)
+
+    def test_write_pins_following_reads(self):
+        headers = {'HTTP_AUTHORIZATION': 'Token key'}
+        self.middleware(self.factory.get('/api/recipes/', **headers))
+        response = self.middleware(
+            self.factory.post('/api/recipes/', **headers)
+        )
+        self.assertIn(PIN_COOKIE, response.cookies)
+        # Тот же клиент без cookie: закреплён по заголовку Authorization.
+        self.middleware(self.factory.get('/api/recipes/', **headers))
+        self.assertEqual(self.pinned, [False, True, True])
+
+
+@skipUnless(
+    settings.DB_REPLICAS,
+    'Нужна вторая база: DB_REPLICAS=replica.sqlite3 python manage.py test',
+)
+class ReplicaDatabaseTests(TestCase):
+    databases = {'default', REPLICA}
+
+    def setUp(self):
+        cache.clear()
+        db_router._replica_lag.clear()
+
+    def test_anonymous_reads_use_replica(self):
+        with CaptureQueriesContext(connections[REPLICA]) as replica:
+            response = self.client.get('/api/tags/')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(replica.captured_queries)
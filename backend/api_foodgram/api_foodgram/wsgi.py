@@ -1,7 +1,22 @@
+import logging
 import os
 
 from django.core.wsgi import get_wsgi_application
+from django.db import DatabaseError, connections
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "api_foodgram.settings")
 
 application = get_wsgi_application()
+
+# С gunicorn --preload это выполняется один раз в мастере: справочники
+# загружаются до fork и достаются воркерам общими страницами памяти.
+try:
+    from api.reference import warm_up
+
+    warm_up()
+except DatabaseError:
+    logging.getLogger(__name__).warning(
+        "Reference data is not loaded before fork", exc_info=True
+    )
+# Соединения с базой нельзя делить между процессами.
+connections.close_all()
@@ -0,0 +1,47 @@
+import gc
+import multiprocessing
+import os
+import shutil
+import tempfile
+
+# Каталог mmap-файлов метрик Prometheus общий для воркеров. Задаётся до
+# загрузки приложения: preload_app импортирует его в мастере. Файлы
+# прошлого запуска удаляются, иначе их счётчики суммировались бы заново.
+metrics_dir = os.environ.setdefault(
+    "PROMETHEUS_MULTIPROC_DIR",
+    os.path.join(tempfile.gettempdir(), "foodgram-metrics"),
+)
+shutil.rmtree(metrics_dir, ignore_errors=True)
+os.makedirs(metrics_dir, exist_ok=True)
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:8000")
+
+# Приложение импортируется один раз в мастере, воркеры получают его
+# через fork: старт быстрее и меньше памяти за счёт copy-on-write.
+preload_app = True
+
+cores = multiprocessing.cpu_count()
+workers = int(os.getenv("GUNICORN_WORKERS", cores * 2 + 1))
+threads = int(os.environ.setdefault("GUNICORN_THREADS", "2"))
+worker_class = "gthread" if threads > 1 else "sync"
+
+# Перезапуск воркеров ограничивает рост памяти, разброс не даёт им
+# перезапускаться одновременно.
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", 2000))
+max_requests_jitter = max_requests // 10
+timeout = int(os.getenv("GUNICORN_TIMEOUT", 60))
+graceful_timeout = 30
+keepalive = 5
+accesslog = "-"
+
+
+def pre_fork(server, worker):
+    # Объекты, загруженные до fork, уходят из-под сборщика мусора:
+    # его проход иначе трогает их заголовки и копирует страницы.
+    gc.freeze()
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+
+    multiprocess.mark_process_dead(worker.pid)
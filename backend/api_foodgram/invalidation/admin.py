@@ -0,0 +1,14 @@
+from django.contrib import admin
+
+from .models import CacheVersion
+
+
+@admin.register(CacheVersion)
+class CacheVersionAdmin(admin.ModelAdmin):
+    list_display = (
+        "namespace",
+        "version",
+        "updated",
+    )
+    readonly_fields = ("namespace", "version", "updated")
+    empty_value_display = "-пусто-"
@@ -0,0 +1,160 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F
+
+from .models import CacheVersion
+
+logger = logging.getLogger(__name__)
+
+PRIMARY_DB = 'default'
+
+# Последние прочитанные из базы версии: {пространство: версия}.
+_versions = {}
+_synced_at = float('-inf')
+# Локальные кеши по пространствам, чтобы сбрасывать их без опроса.
+_caches = {}
+
+
+def sync(force=False):
+    """Перечитывает версии не чаще INVALIDATION_POLL_INTERVAL секунд."""
+    global _versions, _synced_at
+    now = time.monotonic()
+    if not force and now - _synced_at < settings.INVALIDATION_POLL_INTERVAL:
+        return
+    # Реплика может отставать, версии читаем с основной базы.
+    _versions = dict(
+        CacheVersion.objects.using(PRIMARY_DB)
+        .values_list('namespace', 'version')
+    )
+    _synced_at = now
+
+
+def get_version(namespace):
+    sync()
+    return _versions.get(namespace, 0)
+
+
+class Bump:
+    """Увеличивает версию пространства после коммита транзакции."""
+
+    def __init__(self, namespace):
+        self.namespace = namespace
+
+    def __eq__(self, other):
+        return isinstance(other, Bump) and other.namespace == self.namespace
+
+    def __hash__(self):
+        return hash(self.namespace)
+
+    def __call__(self):
+        versions = CacheVersion.objects.using(PRIMARY_DB).filter(
+            namespace=self.namespace
+        )
+        try:
+            if not versions.update(version=F('version') + 1):
+                _, created = CacheVersion.objects.using(
+                    PRIMARY_DB
+                ).get_or_create(namespace=self.namespace,
+                                defaults={'version': 1})
+                if not created:
+                    versions.update(version=F('version') + 1)
+            sync(force=True)
+        except Exception:
+            logger.exception('Cache version %s was not bumped',
+                             self.namespace)
+
+
+def bump(namespace):
+    """Сбрасывает пространство в этом процессе сразу, в остальных — после
+    коммита и их очередного опроса версий."""
+    for cache in _caches.get(namespace, ()):
+        cache.clear()
+    callback = Bump(namespace)
+    # Одно увеличение версии на транзакцию, сколько бы сигналов ни было.
+    if any(func == callback for _, func in connection.run_on_commit):
+        return
+    transaction.on_commit(callback)
+
+
+class LocalCache:
+    """LRU в памяти процесса, согласованный между воркерами.
+
+    Записи живут, пока не изменилась версия пространства namespace,
+    но не дольше timeout секунд, если он задан.
+    """
+
+    def __init__(self, namespace, size, timeout=None):
+        self.namespace = namespace
+        self.size = size
+        self.timeout = timeout
+        self._data = OrderedDict()
+        self._version = None
+        self._generation = 0
+        self._lock = threading.Lock()
+        _caches.setdefault(namespace, []).append(self)
+
+    def _check(self, version):
+        if version != self._version:
+            self._data.clear()
+            self._version = version
+
+    def get_state(self):
+        """Состояние до загрузки данных, передаётся в set_many."""
+        version = get_version(self.namespace)
+        with self._lock:
+            self._check(version)
+            return (self._version, self._generation)
+
+    def get_many(self, keys):
+        version = get_version(self.namespace)
+        now = time.monotonic()
+        found = {}
+        with self._lock:
+            self._check(version)
+            for key in keys:
+                entry = self._data.get(key)
+                if entry is None:
+                    continue
+                expires, value = entry
+                if expires is not None and expires <= now:
+                    del self._data[key]
+                    continue
+                self._data.move_to_end(key)
+                found[key] = value
+        return found
+
+    def get(self, key, default=None):
+        return self.get_many([key]).get(key, default)
+
+    def set_many(self, mapping, state=None):
+        """Сохраняет значения, если с get_state() кеш не сбрасывали."""
+        expires = None
+        if self.timeout is not None:
+            expires = time.monotonic() + self.timeout
+        with self._lock:
+            if state is not None and state != (
+                self._version, self._generation
+            ):
+                return
+            for key, value in mapping.items():
+                self._data[key] = (expires, value)
+                self._data.move_to_end(key)
+            while len(self._data) > self.size:
+                self._data.popitem(last=False)
+
+    def set(self, key, value, state=None):
+        self.set_many({key: value}, state)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._generation += 1
@@ -0,0 +1,19 @@
+from django.db import models
+
+
+class CacheVersion(models.Model):
+    """Версия пространства ключей, общая для всех воркеров."""
+
+    namespace = models.CharField(
+        verbose_name="Пространство ключей", unique=True, max_length=100
+    )
+    version = models.BigIntegerField(verbose_name="Версия", default=0)
+    updated = models.DateTimeField(verbose_name="Изменено", auto_now=True)
+
+    def __str__(self):
+        return f"{self.namespace} v{self.version}"
+
+    class Meta:
+        ordering = ("namespace",)
+        verbose_name = "Версия кеша"
+        verbose_name_plural = "Версии кешей"
@@ -0,0 +1,21 @@
+from django.contrib import admin
+
+from .models import Job
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = (
+        "pk",
+        "kind",
+        "user",
+        "status",
+        "priority",
+        "attempts",
+        "run_at",
+        "updated",
+    )
+    list_filter = ("status", "kind")
+    search_fields = ("kind", "user__username")
+    list_select_related = ("user",)
+    empty_value_display = "-пусто-"
@@ -0,0 +1,37 @@
+import logging
+import time
+
+from django.core.management import BaseCommand
+from jobs.queue import claim_job, requeue_stale, run_job
+
+logging.basicConfig(
+    format="%(asctime)s - %(levelname)s - %(message)s", level=logging.INFO
+)
+
+
+class Command(BaseCommand):
+    help = "Runs queued jobs from the database"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sleep', type=float, default=1.0,
+            help='Seconds to wait when the queue is empty',
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Exit when the queue is empty',
+        )
+
+    def handle(self, *args, **options):
+        logging.info("Worker started")
+        while True:
+            requeue_stale()
+            job = claim_job()
+            if job is None:
+                if options['once']:
+                    break
+                time.sleep(options['sleep'])
+                continue
+            logging.info("Running job %s", job)
+            job = run_job(job)
+            logging.info("Job %s is %s", job, job.status)
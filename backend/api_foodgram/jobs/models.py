@@ -0,0 +1,74 @@
+from django.contrib.auth import get_user_model
+from django.db import models
+from django.utils import timezone
+
+from .storage import JobResultsStorage
+
+User = get_user_model()
+
+results_storage = JobResultsStorage()
+
+
+class Job(models.Model):
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    STATUS_CHOICES = (
+        (QUEUED, "В очереди"),
+        (RUNNING, "Выполняется"),
+        (DONE, "Готово"),
+        (FAILED, "Ошибка"),
+    )
+
+    kind = models.CharField(verbose_name="Тип задачи", max_length=50)
+    payload = models.TextField(verbose_name="Параметры", default="{}")
+    user = models.ForeignKey(
+        User,
+        related_name="jobs",
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        verbose_name="Пользователь",
+    )
+    status = models.CharField(
+        verbose_name="Статус",
+        max_length=10,
+        choices=STATUS_CHOICES,
+        default=QUEUED,
+    )
+    priority = models.SmallIntegerField(verbose_name="Приоритет", default=0)
+    attempts = models.PositiveSmallIntegerField(
+        verbose_name="Попытки", default=0
+    )
+    max_attempts = models.PositiveSmallIntegerField(
+        verbose_name="Максимум попыток", default=3
+    )
+    run_at = models.DateTimeField(
+        verbose_name="Запустить после", default=timezone.now
+    )
+    result = models.FileField(
+        verbose_name="Результат",
+        storage=results_storage,
+        upload_to="%Y/%m/%d/",
+        blank=True,
+    )
+    error = models.TextField(verbose_name="Ошибка", blank=True)
+    created = models.DateTimeField(
+        verbose_name="Создана", auto_now_add=True
+    )
+    updated = models.DateTimeField(verbose_name="Обновлена", auto_now=True)
+
+    def __str__(self):
+        return f"{self.kind} #{self.pk}"
+
+    class Meta:
+        indexes = [
+            models.Index(
+                name="job_queue",
+                fields=["status", "-priority", "run_at"],
+            )
+        ]
+        ordering = ("-created",)
+        verbose_name = "Задача"
+        verbose_name_plural = "Задачи"
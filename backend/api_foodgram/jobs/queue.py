@@ -0,0 +1,109 @@
+import json
+import logging
+import threading
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import DatabaseError, connection
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Job
+from .tasks import TASKS
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue(kind, user=None, payload=None, priority=0):
+    if kind not in TASKS:
+        raise ValueError(f'Unknown job kind: {kind}')
+    return Job.objects.create(
+        kind=kind,
+        user=user,
+        payload=json.dumps(payload or {}),
+        priority=priority,
+    )
+
+
+def requeue_stale():
+    """Возвращает в очередь задачи воркеров, которые не дожили до конца.
+
+    Живой воркер обновляет updated задачи через Heartbeat, поэтому
+    долгая задача не уходит второму воркеру.
+    """
+    deadline = timezone.now() - timedelta(seconds=settings.JOB_TIMEOUT)
+    return Job.objects.filter(
+        status=Job.RUNNING, updated__lt=deadline
+    ).update(status=Job.QUEUED)
+
+
+def claim_job():
+    """Забирает задачу условным UPDATE, без блокировок строк.
+
+    Если задачу одновременно забрал другой воркер, UPDATE изменит
+    ноль строк и будет взят следующий кандидат.
+    """
+    candidates = (
+        Job.objects.filter(status=Job.QUEUED, run_at__lte=timezone.now())
+        .order_by('-priority', 'run_at', 'id')
+        .values_list('pk', flat=True)[:10]
+    )
+    for pk in candidates:
+        claimed = Job.objects.filter(pk=pk, status=Job.QUEUED).update(
+            status=Job.RUNNING,
+            attempts=F('attempts') + 1,
+            updated=timezone.now(),
+        )
+        if claimed:
+            return Job.objects.select_related('user').get(pk=pk)
+    return None
+
+
+class Heartbeat(threading.Thread):
+    """Обновляет updated выполняемой задачи, пока она не закончится."""
+
+    def __init__(self, job):
+        super().__init__(name=f'job-heartbeat-{job.pk}', daemon=True)
+        self.job_id = job.pk
+        self.finished = threading.Event()
+
+    def run(self):
+        try:
+            while not self.finished.wait(settings.JOB_HEARTBEAT_INTERVAL):
+                try:
+                    Job.objects.filter(
+                        pk=self.job_id, status=Job.RUNNING
+                    ).update(updated=timezone.now())
+                except DatabaseError:
+                    logger.exception('Heartbeat of job %s failed', self.job_id)
+        finally:
+            connection.close()
+
+    def stop(self):
+        self.finished.set()
+        self.join()
+
+
+def run_job(job):
+    heartbeat = Heartbeat(job)
+    heartbeat.start()
+    try:
+        TASKS[job.kind](job, json.loads(job.payload))
+    except Exception:
+        job.error = traceback.format_exc()
+        if job.attempts < job.max_attempts:
+            job.status = Job.QUEUED
+            job.run_at = timezone.now() + timedelta(
+                seconds=settings.JOB_RETRY_DELAY * 2 ** (job.attempts - 1)
+            )
+        else:
+            job.status = Job.FAILED
+        logger.exception('Job %s failed', job)
+    else:
+        job.status = Job.DONE
+        job.error = ''
+    finally:
+        heartbeat.stop()
+    job.save()
+    return job
@@ -0,0 +1,29 @@
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
+from django.core.signals import setting_changed
+from django.utils.deconstruct import deconstructible
+from django.utils.functional import cached_property
+
+
+@deconstructible
+class JobResultsStorage(FileSystemStorage):
+    """Результаты задач в settings.JOB_RESULTS_ROOT.
+
+    Каталог читается при первом обращении и не попадает в миграции:
+    у каждого окружения он свой.
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        setting_changed.connect(self._clear_results_root)
+
+    def _clear_results_root(self, setting, **kwargs):
+        if setting == 'JOB_RESULTS_ROOT':
+            self.__dict__.pop('base_location', None)
+            self.__dict__.pop('location', None)
+
+    @cached_property
+    def base_location(self):
+        return self._value_or_setting(
+            self._location, settings.JOB_RESULTS_ROOT
+        )
@@ -0,0 +1,35 @@
+import tempfile
+
+from django.core.files import File
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from recipes.backup import iter_export
+from recipes.utils import get_shopping_list
+
+TASKS = {}
+
+
+def task(kind):
+    def decorator(func):
+        TASKS[kind] = func
+        return func
+    return decorator
+
+
+@task('shopping_list')
+def shopping_list(job, payload):
+    text = get_shopping_list(job.user)
+    job.result.save('shopping_list.txt', ContentFile(text.encode()))
+
+
+@task('export_data')
+def export_data(job, payload):
+    with tempfile.TemporaryFile(mode='w+b') as output:
+        for chunk in iter_export():
+            output.write(chunk.encode())
+        job.result.save('foodgram.ndjson', File(output))
+
+
+@task('load_data')
+def load_data(job, payload):
+    call_command('load_data')
@@ -0,0 +1,61 @@
+import os
+import shutil
+import tempfile
+import time
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, TransactionTestCase, override_settings
+
+from .models import Job
+from .queue import claim_job, enqueue, requeue_stale, run_job
+from .tasks import TASKS
+
+User = get_user_model()
+
+
+class JobResultsStorageTests(TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root, ignore_errors=True)
+
+    def test_location_not_in_migrations(self):
+        storage = Job._meta.get_field('result').storage
+        self.assertEqual(
+            storage.deconstruct(), ('jobs.storage.JobResultsStorage', (), {})
+        )
+
+    def test_result_saved_to_settings_root(self):
+        user = User.objects.create_user(
+            username='user', email='user@example.com', password='pass'
+        )
+        enqueue('shopping_list', user=user)
+        with override_settings(JOB_RESULTS_ROOT=self.root):
+            job = run_job(claim_job())
+            self.assertEqual(job.status, Job.DONE)
+            self.assertTrue(job.result.path.startswith(self.root))
+            self.assertTrue(os.path.exists(job.result.path))
+
+
+@override_settings(JOB_HEARTBEAT_INTERVAL=0.05, JOB_TIMEOUT=0.3)
+class HeartbeatTests(TransactionTestCase):
+    def test_running_job_not_requeued(self):
+        requeued = []
+
+        def slow(job, payload):
+            time.sleep(0.6)
+            requeued.append(requeue_stale())
+
+        with mock.patch.dict(TASKS, {'slow': slow}):
+            enqueue('slow')
+            job = run_job(claim_job())
+        self.assertEqual(requeued, [0])
+        self.assertEqual(job.status, Job.DONE)
+
+    def test_dead_worker_requeued(self):
+        enqueue('shopping_list')
+        job = claim_job()
+        time.sleep(0.4)
+        self.assertEqual(requeue_stale(), 1)
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.QUEUED)
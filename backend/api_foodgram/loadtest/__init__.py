@@ -0,0 +1,4 @@
+"""Нагрузочное тестирование API по сценариям пользователей.
+
+Запуск: ``python -m loadtest --help`` из каталога backend/api_foodgram.
+"""
@@ -0,0 +1,63 @@
+import argparse
+from contextlib import nullcontext
+
+from .local import local_stack
+from .report import format_endpoints, format_saturation, to_json
+from .runner import prepare, run_saturation
+
+
+def get_parser():
+    parser = argparse.ArgumentParser(
+        prog='python -m loadtest',
+        description='Runs user journeys against the API with a stepped '
+                    'number of concurrent users',
+    )
+    parser.add_argument('--host', default='http://localhost',
+                        help='API host, e.g. the docker-compose nginx')
+    parser.add_argument('--local', choices=('gunicorn', 'runserver'),
+                        help='Start a throwaway local server instead of '
+                             'using --host')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--users', default='1,5,10,20,40',
+                        help='Comma separated concurrency steps')
+    parser.add_argument('--duration', type=int, default=30,
+                        help='Seconds per step')
+    parser.add_argument('--think', type=float, default=1.0,
+                        help='Think time multiplier, 0 for no pauses')
+    parser.add_argument('--accounts', type=int,
+                        help='Test accounts, one per user of the largest '
+                             'step by default')
+    parser.add_argument('--image-size', type=int, default=256,
+                        help='Side of the uploaded PNG in pixels')
+    parser.add_argument('--json', help='Write the full report to a file')
+    return parser
+
+
+def print_step(users, stats):
+    print(f'\n== {users} users, {stats.duration:.0f} s')
+    print(format_endpoints(stats))
+
+
+def main():
+    args = get_parser().parse_args()
+    levels = [int(users) for users in args.users.split(',')]
+    stack = (
+        local_stack(args.local, args.port) if args.local
+        else nullcontext(args.host)
+    )
+    with stack as host:
+        context = prepare(
+            host, args.accounts or max(levels), args.image_size, args.think
+        )
+        steps = run_saturation(
+            host, context, levels, args.duration, report=print_step
+        )
+    print('\n== saturation')
+    print(format_saturation(steps))
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as file:
+            file.write(to_json(steps))
+
+
+if __name__ == '__main__':
+    main()
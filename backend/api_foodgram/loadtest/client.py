@@ -0,0 +1,50 @@
+import time
+
+import requests
+
+TIMEOUT = 30
+
+
+class ApiClient:
+    """Сессия одного виртуального пользователя, пишущая замеры в stats.
+
+    name группирует запросы с разными id под одним эндпоинтом,
+    например ``GET /api/recipes/{id}/``.
+    """
+
+    def __init__(self, host, stats, token=None):
+        self.host = host.rstrip('/')
+        self.stats = stats
+        self.session = requests.Session()
+        if token:
+            self.session.headers['Authorization'] = f'Token {token}'
+
+    def request(self, method, path, name=None, **kwargs):
+        name = name or f'{method} {path.split("?")[0]}'
+        kwargs.setdefault('timeout', TIMEOUT)
+        started = time.perf_counter()
+        try:
+            response = self.session.request(
+                method, self.host + path, **kwargs
+            )
+        except requests.RequestException:
+            self.stats.add(name, time.perf_counter() - started, False)
+            return None
+        # Тело читается целиком, как его читал бы клиент.
+        response.content
+        self.stats.add(
+            name, time.perf_counter() - started, response.status_code < 400
+        )
+        return response
+
+    def get(self, path, name=None, **kwargs):
+        return self.request('GET', path, name, **kwargs)
+
+    def post(self, path, name=None, **kwargs):
+        return self.request('POST', path, name, **kwargs)
+
+    def delete(self, path, name=None, **kwargs):
+        return self.request('DELETE', path, name, **kwargs)
+
+    def close(self):
+        self.session.close()
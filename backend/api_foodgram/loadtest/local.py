@@ -0,0 +1,78 @@
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+import requests
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+READY_TIMEOUT = 60
+
+
+def manage(*args, env, check=True):
+    return subprocess.run(
+        [sys.executable, 'manage.py', *args], cwd=BASE_DIR, env=env,
+        check=check, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+
+
+def get_server_command(server, address):
+    if server == 'gunicorn':
+        return [
+            sys.executable, '-m', 'gunicorn', '--config', 'gunicorn.conf.py',
+            '--bind', address, 'api_foodgram.wsgi',
+        ]
+    return [sys.executable, 'manage.py', 'runserver', '--noreload', address]
+
+
+def wait_ready(host, process):
+    deadline = time.monotonic() + READY_TIMEOUT
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f'Server exited with code {process.returncode}')
+        try:
+            if requests.get(f'{host}/api/tags/', timeout=2).ok:
+                return
+        except requests.RequestException:
+            pass
+        time.sleep(0.5)
+    raise RuntimeError(f'Server is not ready in {READY_TIMEOUT} s')
+
+
+@contextmanager
+def local_stack(server='gunicorn', port=8765):
+    """Отдельная база и медиа во временном каталоге и сервер на port.
+
+    Если задан DB_ENGINE (например, PostgreSQL из infra/.env), берётся
+    эта база. Троттлинг отключается, иначе пользователи упрутся в 429.
+    """
+    workdir = tempfile.mkdtemp(prefix='foodgram-loadtest-')
+    env = dict(
+        os.environ,
+        MEDIA_ROOT=os.path.join(workdir, 'media'),
+        THROTTLE_CAPACITY='1000000',
+        THROTTLE_REFILL_RATE='1000000',
+    )
+    if 'DB_ENGINE' not in env:
+        env['DB_ENGINE'] = 'django.db.backends.sqlite3'
+        env['DB_NAME'] = os.path.join(workdir, 'db.sqlite3')
+    manage('migrate', '--no-input', env=env)
+    # Повторная загрузка в непустую базу завершается ошибкой, это не страшно.
+    manage('load_data', env=env, check=False)
+    host = f'http://127.0.0.1:{port}'
+    process = subprocess.Popen(
+        get_server_command(server, f'127.0.0.1:{port}'),
+        cwd=BASE_DIR, env=env,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        wait_ready(host, process)
+        yield host
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+        shutil.rmtree(workdir, ignore_errors=True)
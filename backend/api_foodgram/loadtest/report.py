@@ -0,0 +1,65 @@
+import json
+
+COLUMNS = (
+    ('requests', 'reqs', '{:>7}'),
+    ('error_rate', 'err%', '{:>6.1%}'),
+    ('rps', 'rps', '{:>8.1f}'),
+    ('p50', 'p50 ms', '{:>8.0f}'),
+    ('p95', 'p95 ms', '{:>8.0f}'),
+    ('p99', 'p99 ms', '{:>8.0f}'),
+    ('max', 'max ms', '{:>8.0f}'),
+)
+NAME_WIDTH = 44
+BAR_WIDTH = 40
+
+
+def format_row(name, summary):
+    return f'{name:<{NAME_WIDTH}}' + ''.join(
+        template.format(summary[key]) for key, _, template in COLUMNS
+    )
+
+
+def format_endpoints(stats):
+    header = f'{"endpoint":<{NAME_WIDTH}}' + ''.join(
+        f'{title:>{len(template.format(0))}}'
+        for _, title, template in COLUMNS
+    )
+    lines = [header, '-' * len(header)]
+    for name, summary in stats.endpoints().items():
+        lines.append(format_row(name, summary))
+    lines.append('-' * len(header))
+    lines.append(format_row('total', stats.total()))
+    return '\n'.join(lines)
+
+
+def format_saturation(steps):
+    """Кривая насыщения: пропускная способность и p95 по ступеням.
+
+    Рост пользователей без роста rps и с ростом p95 — предел стенда.
+    """
+    totals = [(users, stats.total()) for users, stats in steps]
+    top = max((total['rps'] for _, total in totals), default=0) or 1
+    lines = [f'{"users":>6}{"rps":>9}{"p95 ms":>9}{"err%":>7}  throughput']
+    for users, total in totals:
+        bar = '#' * round(total['rps'] / top * BAR_WIDTH)
+        lines.append(
+            f'{users:>6}{total["rps"]:>9.1f}{total["p95"]:>9.0f}'
+            f'{total["error_rate"]:>7.1%}  {bar}'
+        )
+    return '\n'.join(lines)
+
+
+def to_json(steps):
+    return json.dumps(
+        [
+            {
+                'users': users,
+                'duration': stats.duration,
+                'total': stats.total(),
+                'endpoints': stats.endpoints(),
+            }
+            for users, stats in steps
+        ],
+        indent=2,
+        ensure_ascii=False,
+    )
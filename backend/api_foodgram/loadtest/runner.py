@@ -0,0 +1,150 @@
+import base64
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+
+from .client import ApiClient
+from .scenarios import JOURNEYS, Context, cook, make_png
+from .stats import Stats
+
+PASSWORD = 'Loadtest-password-2023'
+MIN_RECIPES = 20
+# Сколько рецептов стенда читать при подготовке.
+MAX_RECIPES = 100
+# Подряд неудачных публикаций, после которых подготовка прерывается.
+MAX_COOK_FAILURES = 5
+
+
+def login(client, number):
+    email = f'loadtest{number}@example.com'
+    client.post('/api/users/', json={
+        'email': email,
+        'username': f'loadtest{number}',
+        'first_name': 'Нагрузка',
+        'last_name': str(number),
+        'password': PASSWORD,
+    })
+    response = client.post(
+        '/api/auth/token/login/',
+        json={'email': email, 'password': PASSWORD},
+    )
+    response.raise_for_status()
+    return response.json()['auth_token']
+
+
+def get_recipes(client, limit=MAX_RECIPES):
+    """Рецепты стенда по страницам PageNumberPagination, по ссылке next."""
+    recipes = []
+    path = '/api/recipes/'
+    while path and len(recipes) < limit:
+        response = client.get(path, 'GET /api/recipes/')
+        if response is None:
+            raise RuntimeError(f'Request failed: GET {path}')
+        response.raise_for_status()
+        data = response.json()
+        recipes.extend(data['results'])
+        # next — абсолютная ссылка, клиент сам добавляет хост.
+        path = data['next'] and urlsplit(data['next'])._replace(
+            scheme='', netloc=''
+        ).geturl()
+    return recipes[:limit]
+
+
+def cook_recipes(author, context):
+    failures = 0
+    while len(context.recipes) < MIN_RECIPES:
+        if cook(author, context, lambda *args: None):
+            failures = 0
+            continue
+        failures += 1
+        if failures >= MAX_COOK_FAILURES:
+            raise RuntimeError(
+                f'Could not create recipes: {failures} attempts '
+                f'in a row failed, see POST /api/recipes/ errors'
+            )
+
+
+def prepare(host, accounts, image_size=256, think_scale=1.0):
+    """Справочники, аккаунты и рецепты для сценариев.
+
+    Аккаунты loadtestN создаются при первом запуске и переиспользуются.
+    """
+    client = ApiClient(host, Stats())
+    context = Context(think_scale=think_scale)
+    tags = client.get('/api/tags/').json()
+    context.tags = [tag['slug'] for tag in tags]
+    context.tag_ids = [tag['id'] for tag in tags]
+    ingredients = client.get('/api/ingredients/').json()
+    context.ingredients = [item['name'] for item in ingredients]
+    context.ingredient_ids = [item['id'] for item in ingredients]
+    context.image = 'data:image/png;base64,' + base64.b64encode(
+        make_png(image_size, image_size)
+    ).decode()
+    context.tokens = [login(client, number) for number in range(accounts)]
+    # Рецепты публикует отдельный автор, на него и подписываются.
+    author = ApiClient(host, Stats(), login(client, 'author'))
+    recipes = get_recipes(client)
+    context.recipes = [recipe['id'] for recipe in recipes]
+    cook_recipes(author, context)
+    context.authors = list(
+        {recipe['author']['id'] for recipe in recipes}
+        | {author.get('/api/users/me/').json()['id']}
+    )
+    client.close()
+    author.close()
+    return context
+
+
+def virtual_user(number, host, context, stats, deadline):
+    journeys, weights, _ = zip(*JOURNEYS)
+    anonymous = ApiClient(host, stats)
+    authorized = ApiClient(
+        host, stats, context.tokens[number % len(context.tokens)]
+    )
+
+    def think(low, high):
+        pause = random.uniform(low, high) * context.think_scale
+        time.sleep(max(min(pause, deadline - time.monotonic()), 0))
+
+    while time.monotonic() < deadline:
+        index = random.choices(range(len(JOURNEYS)), weights)[0]
+        journey, _, needs_auth = JOURNEYS[index]
+        journey(authorized if needs_auth else anonymous, context, think)
+    anonymous.close()
+    authorized.close()
+
+
+def run_step(host, context, users, duration, ramp_up=5):
+    """users виртуальных пользователей в течение duration секунд.
+
+    Пользователи запускаются равномерно за ramp_up секунд, замеры
+    ведутся с момента запуска первого.
+    """
+    stats = Stats()
+    deadline = time.monotonic() + duration
+    threads = []
+    for number in range(users):
+        thread = threading.Thread(
+            target=virtual_user,
+            args=(number, host, context, stats, deadline),
+            daemon=True,
+        )
+        thread.start()
+        threads.append(thread)
+        time.sleep(min(ramp_up, duration) / users)
+    for thread in threads:
+        thread.join()
+    stats.finish()
+    return stats
+
+
+def run_saturation(host, context, levels, duration, report=None):
+    """Ступени нагрузки по возрастанию числа пользователей."""
+    steps = []
+    for users in levels:
+        stats = run_step(host, context, users, duration)
+        steps.append((users, stats))
+        if report is not None:
+            report(users, stats)
+    return steps
@@ -0,0 +1,154 @@
+import random
+import struct
+import threading
+import uuid
+import zlib
+from dataclasses import dataclass, field
+
+
+def make_png(width, height):
+    """PNG из случайных пикселей: не сжимается, размер близок к реальному
+    фото width x height."""
+    def chunk(kind, data):
+        body = kind + data
+        return (
+            struct.pack('>I', len(data)) + body
+            + struct.pack('>I', zlib.crc32(body) & 0xFFFFFFFF)
+        )
+
+    rows = b''.join(
+        b'\x00' + random.getrandbits(width * 24).to_bytes(width * 3, 'big')
+        for _ in range(height)
+    )
+    return (
+        b'\x89PNG\r\n\x1a\n'
+        + chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0))
+        + chunk(b'IDAT', zlib.compress(rows, 1))
+        + chunk(b'IEND', b'')
+    )
+
+
+@dataclass
+class Context:
+    """Общие для виртуальных пользователей данные стенда."""
+
+    tags: list = field(default_factory=list)
+    tag_ids: list = field(default_factory=list)
+    ingredients: list = field(default_factory=list)
+    ingredient_ids: list = field(default_factory=list)
+    recipes: list = field(default_factory=list)
+    authors: list = field(default_factory=list)
+    tokens: list = field(default_factory=list)
+    image: str = ''
+    think_scale: float = 1.0
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def add_recipe(self, pk):
+        with self.lock:
+            self.recipes.append(pk)
+
+    def pick_recipes(self, count):
+        with self.lock:
+            return random.sample(self.recipes, min(count, len(self.recipes)))
+
+
+def browse(client, context, think):
+    """Гость листает ленту, фильтрует по тегам и открывает рецепты."""
+    for page in range(1, random.randint(2, 4)):
+        client.get(f'/api/recipes/?page={page}', 'GET /api/recipes/')
+        think(2, 5)
+    tags = random.sample(context.tags, min(2, len(context.tags)))
+    query = '&'.join(f'tags={slug}' for slug in tags)
+    client.get(f'/api/recipes/?{query}', 'GET /api/recipes/?tags=')
+    think(1, 3)
+    for pk in context.pick_recipes(2):
+        client.get(f'/api/recipes/{pk}/', 'GET /api/recipes/{id}/')
+        think(5, 15)
+
+
+def search(client, context, think):
+    """Поиск ингредиента по мере набора названия."""
+    name = random.choice(context.ingredients)
+    for length in range(2, min(len(name), 5) + 1):
+        client.get(
+            f'/api/ingredients/?name={name[:length]}',
+            'GET /api/ingredients/?name=',
+        )
+        think(0.2, 0.6)
+
+
+def cook(client, context, think):
+    """Автор ищет ингредиенты и публикует рецепт с картинкой.
+
+    Возвращает True, если рецепт опубликован.
+    """
+    search(client, context, think)
+    think(10, 30)
+    ingredients = random.sample(
+        context.ingredient_ids, min(5, len(context.ingredient_ids))
+    )
+    response = client.post('/api/recipes/', json={
+        'name': f'Нагрузочный рецепт {uuid.uuid4().hex[:12]}',
+        'text': 'Создан нагрузочным тестом.',
+        'cooking_time': random.randint(5, 120),
+        'tags': random.sample(context.tag_ids, 1),
+        'ingredients': [
+            {'id': pk, 'amount': random.randint(1, 500)}
+            for pk in ingredients
+        ],
+        'image': context.image,
+    })
+    if response is None or response.status_code != 201:
+        return False
+    pk = response.json()['id']
+    context.add_recipe(pk)
+    think(2, 5)
+    client.get(f'/api/recipes/{pk}/', 'GET /api/recipes/{id}/')
+    return True
+
+
+def shop(client, context, think):
+    """Избранное, корзина и скачивание списка покупок."""
+    client.get('/api/recipes/?is_favorited=1',
+               'GET /api/recipes/?is_favorited=')
+    recipes = context.pick_recipes(4)
+    for pk in recipes[:2]:
+        client.post(f'/api/recipes/{pk}/favorite/',
+                    'POST /api/recipes/{id}/favorite/')
+        think(1, 3)
+    for pk in recipes:
+        client.post(f'/api/recipes/{pk}/shopping_cart/',
+                    'POST /api/recipes/{id}/shopping_cart/')
+        think(1, 3)
+    client.get('/api/recipes/download_shopping_cart/')
+    think(5, 10)
+    for pk in recipes:
+        client.delete(f'/api/recipes/{pk}/shopping_cart/',
+                      'DELETE /api/recipes/{id}/shopping_cart/')
+    for pk in recipes[:2]:
+        client.delete(f'/api/recipes/{pk}/favorite/',
+                      'DELETE /api/recipes/{id}/favorite/')
+
+
+def follow(client, context, think):
+    """Подписка на автора и лента подписок."""
+    author = random.choice(context.authors)
+    client.get(f'/api/users/{author}/', 'GET /api/users/{id}/')
+    think(2, 5)
+    client.post(f'/api/users/{author}/subscribe/',
+                'POST /api/users/{id}/subscribe/')
+    think(1, 3)
+    client.get('/api/users/subscriptions/')
+    think(5, 10)
+    client.delete(f'/api/users/{author}/subscribe/',
+                  'DELETE /api/users/{id}/subscribe/')
+
+
+# Сценарий, вес и нужна ли авторизация.
+JOURNEYS = (
+    (browse, 6, False),
+    (search, 2, True),
+    (shop, 3, True),
+    (follow, 1, True),
+    (cook, 1, True),
+)
@@ -0,0 +1,66 @@
+import math
+import threading
+import time
+from collections import Counter, defaultdict
+
+
+def percentile(values, q):
+    """Перцентиль q (0–100) отсортированного списка по ближайшему рангу."""
+    if not values:
+        return 0.0
+    rank = max(math.ceil(q / 100 * len(values)), 1)
+    return values[rank - 1]
+
+
+class Stats:
+    """Задержки и ошибки по эндпоинтам, пишется из многих потоков."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.errors = Counter()
+        self.started = time.monotonic()
+        self.finished = None
+
+    def add(self, name, elapsed, ok):
+        with self._lock:
+            self.latencies[name].append(elapsed)
+            if not ok:
+                self.errors[name] += 1
+
+    def finish(self):
+        self.finished = time.monotonic()
+
+    @property
+    def duration(self):
+        return (self.finished or time.monotonic()) - self.started
+
+    def summarize(self, latencies, errors):
+        values = sorted(latencies)
+        count = len(values)
+        return {
+            'requests': count,
+            'errors': errors,
+            'error_rate': errors / count if count else 0.0,
+            'rps': count / self.duration if self.duration else 0.0,
+            'p50': percentile(values, 50) * 1000,
+            'p95': percentile(values, 95) * 1000,
+            'p99': percentile(values, 99) * 1000,
+            'max': (values[-1] if values else 0.0) * 1000,
+        }
+
+    def endpoints(self):
+        """{эндпоинт: сводка}, задержки в миллисекундах."""
+        with self._lock:
+            return {
+                name: self.summarize(latencies, self.errors[name])
+                for name, latencies in sorted(self.latencies.items())
+            }
+
+    def total(self):
+        with self._lock:
+            latencies = [
+                value for values in self.latencies.values()
+                for value in values
+            ]
+            return self.summarize(latencies, sum(self.errors.values()))
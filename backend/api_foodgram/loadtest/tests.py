@@ -0,0 +1,39 @@
+from django.contrib.auth import get_user_model
+from django.test import LiveServerTestCase
+from recipes.models import Recipe
+
+from .client import ApiClient
+from .runner import MIN_RECIPES, cook_recipes, get_recipes
+from .scenarios import Context
+from .stats import Stats
+
+User = get_user_model()
+
+
+class PrepareTests(LiveServerTestCase):
+    def setUp(self):
+        author = User.objects.create_user(
+            username='author', email='author@example.com', password='pass'
+        )
+        for number in range(8):
+            Recipe.objects.create(
+                author=author, name=f'recipe {number}', text='text',
+                cooking_time=5, image='recipes/images/test.jpg',
+            )
+        self.client = ApiClient(self.live_server_url, Stats())
+        self.addCleanup(self.client.close)
+
+    def test_get_recipes_follows_pages(self):
+        recipes = get_recipes(self.client)
+        self.assertEqual(len(recipes), 8)
+        self.assertEqual(len(get_recipes(self.client, limit=7)), 7)
+
+    def test_cook_recipes_gives_up(self):
+        author = ApiClient(self.live_server_url, Stats(), 'wrong-token')
+        self.addCleanup(author.close)
+        context = Context(
+            ingredients=['sugar'], ingredient_ids=[1], tag_ids=[1]
+        )
+        with self.assertRaises(RuntimeError):
+            cook_recipes(author, context)
+        self.assertLess(len(context.recipes), MIN_RECIPES)
@@ -0,0 +1,31 @@
+from django.contrib import admin
+
+from .models import SlowQuery
+
+
+@admin.register(SlowQuery)
+class SlowQueryAdmin(admin.ModelAdmin):
+    list_display = (
+        "recorded_at",
+        "duration",
+        "view",
+        "alias",
+        "sql",
+    )
+    list_filter = ("view", "alias")
+    search_fields = ("sql", "view")
+    readonly_fields = (
+        "slot",
+        "recorded_at",
+        "alias",
+        "duration",
+        "view",
+        "sql",
+        "params",
+        "stack",
+        "plan",
+    )
+    empty_value_display = "-пусто-"
+
+    def has_add_permission(self, request):
+        return False
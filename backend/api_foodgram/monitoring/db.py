@@ -0,0 +1,31 @@
+import threading
+import time
+
+from .metrics import DB_QUERIES, DB_QUERY_DURATION
+
+# Представление и число запросов к базе текущего HTTP-запроса,
+# заполняет MetricsMiddleware.
+request_state = threading.local()
+
+
+def instrument_connection(sender, connection, **kwargs):
+    """Подключает учёт и журнал медленных запросов к новому соединению."""
+    from .slow_queries import slow_query_log
+
+    for wrapper in (query_metrics, slow_query_log):
+        if wrapper not in connection.execute_wrappers:
+            connection.execute_wrappers.append(wrapper)
+
+
+def query_metrics(execute, sql, params, many, context):
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        alias = context['connection'].alias
+        DB_QUERIES.labels(alias).inc()
+        DB_QUERY_DURATION.labels(alias).observe(
+            time.perf_counter() - started
+        )
+        if hasattr(request_state, 'queries'):
+            request_state.queries += 1
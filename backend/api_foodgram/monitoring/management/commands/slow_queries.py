@@ -0,0 +1,59 @@
+from django.core.management import BaseCommand, CommandError
+from django.db.models import Avg, Count, Max
+from monitoring.models import SlowQuery
+
+
+class Command(BaseCommand):
+    help = "Shows the slow query log"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=20)
+        parser.add_argument('--view', help='Only queries of this view')
+        parser.add_argument('--show', type=int, metavar='ID',
+                            help='Full SQL, stack and plan of one query')
+        parser.add_argument('--by-view', action='store_true',
+                            help='Count and timing grouped by view')
+        parser.add_argument('--clear', action='store_true')
+
+    def handle(self, *args, **options):
+        queries = SlowQuery.objects.using('default')
+        if options['clear']:
+            deleted, _ = queries.all().delete()
+            self.stdout.write(f'Deleted: {deleted}')
+        elif options['show'] is not None:
+            self.show(queries, options['show'])
+        elif options['by_view']:
+            self.by_view(queries)
+        else:
+            if options['view']:
+                queries = queries.filter(view=options['view'])
+            for query in queries[:options['limit']]:
+                sql = ' '.join(query.sql.split())[:100]
+                self.stdout.write(
+                    f'{query.pk:>6} {query.recorded_at:%Y-%m-%d %H:%M:%S} '
+                    f'{query.duration:>8.1f} ms {query.view or "-"}\n'
+                    f'       {sql}'
+                )
+
+    def show(self, queries, pk):
+        query = queries.filter(pk=pk).first()
+        if query is None:
+            raise CommandError(f'No slow query {pk}')
+        self.stdout.write(
+            f'{query.recorded_at} {query.alias} {query.duration:.1f} ms '
+            f'{query.view}\n\n{query.sql}\n\nParams: {query.params}\n\n'
+            f'Stack:\n{query.stack or "-"}\nPlan:\n{query.plan or "-"}'
+        )
+
+    def by_view(self, queries):
+        rows = (
+            queries.values('view')
+            .annotate(count=Count('pk'), avg=Avg('duration'),
+                      max=Max('duration'))
+            .order_by('-count')
+        )
+        for row in rows:
+            self.stdout.write(
+                f'{row["view"] or "-":<45}{row["count"]:>6}'
+                f'{row["avg"]:>10.1f}{row["max"]:>10.1f}'
+            )
@@ -0,0 +1,60 @@
+"""Метрики Prometheus процесса.
+
+С PROMETHEUS_MULTIPROC_DIR (его задаёт gunicorn.conf.py) значения пишутся
+в mmap-файлы каталога, и /api/metrics суммирует все воркеры.
+"""
+from prometheus_client import Counter, Gauge, Histogram
+
+LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+QUERY_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+REQUESTS = Counter(
+    'foodgram_http_requests_total',
+    'HTTP requests by view, method and status',
+    ['view', 'method', 'status'],
+)
+REQUEST_LATENCY = Histogram(
+    'foodgram_http_request_duration_seconds',
+    'HTTP request latency by view',
+    ['view'],
+    buckets=LATENCY_BUCKETS,
+)
+REQUESTS_IN_FLIGHT = Gauge(
+    'foodgram_http_requests_in_flight',
+    'Requests being processed by live workers',
+    multiprocess_mode='livesum',
+)
+WORKER_THREADS = Gauge(
+    'foodgram_worker_threads',
+    'Request threads of live workers; in_flight / threads is saturation',
+    multiprocess_mode='livesum',
+)
+DB_QUERIES = Counter(
+    'foodgram_db_queries_total',
+    'Database queries by connection alias',
+    ['alias'],
+)
+DB_QUERY_DURATION = Histogram(
+    'foodgram_db_query_duration_seconds',
+    'Database query duration by connection alias',
+    ['alias'],
+    buckets=QUERY_BUCKETS,
+)
+DB_QUERIES_PER_REQUEST = Histogram(
+    'foodgram_db_queries_per_request',
+    'Database queries made by one request',
+    ['view'],
+    buckets=(0, 1, 2, 5, 10, 20, 50, 100, 200),
+)
+CACHE_LOOKUPS = Counter(
+    'foodgram_cache_lookups_total',
+    'Cache lookups by cache and result (hit, miss, local, shared)',
+    ['cache', 'result'],
+)
+THROTTLED = Counter(
+    'foodgram_throttled_requests_total',
+    'Requests rejected by CostRateThrottle',
+    ['view'],
+)
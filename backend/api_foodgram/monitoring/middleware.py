@@ -0,0 +1,60 @@
+import os
+import time
+
+from django.conf import settings
+
+from .db import request_state
+from .metrics import (DB_QUERIES_PER_REQUEST, REQUEST_LATENCY, REQUESTS,
+                      REQUESTS_IN_FLIGHT, WORKER_THREADS)
+from .slow_queries import flush
+
+_registered_pid = None
+
+
+def get_view_name(view_func, method):
+    """Имя представления в виде RecipeViewSet.favorite."""
+    actions = getattr(view_func, 'actions', None)
+    if actions is None:
+        # Функция, @api_view или APIView: имя функции или класса.
+        return getattr(view_func, '__name__', 'unknown')
+    action = actions.get(method.lower(), method.lower())
+    return f'{view_func.cls.__name__}.{action}'
+
+
+def register_worker():
+    # После fork мастера: число потоков учитывается в каждом воркере.
+    global _registered_pid
+    if _registered_pid != os.getpid():
+        _registered_pid = os.getpid()
+        WORKER_THREADS.set(settings.METRICS_WORKER_THREADS)
+
+
+class MetricsMiddleware:
+    """Счётчики и задержки запросов по представлениям и действиям."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        register_worker()
+        request.metrics_view = 'unmatched'
+        request_state.queries = 0
+        request_state.slow_queries = []
+        started = time.perf_counter()
+        REQUESTS_IN_FLIGHT.inc()
+        try:
+            response = self.get_response(request)
+        finally:
+            REQUESTS_IN_FLIGHT.dec()
+            flush()
+        view = request.metrics_view
+        REQUEST_LATENCY.labels(view).observe(time.perf_counter() - started)
+        REQUESTS.labels(view, request.method, response.status_code).inc()
+        DB_QUERIES_PER_REQUEST.labels(view).observe(request_state.queries)
+        del request_state.queries
+        request_state.view = ''
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request.metrics_view = get_view_name(view_func, request.method)
+        request_state.view = request.metrics_view
@@ -0,0 +1,34 @@
+# Generated by Django 2.2.16 on 2026-10-19 00:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SlowQuery',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('slot', models.PositiveIntegerField(unique=True, verbose_name='Ячейка')),
+                ('recorded_at', models.DateTimeField(verbose_name='Время')),
+                ('alias', models.CharField(max_length=50, verbose_name='База')),
+                ('duration', models.FloatField(verbose_name='Длительность, мс')),
+                ('view', models.CharField(blank=True, max_length=200, verbose_name='Представление')),
+                ('sql', models.TextField(verbose_name='SQL')),
+                ('params', models.TextField(blank=True, verbose_name='Параметры')),
+                ('stack', models.TextField(blank=True, verbose_name='Стек вызовов')),
+                ('plan', models.TextField(blank=True, verbose_name='План запроса')),
+            ],
+            options={
+                'verbose_name': 'Медленный запрос',
+                'verbose_name_plural': 'Медленные запросы',
+                'ordering': ('-recorded_at',),
+            },
+        ),
+    ]
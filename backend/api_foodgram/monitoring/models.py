@@ -0,0 +1,25 @@
+from django.db import models
+
+
+class SlowQuery(models.Model):
+    """Медленный запрос к базе. Таблица — кольцевой буфер по slot."""
+
+    slot = models.PositiveIntegerField(unique=True, verbose_name="Ячейка")
+    recorded_at = models.DateTimeField(verbose_name="Время")
+    alias = models.CharField(max_length=50, verbose_name="База")
+    duration = models.FloatField(verbose_name="Длительность, мс")
+    view = models.CharField(
+        max_length=200, blank=True, verbose_name="Представление"
+    )
+    sql = models.TextField(verbose_name="SQL")
+    params = models.TextField(blank=True, verbose_name="Параметры")
+    stack = models.TextField(blank=True, verbose_name="Стек вызовов")
+    plan = models.TextField(blank=True, verbose_name="План запроса")
+
+    def __str__(self):
+        return f"{self.duration:.0f} мс {self.view}"
+
+    class Meta:
+        ordering = ("-recorded_at",)
+        verbose_name = "Медленный запрос"
+        verbose_name_plural = "Медленные запросы"
@@ -0,0 +1,144 @@
+import logging
+import os
+import random
+import threading
+import time
+import traceback
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from .db import request_state
+
+logger = logging.getLogger(__name__)
+
+SLOT_KEY = 'slow-query-slot'
+MAX_PARAMS_LENGTH = 2000
+# BEGIN, SAVEPOINT и прочие служебные команды не пишем: запись внутри
+# них ломает управление транзакцией.
+LOGGED_STATEMENTS = ('SELECT', 'INSERT', 'UPDATE', 'DELETE', 'WITH')
+
+# Запросы самого журнала (EXPLAIN, запись) не должны в него попадать.
+_guard = threading.local()
+
+
+def get_stack():
+    """Кадры кода проекта без библиотек и самого журнала."""
+    root = str(settings.BASE_DIR)
+    own = os.path.dirname(__file__)
+    frames = [
+        frame for frame in traceback.extract_stack()
+        if frame.filename.startswith(root)
+        and not frame.filename.startswith(own)
+        and 'site-packages' not in frame.filename
+    ]
+    return ''.join(traceback.format_list(frames))
+
+
+def explain(connection, sql, params):
+    if connection.vendor == 'sqlite':
+        prefix = 'EXPLAIN QUERY PLAN '
+    elif connection.vendor == 'postgresql':
+        prefix = 'EXPLAIN '
+    else:
+        return ''
+    # Ошибка EXPLAIN без точки сохранения прервала бы транзакцию
+    # запроса на PostgreSQL.
+    with transaction.atomic(using=connection.alias, savepoint=True):
+        with connection.cursor() as cursor:
+            cursor.execute(prefix + sql, params)
+            return '\n'.join(
+                ' '.join(str(column) for column in row)
+                for row in cursor.fetchall()
+            )
+
+
+def get_slot():
+    # Номер ячейки общий для процессов, если общий кеш.
+    try:
+        number = cache.incr(SLOT_KEY)
+    except ValueError:
+        cache.set(SLOT_KEY, 0, None)
+        number = 0
+    return number % settings.SLOW_QUERY_LOG_SIZE
+
+
+def save(rows):
+    from .models import SlowQuery
+
+    _guard.active = True
+    try:
+        for row in rows:
+            SlowQuery.objects.using('default').update_or_create(
+                slot=get_slot(), defaults=row
+            )
+    except Exception:
+        logger.exception('Slow query was not recorded')
+    finally:
+        _guard.active = False
+
+
+def flush():
+    """Записывает запросы, накопленные за HTTP-запрос.
+
+    MetricsMiddleware вызывает её после транзакции ATOMIC_REQUESTS:
+    запись не попадает в транзакцию запроса и переживает её откат.
+    """
+    rows = getattr(request_state, 'slow_queries', None)
+    request_state.slow_queries = None
+    if rows:
+        save(rows)
+
+
+def record(connection, sql, params, duration):
+    plan = ''
+    if (
+        sql.lstrip()[:6].upper() == 'SELECT'
+        and random.random() < settings.SLOW_QUERY_EXPLAIN_RATE
+    ):
+        try:
+            plan = explain(connection, sql, params)
+        except Exception:
+            logger.exception('EXPLAIN failed')
+    view = getattr(request_state, 'view', '')
+    logger.warning('Slow query %.0f ms in %s: %s', duration, view, sql)
+    row = {
+        'recorded_at': timezone.now(),
+        'alias': connection.alias,
+        'duration': duration,
+        'view': view,
+        'sql': sql,
+        'params': repr(params)[:MAX_PARAMS_LENGTH],
+        'stack': get_stack(),
+        'plan': plan,
+    }
+    pending = getattr(request_state, 'slow_queries', None)
+    if pending is not None:
+        pending.append(row)
+    else:
+        # Команды и воркеры: после коммита или сразу вне транзакции.
+        transaction.on_commit(lambda: save([row]))
+
+
+def slow_query_log(execute, sql, params, many, context):
+    """execute_wrapper: пишет запросы дольше SLOW_QUERY_THRESHOLD мс."""
+    if getattr(_guard, 'active', False):
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    result = execute(sql, params, many, context)
+    duration = (time.perf_counter() - started) * 1000
+    if (
+        duration >= settings.SLOW_QUERY_THRESHOLD
+        and not many
+        and sql.lstrip()[:6].upper().startswith(LOGGED_STATEMENTS)
+    ):
+        _guard.active = True
+        try:
+            record(context['connection'], sql, params, duration)
+        except Exception:
+            logger.exception('Slow query was not recorded')
+        finally:
+            _guard.active = False
+    return result
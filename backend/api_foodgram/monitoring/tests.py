@@ -0,0 +1,51 @@
+from django.core.cache import cache
+from django.db import DatabaseError, connection, transaction
+from django.http import HttpResponse
+from django.test import RequestFactory, TransactionTestCase, override_settings
+from recipes.models import Tag
+
+from .middleware import MetricsMiddleware
+from .models import SlowQuery
+from .slow_queries import explain
+
+LOGGER = 'monitoring.slow_queries'
+LOG_ALL = override_settings(
+    SLOW_QUERY_THRESHOLD=0, SLOW_QUERY_EXPLAIN_RATE=1
+)
+
+
+class SlowQueryLogTests(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_request_recorded_after_rollback(self):
+        def view(request):
+            # Так откатывается транзакция ATOMIC_REQUESTS при ошибке.
+            try:
+                with transaction.atomic():
+                    list(Tag.objects.all())
+                    self.assertFalse(SlowQuery.objects.exists())
+                    raise DatabaseError
+            except DatabaseError:
+                pass
+            return HttpResponse()
+
+        with LOG_ALL, self.assertLogs(LOGGER, 'WARNING'):
+            MetricsMiddleware(view)(RequestFactory().get('/api/tags/'))
+        query = SlowQuery.objects.get(sql__contains='recipes_tag')
+        self.assertTrue(query.plan)
+
+    def test_recorded_after_commit_outside_request(self):
+        with LOG_ALL, self.assertLogs(LOGGER, 'WARNING'):
+            with transaction.atomic():
+                list(Tag.objects.all())
+                self.assertFalse(SlowQuery.objects.exists())
+        self.assertTrue(
+            SlowQuery.objects.filter(sql__contains='recipes_tag').exists()
+        )
+
+    def test_failed_explain_keeps_transaction(self):
+        with transaction.atomic():
+            with self.assertRaises(DatabaseError):
+                explain(connection, 'SELECT * FROM missing_table', [])
+            self.assertFalse(Tag.objects.exists())
@@ -0,0 +1,48 @@
+import hmac
+import os
+
+from django.conf import settings
+from django.http import HttpResponse
+from prometheus_client import (CONTENT_TYPE_LATEST, REGISTRY,
+                               CollectorRegistry, generate_latest)
+from prometheus_client.multiprocess import MultiProcessCollector
+from rest_framework import permissions
+from rest_framework.authentication import get_authorization_header
+from rest_framework.decorators import (api_view, permission_classes,
+                                       throttle_classes)
+
+METRICS_KEYWORD = b'metrics'
+
+
+class IsAdminOrMetricsToken(permissions.BasePermission):
+    """Администратор или сборщик с заголовком "Metrics <METRICS_TOKEN>"."""
+
+    def has_permission(self, request, view):
+        if request.user and request.user.is_staff:
+            return True
+        auth = get_authorization_header(request).split()
+        return bool(
+            settings.METRICS_TOKEN
+            and len(auth) == 2
+            and auth[0].lower() == METRICS_KEYWORD
+            and hmac.compare_digest(
+                auth[1], settings.METRICS_TOKEN.encode()
+            )
+        )
+
+
+def get_registry():
+    if 'PROMETHEUS_MULTIPROC_DIR' not in os.environ:
+        return REGISTRY
+    registry = CollectorRegistry()
+    MultiProcessCollector(registry)
+    return registry
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminOrMetricsToken])
+@throttle_classes([])
+def metrics(request):
+    return HttpResponse(
+        generate_latest(get_registry()), content_type=CONTENT_TYPE_LATEST
+    )
@@ -0,0 +1,28 @@
+from django.contrib import admin
+
+from .models import OutboxCheckpoint, OutboxEvent
+
+
+@admin.register(OutboxEvent)
+class OutboxEventAdmin(admin.ModelAdmin):
+    list_display = (
+        "pk",
+        "model",
+        "object_id",
+        "action",
+        "created",
+    )
+    list_filter = ("model", "action")
+    search_fields = ("model",)
+    show_full_result_count = False
+    empty_value_display = "-пусто-"
+
+
+@admin.register(OutboxCheckpoint)
+class OutboxCheckpointAdmin(admin.ModelAdmin):
+    list_display = (
+        "consumer",
+        "position",
+        "updated",
+    )
+    empty_value_display = "-пусто-"
@@ -0,0 +1,10 @@
+from django.apps import AppConfig
+from django.utils.module_loading import autodiscover_modules
+
+
+class OutboxConfig(AppConfig):
+    name = "outbox"
+
+    def ready(self):
+        from . import signals  # noqa: F401
+        autodiscover_modules("consumers")
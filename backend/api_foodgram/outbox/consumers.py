@@ -0,0 +1,94 @@
+from django.db import connection, transaction
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+from .models import OutboxCheckpoint, OutboxEvent
+
+CONSUMERS = {}
+
+
+def consumer(name):
+    """Регистрирует обработчик пачек событий под именем потребителя.
+
+    Модули consumers.py приложений импортируются при старте.
+    """
+    def decorator(handler):
+        CONSUMERS[name] = handler
+        return handler
+    return decorator
+
+
+def get_read_filter(transaction_id, position):
+    """События до позиции (transaction_id, position) включительно."""
+    return Q(transaction_id__lt=transaction_id) | Q(
+        transaction_id=transaction_id, id__lte=position
+    )
+
+
+def get_visible_events(checkpoint, batch_size):
+    """Пачка событий после позиции в порядке (транзакция, id).
+
+    На PostgreSQL читаются только транзакции младше xmin снимка: все
+    они завершены, и событий с такими номерами больше не появится.
+    Порядок id между параллельными транзакциями не совпадает
+    с порядком коммитов, поэтому позиция — пара, а не id. Открытая
+    долгая транзакция задерживает чтение, но не теряет события.
+    """
+    events = OutboxEvent.objects.exclude(
+        get_read_filter(checkpoint.transaction_id, checkpoint.position)
+    )
+    if connection.vendor == "postgresql":
+        events = events.filter(transaction_id__lt=RawSQL(
+            "txid_snapshot_xmin(txid_current_snapshot())", []
+        ))
+    return list(events.order_by("transaction_id", "id")[:batch_size])
+
+
+def consume(name, handler=None, batch_size=500):
+    """Передаёт обработчику пачки событий после сохранённой позиции.
+
+    Пачка и сдвиг позиции фиксируются в одной транзакции: если
+    обработчик упал, пачка будет прочитана снова.
+    """
+    handler = handler or CONSUMERS[name]
+    processed = 0
+    while True:
+        with transaction.atomic():
+            checkpoint, _ = (
+                OutboxCheckpoint.objects.select_for_update()
+                .get_or_create(consumer=name)
+            )
+            events = get_visible_events(checkpoint, batch_size)
+            if not events:
+                return processed
+            handler(events)
+            checkpoint.transaction_id = events[-1].transaction_id
+            checkpoint.position = events[-1].id
+            checkpoint.save()
+        processed += len(events)
+
+
+def replay(name, position=0):
+    """Перематывает потребителя: следующие события пойдут после
+    события с id position и его транзакции."""
+    transaction_id = (
+        OutboxEvent.objects.filter(id=position)
+        .values_list("transaction_id", flat=True).first()
+    ) or 0
+    OutboxCheckpoint.objects.update_or_create(
+        consumer=name,
+        defaults={"transaction_id": transaction_id, "position": position},
+    )
+
+
+def prune():
+    """Удаляет события, которые уже прочитали все потребители."""
+    checkpoint = OutboxCheckpoint.objects.order_by(
+        "transaction_id", "position"
+    ).first()
+    if checkpoint is None:
+        return 0
+    deleted, _ = OutboxEvent.objects.filter(
+        get_read_filter(checkpoint.transaction_id, checkpoint.position)
+    ).delete()
+    return deleted
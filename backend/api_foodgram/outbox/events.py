@@ -0,0 +1,60 @@
+import json
+
+from django.db import connection
+from django.db.models.expressions import RawSQL
+
+from .models import OutboxEvent
+
+# Поля, которые не попадают в события.
+EXCLUDED_FIELDS = ("password",)
+
+
+def get_payload(instance):
+    return json.dumps(
+        {
+            field.attname: field.value_from_object(instance)
+            for field in instance._meta.concrete_fields
+            if field.attname not in EXCLUDED_FIELDS
+        },
+        default=str,
+        ensure_ascii=False,
+    )
+
+
+def get_transaction_id():
+    """Номер текущей транзакции PostgreSQL.
+
+    В SQLite пишет одна транзакция за раз, порядок id совпадает
+    с порядком коммитов, и номер не нужен.
+    """
+    if connection.vendor == "postgresql":
+        return RawSQL("txid_current()", [])
+    return 0
+
+
+def get_event(instance, action):
+    return OutboxEvent(
+        transaction_id=get_transaction_id(),
+        model=instance._meta.label_lower,
+        object_id=instance.pk,
+        action=action,
+        payload=get_payload(instance),
+    )
+
+
+def record(instance, action):
+    """Записывает событие в той же транзакции, что и изменение."""
+    event = get_event(instance, action)
+    event.save(force_insert=True)
+    return event
+
+
+def record_bulk(instances, action):
+    """События для bulk_create/update, которые не вызывают сигналы.
+
+    Строки должны быть с первичными ключами: после bulk_create на SQLite
+    их нужно перечитать из базы.
+    """
+    return OutboxEvent.objects.bulk_create(
+        [get_event(instance, action) for instance in instances]
+    )
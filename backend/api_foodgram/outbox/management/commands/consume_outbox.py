@@ -0,0 +1,56 @@
+import time
+
+from django.core.management import BaseCommand, CommandError
+from outbox.consumers import CONSUMERS, consume, prune, replay
+from outbox.models import OutboxCheckpoint
+
+
+class Command(BaseCommand):
+    help = "Feeds outbox events to registered consumers"
+
+    def add_arguments(self, parser):
+        parser.add_argument('consumers', nargs='*',
+                            help='Consumer names, all by default')
+        parser.add_argument('--replay-from', type=int,
+                            help='Rewind the consumers to this event id')
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--follow', action='store_true',
+                            help='Keep polling for new events')
+        parser.add_argument('--sleep', type=float, default=1.0)
+        parser.add_argument('--prune', action='store_true',
+                            help='Delete events read by every consumer')
+        parser.add_argument('--list', action='store_true',
+                            help='Show consumers and their positions')
+
+    def handle(self, *args, **options):
+        if options['list']:
+            self.show_positions()
+            return
+        if options['prune']:
+            self.stdout.write(f'Pruned events: {prune()}')
+            return
+        names = options['consumers'] or sorted(CONSUMERS)
+        unknown = set(names) - set(CONSUMERS)
+        if unknown:
+            raise CommandError(f'Unknown consumers: {sorted(unknown)}')
+        if options['replay_from'] is not None:
+            for name in names:
+                replay(name, options['replay_from'])
+        while True:
+            self.consume_all(names, options['batch_size'])
+            if not options['follow']:
+                break
+            time.sleep(options['sleep'])
+
+    def show_positions(self):
+        positions = dict(
+            OutboxCheckpoint.objects.values_list('consumer', 'position')
+        )
+        for name in sorted(set(CONSUMERS) | set(positions)):
+            self.stdout.write(f'{name}: {positions.get(name, 0)}')
+
+    def consume_all(self, names, batch_size):
+        for name in names:
+            processed = consume(name, batch_size=batch_size)
+            if processed:
+                self.stdout.write(f'{name}: {processed} events')
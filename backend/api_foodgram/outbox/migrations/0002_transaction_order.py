@@ -0,0 +1,27 @@
+# Generated by Django 2.2.16 on 2026-10-19 00:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('outbox', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='outboxcheckpoint',
+            name='transaction_id',
+            field=models.BigIntegerField(default=0, verbose_name='Транзакция последнего события'),
+        ),
+        migrations.AddField(
+            model_name='outboxevent',
+            name='transaction_id',
+            field=models.BigIntegerField(default=0, verbose_name='Транзакция'),
+        ),
+        migrations.AddIndex(
+            model_name='outboxevent',
+            index=models.Index(fields=['transaction_id', 'id'], name='outbox_position'),
+        ),
+    ]
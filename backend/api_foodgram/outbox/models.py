@@ -0,0 +1,60 @@
+from django.db import models
+
+
+class OutboxEvent(models.Model):
+    CREATED = "created"
+    UPDATED = "updated"
+    DELETED = "deleted"
+    ACTION_CHOICES = (
+        (CREATED, "Создание"),
+        (UPDATED, "Изменение"),
+        (DELETED, "Удаление"),
+    )
+
+    id = models.BigAutoField(primary_key=True)
+    transaction_id = models.BigIntegerField(
+        verbose_name="Транзакция", default=0
+    )
+    model = models.CharField(verbose_name="Модель", max_length=100)
+    object_id = models.BigIntegerField(verbose_name="Объект")
+    action = models.CharField(
+        verbose_name="Действие", max_length=10, choices=ACTION_CHOICES
+    )
+    payload = models.TextField(verbose_name="Данные", default="{}")
+    created = models.DateTimeField(
+        verbose_name="Создано", auto_now_add=True
+    )
+
+    def __str__(self):
+        return f"{self.model} #{self.object_id} {self.action}"
+
+    class Meta:
+        indexes = [
+            models.Index(
+                name="outbox_position", fields=["transaction_id", "id"]
+            )
+        ]
+        ordering = ("id",)
+        verbose_name = "Событие"
+        verbose_name_plural = "События"
+
+
+class OutboxCheckpoint(models.Model):
+    consumer = models.CharField(
+        verbose_name="Потребитель", unique=True, max_length=100
+    )
+    transaction_id = models.BigIntegerField(
+        verbose_name="Транзакция последнего события", default=0
+    )
+    position = models.BigIntegerField(
+        verbose_name="Последнее обработанное событие", default=0
+    )
+    updated = models.DateTimeField(verbose_name="Обновлено", auto_now=True)
+
+    def __str__(self):
+        return f"{self.consumer}: {self.position}"
+
+    class Meta:
+        ordering = ("consumer",)
+        verbose_name = "Позиция потребителя"
+        verbose_name_plural = "Позиции потребителей"
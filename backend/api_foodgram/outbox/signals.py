@@ -0,0 +1,62 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from recipes.models import (Cart, Favorite, Recipe, RecipeIngredient,
+                            RecipeTag, Subscription)
+from users.models import CustomUser
+
+from .events import record, record_bulk
+from .models import OutboxEvent
+
+TRACKED_MODELS = (
+    Recipe,
+    RecipeIngredient,
+    RecipeTag,
+    Favorite,
+    Cart,
+    Subscription,
+    CustomUser,
+)
+
+
+def saved(sender, instance, created, update_fields, **kwargs):
+    if update_fields == frozenset(("last_login",)):
+        return
+    record(instance, OutboxEvent.CREATED if created else OutboxEvent.UPDATED)
+
+
+def deleted(sender, instance, **kwargs):
+    record(instance, OutboxEvent.DELETED)
+
+
+def get_relation_field(through, model):
+    return next(
+        field.name for field in through._meta.concrete_fields
+        if field.is_relation and field.related_model is model
+    )
+
+
+def relations_added(sender, instance, action, model, pk_set, **kwargs):
+    # add() и set() вставляют строки связи через bulk_create без post_save.
+    if action != "post_add" or not pk_set:
+        return
+    record_bulk(
+        sender.objects.filter(**{
+            get_relation_field(sender, type(instance)): instance,
+            f"{get_relation_field(sender, model)}__in": pk_set,
+        }),
+        OutboxEvent.CREATED,
+    )
+
+
+for model in TRACKED_MODELS:
+    label = model._meta.label_lower
+    post_save.connect(saved, sender=model, dispatch_uid=f"outbox_save_{label}")
+    post_delete.connect(
+        deleted, sender=model, dispatch_uid=f"outbox_delete_{label}"
+    )
+
+for through in (RecipeIngredient, RecipeTag):
+    m2m_changed.connect(
+        relations_added,
+        sender=through,
+        dispatch_uid=f"outbox_add_{through._meta.label_lower}",
+    )
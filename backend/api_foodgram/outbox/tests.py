@@ -0,0 +1,101 @@
+from django.test import TestCase
+from recipes.models import Favorite, Recipe, RecipeTag, Tag
+from users.models import CustomUser
+from api.views import create_bulk
+
+from .consumers import consume, prune, replay
+from .models import OutboxCheckpoint, OutboxEvent
+
+
+class ConsumeTests(TestCase):
+    def create_event(self, transaction_id):
+        return OutboxEvent.objects.create(
+            transaction_id=transaction_id,
+            model='recipes.recipe',
+            object_id=1,
+            action=OutboxEvent.UPDATED,
+        )
+
+    def test_reads_by_transaction_then_id(self):
+        late = self.create_event(200)
+        early = self.create_event(100)
+        same = self.create_event(200)
+        seen = []
+        processed = consume('test', seen.extend, batch_size=2)
+        self.assertEqual(processed, 3)
+        self.assertEqual(seen, [early, late, same])
+        checkpoint = OutboxCheckpoint.objects.get(consumer='test')
+        self.assertEqual(
+            (checkpoint.transaction_id, checkpoint.position), (200, same.pk)
+        )
+        self.assertEqual(consume('test', seen.extend), 0)
+
+    def test_failed_handler_keeps_position(self):
+        self.create_event(0)
+
+        def fail(events):
+            raise RuntimeError
+
+        with self.assertRaises(RuntimeError):
+            consume('test', fail)
+        seen = []
+        self.assertEqual(consume('test', seen.extend), 1)
+
+    def test_replay_and_prune(self):
+        first = self.create_event(100)
+        second = self.create_event(100)
+        consume('test', lambda events: None)
+        replay('test', first.pk)
+        seen = []
+        consume('test', seen.extend)
+        self.assertEqual(seen, [second])
+        replay('other', first.pk)
+        self.assertEqual(prune(), 1)
+        self.assertQuerysetEqual(
+            OutboxEvent.objects.all(), [second.pk], transform=lambda e: e.pk
+        )
+
+
+class RecordTests(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(
+            username='user', email='user@example.com', password='pass'
+        )
+        self.recipes = [
+            Recipe.objects.create(
+                author=self.user, name=f'recipe {number}', text='text',
+                cooking_time=5, image='recipes/images/test.jpg',
+            )
+            for number in range(3)
+        ]
+        self.tag = Tag.objects.create(
+            name='breakfast', slug='breakfast', color='#111111'
+        )
+
+    def get_events(self, model):
+        return OutboxEvent.objects.filter(
+            model=model._meta.label_lower, action=OutboxEvent.CREATED
+        )
+
+    def test_bulk_create_records_pks(self):
+        Favorite.objects.create(users=self.user, recipes=self.recipes[0])
+        create_bulk(
+            Favorite, self.user, [recipe.pk for recipe in self.recipes]
+        )
+        self.assertEqual(
+            sorted(
+                self.get_events(Favorite).values_list('object_id', flat=True)
+            ),
+            sorted(Favorite.objects.values_list('pk', flat=True)),
+        )
+
+    def test_m2m_add_records_relations(self):
+        recipe = self.recipes[0]
+        recipe.tags.add(self.tag)
+        self.tag.recipes_tags.add(self.recipes[1])
+        self.assertEqual(
+            sorted(
+                self.get_events(RecipeTag).values_list('object_id', flat=True)
+            ),
+            sorted(RecipeTag.objects.values_list('pk', flat=True)),
+        )
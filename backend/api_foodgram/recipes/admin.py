@@ -1,7 +1,13 @@
 from django.contrib import admin
+from django.db.models import Count
+from api_foodgram.admin_tools import EstimatedCountPaginator, input_filter
 
-from .models import (Cart, Favorite, Ingredient, Recipe, RecipeIngredient,
-                     RecipeTag, Subscription, Tag)
+from .meal_plan import rebuild_plans, rebuild_plans_for_recipes
+from .models import (AuthorStats, Cart, Favorite, ImageUpload, Ingredient,
+                     IngredientConversion, IngredientNutrition, MealPlan,
+                     MealPlanEntry, MealPlanItem, MeasurementUnit, Recipe,
+                     RecipeIngredient, RecipeTag, Subscription, Tag)
+from .nutrition import update_ingredient_nutrition, update_nutrition
 
 
 @admin.register(Tag)
@@ -11,6 +17,7 @@ class TagAdmin(admin.ModelAdmin):
         "name",
         "color",
         "slug",
+        "bit",
     )
     list_filter = ("name",)
     search_fields = ("name",)
@@ -24,13 +31,57 @@ class IngredientAdmin(admin.ModelAdmin):
         "name",
         "measurement_unit",
     )
-    list_filter = ("name",)
+    list_filter = (input_filter("name__istartswith", "названию"), "unit")
+    search_fields = ("name",)
+    empty_value_display = "-пусто-"
+
+
+@admin.register(MeasurementUnit)
+class MeasurementUnitAdmin(admin.ModelAdmin):
+    list_display = (
+        "pk",
+        "name",
+        "canonical",
+        "factor",
+    )
     search_fields = ("name",)
     empty_value_display = "-пусто-"
 
 
+@admin.register(IngredientConversion)
+class IngredientConversionAdmin(admin.ModelAdmin):
+    list_display = (
+        "ingredient",
+        "canonical",
+        "factor",
+    )
+    search_fields = ("ingredient__name",)
+    list_select_related = ("ingredient",)
+    empty_value_display = "-пусто-"
+
+
+@admin.register(IngredientNutrition)
+class IngredientNutritionAdmin(admin.ModelAdmin):
+    list_display = (
+        "ingredient",
+        "calories",
+        "proteins",
+        "fats",
+        "carbohydrates",
+        "price",
+    )
+    search_fields = ("ingredient__name",)
+    list_select_related = ("ingredient",)
+    empty_value_display = "-пусто-"
+
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        update_ingredient_nutrition(obj.ingredient_id)
+
+
 class RecipeIngredientInline(admin.TabularInline):
     model = RecipeIngredient
+    autocomplete_fields = ("ingredients",)
 
 
 class RecipeTagInline(admin.TabularInline):
@@ -48,16 +99,35 @@ class RecipeAdmin(admin.ModelAdmin):
         "cooking_time",
         "quantity_in_favorites",
     )
-    list_filter = ("name", "author__username", "tags")
-    search_fields = ("name", "author__username", "tags")
+    list_filter = (
+        input_filter("name__istartswith", "названию"),
+        input_filter("author__username", "автору"),
+        "tags",
+    )
+    search_fields = ("name", "author__username", "tags__name")
+    readonly_fields = ("calories", "proteins", "fats", "carbohydrates", "cost")
     inlines = [RecipeIngredientInline, RecipeTagInline]
+    list_select_related = ("author",)
+    autocomplete_fields = ("author",)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     empty_value_display = "-пусто-"
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(
+            favorites_count=Count("recipes_favorite", distinct=True)
+        )
+
+    def save_related(self, request, form, formsets, change):
+        super().save_related(request, form, formsets, change)
+        update_nutrition([form.instance.pk])
+        rebuild_plans_for_recipes([form.instance.pk])
+
     def quantity_in_favorites(self, obj):
-        result = Favorite.objects.filter(recipes=obj)
-        return result.count()
+        return obj.favorites_count
 
     quantity_in_favorites.short_description = "Количевство в  избраном"
+    quantity_in_favorites.admin_order_field = "favorites_count"
 
 
 @admin.register(RecipeIngredient)
@@ -67,8 +137,15 @@ class RecipeIngredientAdmin(admin.ModelAdmin):
         "ingredients",
         "amount",
     )
-    list_filter = ("recipes__name", "ingredients__name")
+    list_filter = (
+        input_filter("recipes__name__istartswith", "рецепту"),
+        input_filter("ingredients__name__istartswith", "ингредиенту"),
+    )
     search_fields = ("recipes__name", "ingredients__name")
+    list_select_related = ("recipes", "ingredients")
+    autocomplete_fields = ("recipes", "ingredients")
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     empty_value_display = "-пусто-"
 
 
@@ -78,8 +155,15 @@ class RecipeTagAdmin(admin.ModelAdmin):
         "recipes",
         "tags",
     )
-    list_filter = ("recipes__name", "tags__name")
+    list_filter = (
+        input_filter("recipes__name__istartswith", "рецепту"),
+        "tags",
+    )
     search_fields = ("recipes__name", "tags__name")
+    list_select_related = ("recipes", "tags")
+    autocomplete_fields = ("recipes",)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     empty_value_display = "-пусто-"
 
 
@@ -89,8 +173,15 @@ class CartAdmin(admin.ModelAdmin):
         "users",
         "recipes",
     )
-    list_filter = ("users__username", "recipes__author")
-    search_fields = ("users__username", "recipes__author")
+    list_filter = (
+        input_filter("users__username", "пользователю"),
+        input_filter("recipes__author__username", "автору"),
+    )
+    search_fields = ("users__username", "recipes__author__username")
+    list_select_related = ("users", "recipes")
+    autocomplete_fields = ("users", "recipes")
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     empty_value_display = "-пусто-"
 
 
@@ -100,8 +191,49 @@ class FavoriteAdmin(admin.ModelAdmin):
         "users",
         "recipes",
     )
-    list_filter = ("users__username", "recipes__author")
-    search_fields = ("users__username", "recipes__author")
+    list_filter = (
+        input_filter("users__username", "пользователю"),
+        input_filter("recipes__author__username", "автору"),
+    )
+    search_fields = ("users__username", "recipes__author__username")
+    list_select_related = ("users", "recipes")
+    autocomplete_fields = ("users", "recipes")
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    empty_value_display = "-пусто-"
+
+
+@admin.register(ImageUpload)
+class ImageUploadAdmin(admin.ModelAdmin):
+    list_display = (
+        "token",
+        "user",
+        "image",
+        "created",
+    )
+    list_select_related = ("user",)
+    readonly_fields = ("token", "user", "image", "created")
+    empty_value_display = "-пусто-"
+
+
+@admin.register(AuthorStats)
+class AuthorStatsAdmin(admin.ModelAdmin):
+    list_display = (
+        "author",
+        "recipes_count",
+        "followers_count",
+        "favorites_count",
+    )
+    search_fields = ("author__username",)
+    list_select_related = ("author",)
+    readonly_fields = (
+        "author",
+        "recipes_count",
+        "followers_count",
+        "favorites_count",
+    )
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     empty_value_display = "-пусто-"
 
 
@@ -111,6 +243,47 @@ class SubscriptionAdmin(admin.ModelAdmin):
         "users",
         "authors",
     )
-    list_filter = ("users__username", "authors__username")
+    list_filter = (
+        input_filter("users__username", "пользователю"),
+        input_filter("authors__username", "автору"),
+    )
     search_fields = ("users__username", "authors__username")
+    list_select_related = ("users", "authors")
+    autocomplete_fields = ("users", "authors")
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    empty_value_display = "-пусто-"
+
+
+class MealPlanEntryInline(admin.TabularInline):
+    model = MealPlanEntry
+    autocomplete_fields = ("recipe",)
+
+
+class MealPlanItemInline(admin.TabularInline):
+    model = MealPlanItem
+    fields = ("ingredient", "amount")
+    readonly_fields = ("ingredient", "amount")
+    can_delete = False
+    extra = 0
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(MealPlan)
+class MealPlanAdmin(admin.ModelAdmin):
+    list_display = (
+        "pk",
+        "user",
+        "week_start",
+    )
+    list_filter = (input_filter("user__username", "пользователю"),)
+    list_select_related = ("user",)
+    autocomplete_fields = ("user",)
+    inlines = [MealPlanEntryInline, MealPlanItemInline]
     empty_value_display = "-пусто-"
+
+    def save_related(self, request, form, formsets, change):
+        super().save_related(request, form, formsets, change)
+        rebuild_plans([form.instance.pk])
@@ -0,0 +1,31 @@
+import gzip
+import sys
+
+from django.core.management import BaseCommand
+from recipes.backup import CHUNK_SIZE, iter_export
+
+
+class Command(BaseCommand):
+    help = "Streams all users and recipes data to an NDJSON file"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path', nargs='?', default='-',
+            help='Output file, "-" for stdout, *.gz is compressed',
+        )
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        path = options['path']
+        if path == '-':
+            output = sys.stdout
+        elif path.endswith('.gz'):
+            output = gzip.open(path, mode='wt', encoding='utf-8')
+        else:
+            output = open(path, mode='w', encoding='utf-8')
+        try:
+            for chunk in iter_export(options['chunk_size']):
+                output.write(chunk)
+        finally:
+            if output is not sys.stdout:
+                output.close()
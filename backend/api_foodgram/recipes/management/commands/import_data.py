@@ -0,0 +1,32 @@
+import gzip
+import sys
+
+from django.core.management import BaseCommand
+from recipes.backup import CHUNK_SIZE, import_stream
+
+
+class Command(BaseCommand):
+    help = "Loads an NDJSON file made by export_data into an empty database"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path', nargs='?', default='-',
+            help='Input file, "-" for stdin, *.gz is decompressed',
+        )
+        parser.add_argument('--batch-size', type=int, default=CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        path = options['path']
+        if path == '-':
+            source = sys.stdin
+        elif path.endswith('.gz'):
+            source = gzip.open(path, mode='rt', encoding='utf-8')
+        else:
+            source = open(path, mode='r', encoding='utf-8')
+        try:
+            counts = import_stream(source, options['batch_size'])
+        finally:
+            if source is not sys.stdin:
+                source.close()
+        for label, count in counts.items():
+            self.stdout.write(f'{label}: {count}')
@@ -2,7 +2,8 @@ import io
 import logging
 from csv import DictReader
 
-from django.core.management import BaseCommand
+from django.core.management import BaseCommand, call_command
+from invalidation.bus import bump
 from recipes.models import (Cart, Favorite, Ingredient, Recipe,
                             RecipeIngredient, RecipeTag, Subscription, Tag)
 from users.models import CustomUser
@@ -25,15 +26,27 @@ def main_fill():
         raise Exception(ALREDY_LOADED_ERROR_MESSAGE)
 
     logging.info("Loading - data a table - Ingredient")
-    for row in DictReader(
-        io.open("static/data/ingredients.csv", mode="r", encoding="utf-8")
-    ):
-        Ingredient.objects.get_or_create(
-            name=row["name"],
-            measurement_unit=row["measurement_unit"],
-        )
+    # Пачкой, без Ingredient.save(): единицы проставит load_units
+    # одним UPDATE.
+    Ingredient.objects.bulk_create(
+        [
+            Ingredient(
+                name=row["name"], measurement_unit=row["measurement_unit"]
+            )
+            for row in DictReader(io.open(
+                "static/data/ingredients.csv", mode="r", encoding="utf-8"
+            ))
+        ],
+        batch_size=1000,
+        ignore_conflicts=True,
+    )
+    bump("ingredients")
     logging.info("Successfully - loading data table - Ingredient")
 
+    logging.info("Loading - data a table - MeasurementUnit")
+    call_command("load_units")
+    logging.info("Successfully - loading data table - MeasurementUnit")
+
     logging.info("Loading - data a table - Tag")
     for row in DictReader(
         io.open("static/data/tag.csv", mode="r", encoding="utf-8")
@@ -95,6 +108,10 @@ def main_fill():
         )
     logging.info("Successfully - loading data table - RecipeIngredient")
 
+    logging.info("Loading - data a table - IngredientNutrition")
+    call_command("load_nutrition")
+    logging.info("Successfully - loading data table - IngredientNutrition")
+
 
 def additional_fill():
     logging.info("Additional loading")
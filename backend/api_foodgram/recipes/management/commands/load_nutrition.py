@@ -0,0 +1,14 @@
+from django.core.management import BaseCommand
+from recipes.nutrition import load_nutrition
+
+
+class Command(BaseCommand):
+    help = "Loads ingredient nutrition and prices, recomputes recipe totals"
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', nargs='?',
+                            default='static/data/nutrition.csv')
+
+    def handle(self, *args, **options):
+        count = load_nutrition(options['path'])
+        self.stdout.write(f'Ingredient nutrition rows: {count}')
@@ -0,0 +1,21 @@
+from django.core.management import BaseCommand
+from recipes.units import load_conversions, load_units
+
+
+class Command(BaseCommand):
+    help = "Loads measurement units and per-ingredient conversions"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--units', default='static/data/units.csv'
+        )
+        parser.add_argument(
+            '--conversions', default='static/data/ingredient_conversions.csv'
+        )
+
+    def handle(self, *args, **options):
+        units = load_units(options['units'])
+        conversions = load_conversions(options['conversions'])
+        self.stdout.write(
+            f'Units: {units}, ingredient conversions: {conversions}'
+        )
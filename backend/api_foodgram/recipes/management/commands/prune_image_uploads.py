@@ -0,0 +1,32 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from recipes.models import ImageUpload
+
+
+class Command(BaseCommand):
+    help = "Deletes image uploads not used by a recipe within IMAGE_UPLOAD_TTL"
+
+    def handle(self, *args, **options):
+        expired = timezone.now() - timedelta(seconds=settings.IMAGE_UPLOAD_TTL)
+        deleted = 0
+        for pk in ImageUpload.objects.filter(
+            created__lt=expired
+        ).values_list("pk", flat=True).iterator():
+            # Запрос, который сейчас забирает загрузку в рецепт, держит
+            # блокировку строки: ждём его и удаляем, только если строка
+            # осталась.
+            with transaction.atomic():
+                upload = ImageUpload.objects.select_for_update().filter(
+                    pk=pk, created__lt=expired
+                ).first()
+                if upload is None:
+                    continue
+                upload.delete()
+            # Записи загрузок не удаляют файлы сами (cleanup.ignore).
+            upload.image.delete(save=False)
+            deleted += 1
+        self.stdout.write(f'Deleted uploads: {deleted}')
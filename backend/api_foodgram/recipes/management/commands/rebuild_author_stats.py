@@ -0,0 +1,15 @@
+from django.core.management import BaseCommand
+from recipes.stats import rebuild_author_stats
+
+
+class Command(BaseCommand):
+    help = "Recounts recipes, followers and favorites of authors"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'authors', nargs='*', type=int, help='Author ids, all by default'
+        )
+
+    def handle(self, *args, **options):
+        updated = rebuild_author_stats(options['authors'] or None)
+        self.stdout.write(f'Authors updated: {updated}')
@@ -0,0 +1,131 @@
+from django.db import transaction
+from django.db.models import (ExpressionWrapper, F, FloatField, OuterRef,
+                              Subquery, Sum, Value)
+
+from .models import MealPlan, MealPlanEntry, MealPlanItem, RecipeIngredient
+from .utils import get_scale, group_items, render_shopping_list
+
+# Остаток после вычитания, который считается нулём (погрешность float).
+EPSILON = 1e-6
+
+
+def get_plan_amounts(plan_ids):
+    """Количества ингредиентов планов одним GROUP BY по блюдам."""
+    return (
+        RecipeIngredient.objects
+        .filter(recipes__meal_plan_entries__plan__in=plan_ids)
+        .values(
+            plan_id=F("recipes__meal_plan_entries__plan"),
+            ingredient_id=F("ingredients"),
+        )
+        .annotate(total=Sum(ExpressionWrapper(
+            F("amount") * get_scale("recipes__meal_plan_entries__servings"),
+            output_field=FloatField(),
+        )))
+        .order_by()
+    )
+
+
+@transaction.atomic
+def rebuild_plans(plan_ids):
+    """Пересобирает списки покупок планов с нуля."""
+    plan_ids = list(plan_ids)
+    MealPlanItem.objects.filter(plan__in=plan_ids).delete()
+    MealPlanItem.objects.bulk_create([
+        MealPlanItem(
+            plan_id=row["plan_id"],
+            ingredient_id=row["ingredient_id"],
+            amount=row["total"],
+        )
+        for row in get_plan_amounts(plan_ids)
+    ])
+
+
+def rebuild_plans_for_recipes(pks):
+    """После смены состава рецептов пересобирает все планы с ними.
+
+    Прошедшие недели тоже: change_items вычитает текущий состав, и
+    оставленный старый список ушёл бы в минус при удалении блюда.
+    """
+    rebuild_plans(
+        MealPlan.objects.filter(entries__recipe__in=pks)
+        .values_list("pk", flat=True).distinct()
+    )
+
+
+def change_items(entry, sign):
+    """Прибавляет (sign=1) или вычитает (sign=-1) ингредиенты блюда."""
+    amounts = dict(
+        RecipeIngredient.objects.filter(recipes=entry.recipe_id)
+        .values_list("ingredients", "amount")
+    )
+    scale = sign * entry.servings / entry.recipe.servings
+    items = MealPlanItem.objects.filter(plan=entry.plan_id)
+    recipe_amount = (
+        RecipeIngredient.objects
+        .filter(recipes=entry.recipe_id, ingredients=OuterRef("ingredient"))
+        .values("amount")[:1]
+    )
+    items.filter(ingredient__in=amounts).update(amount=ExpressionWrapper(
+        F("amount") + Subquery(recipe_amount) * Value(scale),
+        output_field=FloatField(),
+    ))
+    if sign > 0:
+        existing = set(
+            items.filter(ingredient__in=amounts)
+            .values_list("ingredient", flat=True)
+        )
+        MealPlanItem.objects.bulk_create([
+            MealPlanItem(
+                plan_id=entry.plan_id,
+                ingredient_id=ingredient,
+                amount=amount * scale,
+            )
+            for ingredient, amount in amounts.items()
+            if ingredient not in existing
+        ])
+    else:
+        items.filter(amount__lte=EPSILON).delete()
+
+
+def lock_plan(plan_id):
+    # Параллельные изменения одного плана идут по очереди.
+    MealPlan.objects.select_for_update().filter(pk=plan_id).exists()
+
+
+@transaction.atomic
+def add_entry(plan, **fields):
+    lock_plan(plan.pk)
+    entry = MealPlanEntry.objects.create(plan=plan, **fields)
+    change_items(entry, 1)
+    return entry
+
+
+@transaction.atomic
+def change_entry(entry, **fields):
+    lock_plan(entry.plan_id)
+    change_items(entry, -1)
+    for field, value in fields.items():
+        setattr(entry, field, value)
+    entry.save()
+    change_items(entry, 1)
+    return entry
+
+
+@transaction.atomic
+def remove_entry(entry):
+    lock_plan(entry.plan_id)
+    change_items(entry, -1)
+    entry.delete()
+
+
+def get_plan_shopping_list(plan):
+    recipes = (
+        plan.entries.values_list("recipe__name", flat=True)
+        .order_by("recipe__name").distinct()
+    )
+    return render_shopping_list(
+        f"План на неделю с {plan.week_start:%d.%m.%Y}",
+        recipes,
+        group_items(plan.items.all(), "ingredient"),
+    )
@@ -0,0 +1,42 @@
+# Generated by Django 2.2.16 on 2026-10-18 23:52
+
+from django.db import migrations, models
+from django.db.models import Min
+
+
+def delete_duplicates(apps, schema_editor):
+    for model_name, fields in (
+        ('Cart', ('users', 'recipes')),
+        ('Favorite', ('users', 'recipes')),
+        ('Subscription', ('users', 'authors')),
+    ):
+        model = apps.get_model('recipes', model_name)
+        keep = (
+            model.objects.values(*fields)
+            .annotate(keep_id=Min('id'))
+            .values_list('keep_id', flat=True)
+        )
+        model.objects.exclude(id__in=list(keep)).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0003_auto_20230511_1353'),
+    ]
+
+    operations = [
+        migrations.RunPython(delete_duplicates, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='cart',
+            constraint=models.UniqueConstraint(fields=('users', 'recipes'), name='unique_cart'),
+        ),
+        migrations.AddConstraint(
+            model_name='favorite',
+            constraint=models.UniqueConstraint(fields=('users', 'recipes'), name='unique_favorite'),
+        ),
+        migrations.AddConstraint(
+            model_name='subscription',
+            constraint=models.UniqueConstraint(fields=('users', 'authors'), name='unique_subscription'),
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 2.2.16 on 2026-10-18 23:53
+
+import django.core.validators
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0004_unique_actions'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MeasurementUnit',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=200, unique=True, verbose_name='Единица измерения')),
+                ('canonical', models.CharField(max_length=200, verbose_name='Базовая единица')),
+                ('factor', models.FloatField(default=1, validators=[django.core.validators.MinValueValidator(0)], verbose_name='Множитель к базовой единице')),
+            ],
+            options={
+                'verbose_name': 'Единица измерения',
+                'verbose_name_plural': 'Единицы измерения',
+                'ordering': ('name',),
+            },
+        ),
+        migrations.CreateModel(
+            name='IngredientConversion',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('canonical', models.CharField(max_length=200, verbose_name='Базовая единица')),
+                ('factor', models.FloatField(validators=[django.core.validators.MinValueValidator(0)], verbose_name='Множитель к базовой единице')),
+                ('ingredient', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='conversion', to='recipes.Ingredient', verbose_name='Ингредиент')),
+            ],
+            options={
+                'verbose_name': 'Пересчёт ингредиента',
+                'verbose_name_plural': 'Пересчёты ингредиентов',
+                'ordering': ('id',),
+            },
+        ),
+        migrations.AddField(
+            model_name='ingredient',
+            name='unit',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='ingredients', to='recipes.MeasurementUnit', verbose_name='Единица для пересчёта'),
+        ),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 2.2.16 on 2026-10-18 23:54
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0005_measurement_units'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='calories',
+            field=models.FloatField(db_index=True, default=0, verbose_name='Калории'),
+        ),
+        migrations.AddField(
+            model_name='recipe',
+            name='carbohydrates',
+            field=models.FloatField(default=0, verbose_name='Углеводы'),
+        ),
+        migrations.AddField(
+            model_name='recipe',
+            name='cost',
+            field=models.FloatField(db_index=True, default=0, verbose_name='Стоимость'),
+        ),
+        migrations.AddField(
+            model_name='recipe',
+            name='fats',
+            field=models.FloatField(default=0, verbose_name='Жиры'),
+        ),
+        migrations.AddField(
+            model_name='recipe',
+            name='proteins',
+            field=models.FloatField(default=0, verbose_name='Белки'),
+        ),
+        migrations.CreateModel(
+            name='IngredientNutrition',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('calories', models.FloatField(default=0, verbose_name='Калории')),
+                ('proteins', models.FloatField(default=0, verbose_name='Белки')),
+                ('fats', models.FloatField(default=0, verbose_name='Жиры')),
+                ('carbohydrates', models.FloatField(default=0, verbose_name='Углеводы')),
+                ('price', models.FloatField(default=0, verbose_name='Цена')),
+                ('ingredient', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='nutrition', to='recipes.Ingredient', verbose_name='Ингредиент')),
+            ],
+            options={
+                'verbose_name': 'Пищевая ценность',
+                'verbose_name_plural': 'Пищевая ценность',
+                'ordering': ('id',),
+            },
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 2.2.16 on 2026-10-19 00:04
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0007_meal_plan'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='cart',
+            name='servings',
+            field=models.PositiveSmallIntegerField(blank=True, help_text='Пусто — столько порций, сколько в рецепте', null=True, validators=[django.core.validators.MinValueValidator(1)], verbose_name='Порции'),
+        ),
+        migrations.AddField(
+            model_name='recipe',
+            name='servings',
+            field=models.PositiveSmallIntegerField(default=1, validators=[django.core.validators.MinValueValidator(1)], verbose_name='Порции'),
+        ),
+    ]
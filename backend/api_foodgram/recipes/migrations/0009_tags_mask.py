@@ -0,0 +1,50 @@
+# Generated by Django 2.2.16 on 2026-10-19 00:16
+
+from collections import defaultdict
+
+from django.db import migrations, models
+
+MAX_TAG_BITS = 63
+
+
+def fill_masks(apps, schema_editor):
+    Tag = apps.get_model('recipes', 'Tag')
+    Recipe = apps.get_model('recipes', 'Recipe')
+    RecipeTag = apps.get_model('recipes', 'RecipeTag')
+    tags = list(Tag.objects.order_by('id'))
+    if len(tags) > MAX_TAG_BITS:
+        raise ValueError(f'More than {MAX_TAG_BITS} tags')
+    for bit, tag in enumerate(tags):
+        tag.bit = bit
+    Tag.objects.bulk_update(tags, ['bit'])
+    bits = {tag.id: tag.bit for tag in tags}
+    masks = defaultdict(int)
+    for recipe_id, tag_id in RecipeTag.objects.values_list(
+        'recipes_id', 'tags_id'
+    ):
+        masks[recipe_id] |= 1 << bits[tag_id]
+    recipes = list(Recipe.objects.filter(id__in=masks).only('id'))
+    for recipe in recipes:
+        recipe.tags_mask = masks[recipe.id]
+    Recipe.objects.bulk_update(recipes, ['tags_mask'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0008_servings'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='tags_mask',
+            field=models.BigIntegerField(default=0, editable=False, verbose_name='Маска тегов'),
+        ),
+        migrations.AddField(
+            model_name='tag',
+            name='bit',
+            field=models.PositiveSmallIntegerField(editable=False, null=True, unique=True, verbose_name='Бит в маске рецепта'),
+        ),
+        migrations.RunPython(fill_masks, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,71 @@
+# Generated by Django 2.2.16 on 2026-10-19 00:21
+
+from collections import Counter
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def fill_stats(apps, schema_editor):
+    User = apps.get_model(settings.AUTH_USER_MODEL)
+    AuthorStats = apps.get_model('recipes', 'AuthorStats')
+    Recipe = apps.get_model('recipes', 'Recipe')
+    Subscription = apps.get_model('recipes', 'Subscription')
+    Favorite = apps.get_model('recipes', 'Favorite')
+    recipes = Counter(Recipe.objects.values_list('author_id', flat=True))
+    followers = Counter(
+        Subscription.objects.values_list('authors_id', flat=True)
+    )
+    favorites = Counter(
+        Favorite.objects.values_list('recipes__author_id', flat=True)
+    )
+    AuthorStats.objects.bulk_create(
+        [
+            AuthorStats(
+                author_id=pk,
+                recipes_count=recipes[pk],
+                followers_count=followers[pk],
+                favorites_count=favorites[pk],
+            )
+            for pk in User.objects.values_list('pk', flat=True)
+        ],
+        batch_size=500,
+    )
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_revoked_token'),
+        ('recipes', '0009_tags_mask'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuthorStats',
+            fields=[
+                ('author', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to=settings.AUTH_USER_MODEL, verbose_name='Автор')),
+                ('recipes_count', models.PositiveIntegerField(default=0, verbose_name='Рецептов')),
+                ('followers_count', models.PositiveIntegerField(default=0, verbose_name='Подписчиков')),
+                ('favorites_count', models.PositiveIntegerField(default=0, verbose_name='Рецептов в избранном')),
+            ],
+            options={
+                'verbose_name': 'Статистика автора',
+                'verbose_name_plural': 'Статистика авторов',
+                'ordering': ('author',),
+            },
+        ),
+        migrations.AddIndex(
+            model_name='authorstats',
+            index=models.Index(fields=['-recipes_count', 'author'], name='stats_recipes_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='authorstats',
+            index=models.Index(fields=['-followers_count', 'author'], name='stats_followers_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='authorstats',
+            index=models.Index(fields=['-favorites_count', 'author'], name='stats_favorites_idx'),
+        ),
+        migrations.RunPython(fill_stats, migrations.RunPython.noop),
+    ]
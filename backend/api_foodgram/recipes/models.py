@@ -1,7 +1,12 @@
+import secrets
+
 from colorfield.fields import ColorField
 from django.contrib.auth import get_user_model
 from django.core.validators import MinValueValidator
 from django.db import models
+from django_cleanup import cleanup
+
+from .tags import get_free_bit
 
 User = get_user_model()
 
@@ -12,16 +17,51 @@ class Tag(models.Model):
     )
     color = ColorField(verbose_name="Цвет", unique=True, max_length=7)
     slug = models.SlugField(verbose_name="Cлаг", unique=True, max_length=200)
+    bit = models.PositiveSmallIntegerField(
+        verbose_name="Бит в маске рецепта",
+        unique=True,
+        null=True,
+        editable=False,
+    )
 
     def __str__(self):
         return self.slug
 
+    def save(self, *args, **kwargs):
+        if self.bit is None:
+            self.bit = get_free_bit(Tag)
+        super().save(*args, **kwargs)
+
     class Meta:
         ordering = ("id",)
         verbose_name = "Тег"
         verbose_name_plural = "Теги"
 
 
+class MeasurementUnit(models.Model):
+    name = models.CharField(
+        verbose_name="Единица измерения", unique=True, max_length=200
+    )
+    canonical = models.CharField(
+        verbose_name="Базовая единица", max_length=200
+    )
+    factor = models.FloatField(
+        verbose_name="Множитель к базовой единице",
+        default=1,
+        validators=[
+            MinValueValidator(0),
+        ],
+    )
+
+    def __str__(self):
+        return self.name
+
+    class Meta:
+        ordering = ("name",)
+        verbose_name = "Единица измерения"
+        verbose_name_plural = "Единицы измерения"
+
+
 class Ingredient(models.Model):
     name = models.CharField(
         verbose_name="Название ингредиента", max_length=200
@@ -29,10 +69,27 @@ class Ingredient(models.Model):
     measurement_unit = models.CharField(
         verbose_name="Единица измерения", max_length=200
     )
+    unit = models.ForeignKey(
+        MeasurementUnit,
+        related_name="ingredients",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        verbose_name="Единица для пересчёта",
+    )
 
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        # Для одиночных правок. Пачки (load_data, load_units) связываются
+        # одним UPDATE в units.link_ingredients.
+        if self.unit_id is None:
+            self.unit = MeasurementUnit.objects.filter(
+                name=self.measurement_unit
+            ).first()
+        super().save(*args, **kwargs)
+
     class Meta:
         constraints = [
             models.UniqueConstraint(
@@ -45,6 +102,58 @@ class Ingredient(models.Model):
         verbose_name_plural = "Ингредиенты"
 
 
+class IngredientConversion(models.Model):
+    """Пересчёт для конкретного ингредиента, например стакан муки в граммы."""
+
+    ingredient = models.OneToOneField(
+        Ingredient,
+        related_name="conversion",
+        on_delete=models.CASCADE,
+        verbose_name="Ингредиент",
+    )
+    canonical = models.CharField(
+        verbose_name="Базовая единица", max_length=200
+    )
+    factor = models.FloatField(
+        verbose_name="Множитель к базовой единице",
+        validators=[
+            MinValueValidator(0),
+        ],
+    )
+
+    def __str__(self):
+        return f"{self.ingredient} -> {self.canonical}"
+
+    class Meta:
+        ordering = ("id",)
+        verbose_name = "Пересчёт ингредиента"
+        verbose_name_plural = "Пересчёты ингредиентов"
+
+
+class IngredientNutrition(models.Model):
+    """Справочные значения на одну единицу измерения ингредиента."""
+
+    ingredient = models.OneToOneField(
+        Ingredient,
+        related_name="nutrition",
+        on_delete=models.CASCADE,
+        verbose_name="Ингредиент",
+    )
+    calories = models.FloatField(verbose_name="Калории", default=0)
+    proteins = models.FloatField(verbose_name="Белки", default=0)
+    fats = models.FloatField(verbose_name="Жиры", default=0)
+    carbohydrates = models.FloatField(verbose_name="Углеводы", default=0)
+    price = models.FloatField(verbose_name="Цена", default=0)
+
+    def __str__(self):
+        return f"{self.ingredient}"
+
+    class Meta:
+        ordering = ("id",)
+        verbose_name = "Пищевая ценность"
+        verbose_name_plural = "Пищевая ценность"
+
+
 class Recipe(models.Model):
     tags = models.ManyToManyField(
         Tag,
@@ -80,6 +189,25 @@ class Recipe(models.Model):
         auto_now_add=True,
         verbose_name="Дата публикации",
     )
+    servings = models.PositiveSmallIntegerField(
+        validators=[
+            MinValueValidator(1),
+        ],
+        default=1,
+        verbose_name="Порции",
+    )
+    calories = models.FloatField(
+        verbose_name="Калории", default=0, db_index=True
+    )
+    proteins = models.FloatField(verbose_name="Белки", default=0)
+    fats = models.FloatField(verbose_name="Жиры", default=0)
+    carbohydrates = models.FloatField(verbose_name="Углеводы", default=0)
+    cost = models.FloatField(
+        verbose_name="Стоимость", default=0, db_index=True
+    )
+    tags_mask = models.BigIntegerField(
+        verbose_name="Маска тегов", default=0, editable=False
+    )
 
     def __str__(self):
         return f"{self.name}"
@@ -96,6 +224,44 @@ class Recipe(models.Model):
         verbose_name_plural = "Рецепты"
 
 
+def get_upload_token():
+    return secrets.token_hex(16)
+
+
+# Файл переходит к рецепту, поэтому удаление записи его не трогает.
+@cleanup.ignore
+class ImageUpload(models.Model):
+    """Картинка, загруженная заранее; рецепт ссылается на неё токеном."""
+
+    user = models.ForeignKey(
+        User,
+        related_name="image_uploads",
+        on_delete=models.CASCADE,
+        verbose_name="Пользователь",
+    )
+    token = models.CharField(
+        verbose_name="Токен",
+        max_length=32,
+        unique=True,
+        default=get_upload_token,
+    )
+    image = models.ImageField(
+        verbose_name="Изображение",
+        upload_to="recipes/images/",
+    )
+    created = models.DateTimeField(
+        verbose_name="Загружено", auto_now_add=True, db_index=True
+    )
+
+    def __str__(self):
+        return self.token
+
+    class Meta:
+        ordering = ("-created",)
+        verbose_name = "Загрузка изображения"
+        verbose_name_plural = "Загрузки изображений"
+
+
 class RecipeIngredient(models.Model):
     recipes = models.ForeignKey(
         Recipe,
@@ -180,7 +346,23 @@ class Actions(models.Model):
 
 
 class Cart(Actions):
+    servings = models.PositiveSmallIntegerField(
+        validators=[
+            MinValueValidator(1),
+        ],
+        null=True,
+        blank=True,
+        verbose_name="Порции",
+        help_text="Пусто — столько порций, сколько в рецепте",
+    )
+
     class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                name='unique_cart',
+                fields=['users', 'recipes'],
+            )
+        ]
         ordering = ("id",)
         verbose_name = "Корзина"
         verbose_name_plural = "Корзины"
@@ -188,6 +370,12 @@ class Cart(Actions):
 
 class Favorite(Actions):
     class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                name='unique_favorite',
+                fields=['users', 'recipes'],
+            )
+        ]
         ordering = ("id",)
         verbose_name = "Избранный"
         verbose_name_plural = "Избранные"
@@ -208,6 +396,156 @@ class Subscription(models.Model):
     )
 
     class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                name='unique_subscription',
+                fields=['users', 'authors'],
+            )
+        ]
         ordering = ("id",)
         verbose_name = "Подписка"
         verbose_name_plural = "Подписки"
+
+
+class AuthorStats(models.Model):
+    """Счётчики автора, обновляются вместе с рецептами, подписками и
+    избранным."""
+
+    author = models.OneToOneField(
+        User,
+        related_name="stats",
+        on_delete=models.CASCADE,
+        primary_key=True,
+        verbose_name="Автор",
+    )
+    recipes_count = models.PositiveIntegerField(
+        verbose_name="Рецептов", default=0
+    )
+    followers_count = models.PositiveIntegerField(
+        verbose_name="Подписчиков", default=0
+    )
+    favorites_count = models.PositiveIntegerField(
+        verbose_name="Рецептов в избранном", default=0
+    )
+
+    def __str__(self):
+        return f"{self.author}"
+
+    class Meta:
+        indexes = [
+            models.Index(
+                name="stats_recipes_idx", fields=["-recipes_count", "author"]
+            ),
+            models.Index(
+                name="stats_followers_idx",
+                fields=["-followers_count", "author"],
+            ),
+            models.Index(
+                name="stats_favorites_idx",
+                fields=["-favorites_count", "author"],
+            ),
+        ]
+        ordering = ("author",)
+        verbose_name = "Статистика автора"
+        verbose_name_plural = "Статистика авторов"
+
+
+class MealPlan(models.Model):
+    user = models.ForeignKey(
+        User,
+        related_name="meal_plans",
+        on_delete=models.CASCADE,
+        verbose_name="Пользователь",
+    )
+    week_start = models.DateField(verbose_name="Начало недели")
+
+    def __str__(self):
+        return f"{self.user} {self.week_start}"
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                name='unique_meal_plan',
+                fields=['user', 'week_start'],
+            )
+        ]
+        ordering = ("-week_start",)
+        verbose_name = "План питания"
+        verbose_name_plural = "Планы питания"
+
+
+class MealPlanEntry(models.Model):
+    BREAKFAST = "breakfast"
+    LUNCH = "lunch"
+    DINNER = "dinner"
+    SNACK = "snack"
+    SLOTS = (
+        (BREAKFAST, "Завтрак"),
+        (LUNCH, "Обед"),
+        (DINNER, "Ужин"),
+        (SNACK, "Перекус"),
+    )
+
+    plan = models.ForeignKey(
+        MealPlan,
+        related_name="entries",
+        on_delete=models.CASCADE,
+        verbose_name="План",
+    )
+    date = models.DateField(verbose_name="Дата")
+    slot = models.CharField(
+        verbose_name="Приём пищи", max_length=16, choices=SLOTS
+    )
+    recipe = models.ForeignKey(
+        Recipe,
+        related_name="meal_plan_entries",
+        on_delete=models.CASCADE,
+        verbose_name="Рецепт",
+    )
+    servings = models.PositiveSmallIntegerField(
+        validators=[
+            MinValueValidator(1),
+        ],
+        default=1,
+        verbose_name="Порции",
+    )
+
+    def __str__(self):
+        return f"{self.date} {self.get_slot_display()}: {self.recipe}"
+
+    class Meta:
+        ordering = ("date", "id")
+        verbose_name = "Блюдо плана"
+        verbose_name_plural = "Блюда плана"
+
+
+class MealPlanItem(models.Model):
+    """Сводный список покупок плана, обновляется вместе с блюдами."""
+
+    plan = models.ForeignKey(
+        MealPlan,
+        related_name="items",
+        on_delete=models.CASCADE,
+        verbose_name="План",
+    )
+    ingredient = models.ForeignKey(
+        Ingredient,
+        related_name="meal_plan_items",
+        on_delete=models.CASCADE,
+        verbose_name="Ингредиент",
+    )
+    amount = models.FloatField(verbose_name="Количество")
+
+    def __str__(self):
+        return f"{self.ingredient} - {self.amount}"
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                name='unique_meal_plan_item',
+                fields=['plan', 'ingredient'],
+            )
+        ]
+        ordering = ("id",)
+        verbose_name = "Покупка плана"
+        verbose_name_plural = "Покупки плана"
@@ -0,0 +1,87 @@
+import io
+from csv import DictReader
+
+from django.db import transaction
+from django.db.models import (ExpressionWrapper, F, FloatField, OuterRef,
+                              Subquery, Sum, Value)
+from django.db.models.functions import Coalesce
+
+from .models import Ingredient, IngredientNutrition, Recipe, RecipeIngredient
+from .signals import recipes_updated
+
+NUTRITION_FIELDS = ("calories", "proteins", "fats", "carbohydrates")
+# Поле итога рецепта и справочное поле ингредиента.
+TOTALS = {field: field for field in NUTRITION_FIELDS}
+TOTALS["cost"] = "price"
+
+
+def get_total(source):
+    totals = (
+        RecipeIngredient.objects.filter(recipes=OuterRef("pk"))
+        .order_by()
+        .values("recipes")
+        .annotate(total=Sum(ExpressionWrapper(
+            F("amount") * F(f"ingredients__nutrition__{source}"),
+            output_field=FloatField(),
+        )))
+        .values("total")
+    )
+    return Coalesce(
+        Subquery(totals, output_field=FloatField()), Value(0.0)
+    )
+
+
+def update_nutrition(pks=None):
+    """Пересчитывает итоги рецептов одним UPDATE.
+
+    Без pks пересчитываются все рецепты, например после загрузки
+    справочника.
+    """
+    recipes = Recipe.objects.all()
+    if pks is not None:
+        recipes = recipes.filter(pk__in=pks)
+    updated = recipes.update(
+        **{field: get_total(source) for field, source in TOTALS.items()}
+    )
+    recipes_updated.send(sender=Recipe, pks=pks)
+    return updated
+
+
+def update_ingredient_nutrition(ingredient):
+    update_nutrition(list(
+        RecipeIngredient.objects.filter(ingredients=ingredient)
+        .values_list("recipes", flat=True)
+    ))
+
+
+@transaction.atomic
+def load_nutrition(path):
+    ingredients = {
+        (name, measurement_unit): pk
+        for pk, name, measurement_unit in Ingredient.objects.values_list(
+            "pk", "name", "measurement_unit"
+        )
+    }
+    existing = {
+        nutrition.ingredient_id: nutrition
+        for nutrition in IngredientNutrition.objects.all()
+    }
+    fields = NUTRITION_FIELDS + ("price",)
+    created, changed = [], []
+    with io.open(path, mode="r", encoding="utf-8") as file:
+        for row in DictReader(file):
+            pk = ingredients.get((row["name"], row["measurement_unit"]))
+            if pk is None:
+                continue
+            values = {field: float(row[field]) for field in fields}
+            nutrition = existing.get(pk)
+            if nutrition is None:
+                created.append(IngredientNutrition(ingredient_id=pk, **values))
+                continue
+            for field, value in values.items():
+                setattr(nutrition, field, value)
+            changed.append(nutrition)
+    IngredientNutrition.objects.bulk_create(created)
+    IngredientNutrition.objects.bulk_update(changed, fields)
+    update_nutrition()
+    return len(created) + len(changed)
@@ -0,0 +1,100 @@
+from django.db import transaction
+from django.db.models.signals import (m2m_changed, post_delete, post_save,
+                                      pre_delete)
+from django.dispatch import Signal, receiver
+
+from .meal_plan import rebuild_plans
+from .models import (AuthorStats, Favorite, ImageUpload, MealPlanEntry,
+                     Recipe, RecipeTag, Subscription, User)
+from .stats import change_stats
+from .tags import update_tags_mask
+
+# Поля рецептов изменены массовым UPDATE в обход save(): pks — список
+# первичных ключей или None, если затронуты все рецепты.
+recipes_updated = Signal(providing_args=["pks"])
+
+
+@receiver(pre_delete, sender=Recipe)
+def recipe_deleted(sender, instance, **kwargs):
+    # Блюда удалятся каскадом, списки покупок планов пересобираются
+    # после коммита, когда блюд уже нет.
+    plan_ids = list(
+        MealPlanEntry.objects.filter(recipe=instance)
+        .values_list("plan", flat=True).distinct()
+    )
+    if plan_ids:
+        transaction.on_commit(lambda: rebuild_plans(plan_ids))
+
+
+@receiver(post_save, sender=RecipeTag)
+@receiver(post_delete, sender=RecipeTag)
+def recipe_tag_changed(sender, instance, **kwargs):
+    update_tags_mask([instance.recipes_id])
+
+
+@receiver(m2m_changed, sender=RecipeTag)
+def recipe_tags_changed(sender, instance, action, pk_set, **kwargs):
+    if isinstance(instance, Recipe):
+        if action.startswith("post_"):
+            update_tags_mask([instance.pk])
+    elif action == "pre_clear":
+        # После очистки связей рецепты тега уже не найти.
+        instance._cleared_recipes = list(
+            instance.recipes_tags.values_list("pk", flat=True)
+        )
+    elif action == "post_clear":
+        update_tags_mask(instance._cleared_recipes)
+    elif action.startswith("post_") and pk_set:
+        update_tags_mask(pk_set)
+
+
+@receiver(post_save, sender=User)
+def user_created(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        AuthorStats.objects.get_or_create(author=instance)
+
+
+def delete_files(storage, names):
+    for name in names:
+        storage.delete(name)
+
+
+@receiver(pre_delete, sender=User)
+def user_deleted(sender, instance, **kwargs):
+    # Загрузки удалятся каскадом, но файлы за ними не следят
+    # (cleanup.ignore): их удаляем после коммита.
+    names = list(
+        ImageUpload.objects.filter(user=instance)
+        .values_list("image", flat=True)
+    )
+    if names:
+        storage = ImageUpload._meta.get_field("image").storage
+        transaction.on_commit(lambda: delete_files(storage, names))
+
+
+@receiver(post_save, sender=Recipe)
+@receiver(post_delete, sender=Recipe)
+def recipe_count_changed(sender, instance, created=None, **kwargs):
+    # created равен None для удаления и False для изменения.
+    if created is not False:
+        change_stats([instance.author_id], "recipes_count",
+                     1 if created else -1)
+
+
+@receiver(post_save, sender=Subscription)
+@receiver(post_delete, sender=Subscription)
+def subscription_changed(sender, instance, created=None, **kwargs):
+    if created is not False:
+        change_stats([instance.authors_id], "followers_count",
+                     1 if created else -1)
+
+
+@receiver(post_save, sender=Favorite)
+@receiver(post_delete, sender=Favorite)
+def favorite_changed(sender, instance, created=None, **kwargs):
+    if created is not False:
+        change_stats(
+            Recipe.objects.filter(pk=instance.recipes_id).values("author"),
+            "favorites_count",
+            1 if created else -1,
+        )
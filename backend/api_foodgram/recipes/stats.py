@@ -0,0 +1,63 @@
+from collections import Counter
+
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from .models import AuthorStats, Favorite, Recipe, Subscription, User
+
+# Счётчик: модель и поле, ведущее от неё к автору.
+COUNTERS = {
+    "recipes_count": (Recipe, "author"),
+    "followers_count": (Subscription, "authors"),
+    "favorites_count": (Favorite, "recipes__author"),
+}
+
+
+def change_stats(authors, field, delta):
+    """Сдвигает счётчик авторов на delta одним UPDATE в текущей
+    транзакции."""
+    return AuthorStats.objects.filter(author__in=authors).update(
+        **{field: F(field) + delta}
+    )
+
+
+def change_favorites(recipe_pks, delta):
+    """Избранное добавлено или удалено пачкой в обход сигналов."""
+    authors = Counter(
+        Recipe.objects.filter(pk__in=recipe_pks)
+        .values_list("author", flat=True)
+    )
+    for author, count in authors.items():
+        change_stats([author], "favorites_count", delta * count)
+
+
+def get_count(model, field):
+    counts = (
+        model.objects.filter(**{field: OuterRef("pk")})
+        .order_by()
+        .values(field)
+        .annotate(count=Count("pk"))
+        .values("count")
+    )
+    return Coalesce(Subquery(counts, output_field=IntegerField()), Value(0))
+
+
+def rebuild_author_stats(authors=None):
+    """Пересчитывает счётчики с нуля, создавая недостающие строки."""
+    users = User.objects.all()
+    if authors is not None:
+        users = users.filter(pk__in=authors)
+    AuthorStats.objects.bulk_create(
+        [
+            AuthorStats(author_id=pk)
+            for pk in users.filter(stats=None).values_list("pk", flat=True)
+        ],
+        ignore_conflicts=True,
+    )
+    stats = AuthorStats.objects.all()
+    if authors is not None:
+        stats = stats.filter(author__in=authors)
+    return stats.update(**{
+        counter: get_count(model, field)
+        for counter, (model, field) in COUNTERS.items()
+    })
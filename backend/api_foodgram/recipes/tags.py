@@ -0,0 +1,60 @@
+from django.core.exceptions import ValidationError
+from django.db.models import (BigIntegerField, ExpressionWrapper, F, OuterRef,
+                              Subquery, Sum, Value)
+from django.db.models.functions import Cast, Coalesce
+
+# Маска хранится в BigInteger со знаком, старший бит не используем.
+MAX_TAG_BITS = 63
+
+
+def get_free_bit(tag_model):
+    used = set(
+        tag_model.objects.exclude(bit=None).values_list("bit", flat=True)
+    )
+    for bit in range(MAX_TAG_BITS):
+        if bit not in used:
+            return bit
+    raise ValidationError(f"Тегов не может быть больше {MAX_TAG_BITS}")
+
+
+def assign_tag_bits():
+    """Биты тегам, созданным в обход Tag.save(): bulk_create, импорт."""
+    from .models import Tag
+
+    for tag in Tag.objects.filter(bit=None).order_by("id"):
+        Tag.objects.filter(pk=tag.pk).update(bit=get_free_bit(Tag))
+
+
+def get_mask(tags):
+    """Маска для набора тегов; теги без бита в маску не входят."""
+    mask = 0
+    for tag in tags:
+        if tag.bit is not None:
+            mask |= 1 << tag.bit
+    return mask
+
+
+def update_tags_mask(pks=None):
+    """Пересчитывает маски тегов рецептов одним UPDATE.
+
+    Биты у тегов рецепта разные, поэтому сумма степеней двойки
+    равна их побитовому ИЛИ.
+    """
+    from .models import Recipe, RecipeTag
+
+    masks = (
+        RecipeTag.objects.filter(recipes=OuterRef("pk"))
+        .order_by()
+        .values("recipes")
+        .annotate(mask=Sum(ExpressionWrapper(
+            Cast(Value(1), BigIntegerField()).bitleftshift(F("tags__bit")),
+            output_field=BigIntegerField(),
+        )))
+        .values("mask")
+    )
+    recipes = Recipe.objects.all()
+    if pks is not None:
+        recipes = recipes.filter(pk__in=pks)
+    return recipes.update(tags_mask=Coalesce(
+        Subquery(masks, output_field=BigIntegerField()), Value(0)
+    ))
@@ -0,0 +1,27 @@
+from django.test import TestCase
+
+from .models import Ingredient, MeasurementUnit
+from .units import link_ingredients
+
+
+class IngredientUnitTests(TestCase):
+    def setUp(self):
+        self.gram = MeasurementUnit.objects.create(name='г', canonical='г')
+
+    def test_save_resolves_unit(self):
+        ingredient = Ingredient.objects.create(
+            name='сахар', measurement_unit='г'
+        )
+        self.assertEqual(ingredient.unit, self.gram)
+
+    def test_link_ingredients_in_one_query(self):
+        Ingredient.objects.bulk_create([
+            Ingredient(name='ингредиент {}'.format(i), measurement_unit='г')
+            for i in range(50)
+        ] + [Ingredient(name='вода', measurement_unit='стакан')])
+        with self.assertNumQueries(1):
+            link_ingredients()
+        self.assertEqual(
+            Ingredient.objects.filter(unit=self.gram).count(), 50
+        )
+        self.assertIsNone(Ingredient.objects.get(name='вода').unit)
@@ -0,0 +1,77 @@
+import io
+from csv import DictReader
+
+from django.db import transaction
+from django.db.models import OuterRef, Subquery
+
+from .models import Ingredient, IngredientConversion, MeasurementUnit
+
+
+def read_csv(path):
+    with io.open(path, mode="r", encoding="utf-8") as file:
+        return list(DictReader(file))
+
+
+@transaction.atomic
+def load_units(path):
+    """Создаёт и обновляет единицы пачками, затем связывает ингредиенты."""
+    existing = {unit.name: unit for unit in MeasurementUnit.objects.all()}
+    created, changed = [], []
+    for row in read_csv(path):
+        unit = existing.get(row["name"])
+        if unit is None:
+            created.append(MeasurementUnit(
+                name=row["name"],
+                canonical=row["canonical"],
+                factor=float(row["factor"]),
+            ))
+            continue
+        unit.canonical = row["canonical"]
+        unit.factor = float(row["factor"])
+        changed.append(unit)
+    MeasurementUnit.objects.bulk_create(created)
+    MeasurementUnit.objects.bulk_update(changed, ["canonical", "factor"])
+    link_ingredients()
+    return len(created) + len(changed)
+
+
+def link_ingredients():
+    """Проставляет единицу всем ингредиентам одним UPDATE."""
+    return Ingredient.objects.update(unit=Subquery(
+        MeasurementUnit.objects.filter(
+            name=OuterRef("measurement_unit")
+        ).values("pk")[:1]
+    ))
+
+
+@transaction.atomic
+def load_conversions(path):
+    ingredients = {
+        (name, measurement_unit): pk
+        for pk, name, measurement_unit in Ingredient.objects.values_list(
+            "pk", "name", "measurement_unit"
+        )
+    }
+    existing = {
+        conversion.ingredient_id: conversion
+        for conversion in IngredientConversion.objects.all()
+    }
+    created, changed = [], []
+    for row in read_csv(path):
+        pk = ingredients.get((row["name"], row["measurement_unit"]))
+        if pk is None:
+            continue
+        conversion = existing.get(pk)
+        if conversion is None:
+            created.append(IngredientConversion(
+                ingredient_id=pk,
+                canonical=row["canonical"],
+                factor=float(row["factor"]),
+            ))
+            continue
+        conversion.canonical = row["canonical"]
+        conversion.factor = float(row["factor"])
+        changed.append(conversion)
+    IngredientConversion.objects.bulk_create(created)
+    IngredientConversion.objects.bulk_update(changed, ["canonical", "factor"])
+    return len(created) + len(changed)
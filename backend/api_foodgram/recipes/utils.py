@@ -0,0 +1,78 @@
+from django.db.models import ExpressionWrapper, F, FloatField, Sum, Value
+from django.db.models.functions import Cast, Coalesce
+
+from .models import Recipe, RecipeIngredient
+
+
+def get_factor(ingredient='ingredients'):
+    """Множитель пересчёта в базовую единицу.
+
+    Пересчёт конкретного ингредиента важнее общего для единицы, единицы
+    без пересчёта остаются как есть.
+    """
+    return Coalesce(
+        f'{ingredient}__conversion__factor',
+        f'{ingredient}__unit__factor',
+        Value(1.0),
+    )
+
+
+def get_unit(ingredient='ingredients'):
+    return Coalesce(
+        f'{ingredient}__conversion__canonical',
+        f'{ingredient}__unit__canonical',
+        f'{ingredient}__measurement_unit',
+    )
+
+
+def get_scale(servings, base='recipes__servings'):
+    """Доля рецепта для servings порций, в дробях даже для целых полей."""
+    return Cast(servings, FloatField()) / F(base)
+
+
+def group_items(queryset, ingredient='ingredients', scale=Value(1.0)):
+    """Сворачивает строки с amount по ингредиенту и базовой единице."""
+    return (
+        queryset
+        .values(name=F(f'{ingredient}__name'), unit=get_unit(ingredient))
+        .annotate(amount=Sum(ExpressionWrapper(
+            F('amount') * get_factor(ingredient) * scale,
+            output_field=FloatField(),
+        )))
+        .order_by('name', 'unit')
+    )
+
+
+def get_shopping_list_items(user):
+    """Сводный список покупок одним GROUP BY с пересчётом в базовые единицы.
+
+    Рецепт в корзине без своего числа порций берётся целиком.
+    """
+    return group_items(
+        RecipeIngredient.objects.filter(recipes__recipes_cart__users=user),
+        scale=get_scale(Coalesce(
+            'recipes__recipes_cart__servings', 'recipes__servings'
+        )),
+    )
+
+
+def render_shopping_list(title, recipes, items):
+    text = f'{title:-^54}'
+    text += f'\nРецепты: {", ".join(recipes)}'
+    text += '\n------------------------------------------------------'
+    for item in items:
+        amount = round(item['amount'], 2)
+        if amount == int(amount):
+            amount = int(amount)
+        text += f'\n - {item["name"]}, {item["unit"]} - {amount}'
+    text += '\n------------------------------------------------------'
+    return text
+
+
+def get_shopping_list(user):
+    recipes = Recipe.objects.filter(
+        recipes_cart__users=user
+    ).values_list('name', flat=True)
+    return render_shopping_list(
+        'Корзина', recipes, get_shopping_list_items(user)
+    )
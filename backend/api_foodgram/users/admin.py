@@ -1,12 +1,20 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
+from api_foodgram.admin_tools import EstimatedCountPaginator, input_filter
 
 from .models import CustomUser
 
 
 class CustomUserAdmin(UserAdmin):
-    list_filter = ("email", "username")
+    list_filter = (
+        input_filter("email__iexact", "почте"),
+        input_filter("username", "логину"),
+        "is_staff",
+        "is_active",
+    )
     search_fields = ("email", "username")
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
 
 admin.site.register(CustomUser, CustomUserAdmin)
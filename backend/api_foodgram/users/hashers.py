@@ -0,0 +1,88 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.hashers import (Argon2PasswordHasher,
+                                         PBKDF2PasswordHasher)
+from rest_framework.exceptions import Throttled
+
+POOL_NAME = 'password-hashing'
+
+_pool = None
+_slots = None
+_pool_pid = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """Пул и счётчик мест в нём.
+
+    Создаются лениво и заново после fork (gunicorn --preload).
+    """
+    global _pool, _slots, _pool_pid
+    with _pool_lock:
+        if _pool is None or _pool_pid != os.getpid():
+            _pool = ThreadPoolExecutor(
+                max_workers=settings.PASSWORD_HASHING_THREADS,
+                thread_name_prefix=POOL_NAME,
+            )
+            _slots = threading.BoundedSemaphore(
+                settings.PASSWORD_HASHING_THREADS
+                + settings.PASSWORD_HASHING_QUEUE
+            )
+            _pool_pid = os.getpid()
+        return _pool, _slots
+
+
+def run_in_pool(func, *args, **kwargs):
+    """Выполняет func в пуле и ждёт результата.
+
+    Если в очереди пула уже PASSWORD_HASHING_QUEUE паролей, сразу
+    отвечает 429, а не держит поток запроса в ожидании.
+
+    Вызов из потока пула выполняется сразу: PBKDF2 проверяет пароль
+    через encode, и повторная отправка в занятый пул ждала бы сама себя.
+    """
+    if threading.current_thread().name.startswith(POOL_NAME):
+        return func(*args, **kwargs)
+    pool, slots = get_pool()
+    if not slots.acquire(blocking=False):
+        raise Throttled(detail='Слишком много входов, повторите позже.')
+    try:
+        return pool.submit(func, *args, **kwargs).result()
+    finally:
+        slots.release()
+
+
+class BoundedHasherMixin:
+    """Хеширование и проверка пароля в общем пуле потоков процесса.
+
+    Пул ограничивает только число одновременно хешируемых паролей, то
+    есть процессор и память под argon2. Поток запроса ждёт результата
+    и на это время занят; чтобы всплеск входов не занял все потоки
+    воркера, ожидающих не больше PASSWORD_HASHING_QUEUE, остальные
+    получают 429.
+    """
+
+    def encode(self, password, salt, *args, **kwargs):
+        return run_in_pool(super().encode, password, salt, *args, **kwargs)
+
+    def verify(self, password, encoded):
+        return run_in_pool(super().verify, password, encoded)
+
+
+class BoundedArgon2PasswordHasher(BoundedHasherMixin, Argon2PasswordHasher):
+    """Argon2 с параметрами из настроек ARGON2.
+
+    Имя алгоритма прежнее: старые хеши проверяются, а хеши с другими
+    параметрами пересчитываются при входе (must_update).
+    """
+
+    time_cost = settings.ARGON2['TIME_COST']
+    memory_cost = settings.ARGON2['MEMORY_COST']
+    parallelism = settings.ARGON2['PARALLELISM']
+
+
+class BoundedPBKDF2PasswordHasher(BoundedHasherMixin, PBKDF2PasswordHasher):
+    pass
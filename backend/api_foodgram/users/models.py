@@ -44,3 +44,22 @@ class CustomUser(AbstractUser):
         ordering = ("username",)
         verbose_name = "Пользователь"
         verbose_name_plural = "Пользователи"
+
+
+class RevokedToken(models.Model):
+    """Отозванный до истечения срока JWT (режим AUTH_MODE=jwt)."""
+
+    jti = models.CharField(
+        max_length=32,
+        unique=True,
+        verbose_name="Идентификатор токена",
+    )
+    expires = models.DateTimeField(
+        db_index=True,
+        verbose_name="Истекает",
+    )
+
+    class Meta:
+        ordering = ("-expires",)
+        verbose_name = "Отозванный токен"
+        verbose_name_plural = "Отозванные токены"
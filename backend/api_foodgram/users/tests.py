@@ -0,0 +1,46 @@
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from django.conf import settings
+from django.test import SimpleTestCase
+from rest_framework.exceptions import Throttled
+
+from .hashers import BoundedPBKDF2PasswordHasher, get_pool
+
+
+class FastPBKDF2PasswordHasher(BoundedPBKDF2PasswordHasher):
+    iterations = 1000
+
+
+class BoundedHasherTests(SimpleTestCase):
+    def test_concurrent_verify(self):
+        hasher = FastPBKDF2PasswordHasher()
+        encoded = hasher.encode('password', hasher.salt())
+        # Проверок больше, чем потоков пула, и каждая вызывает encode.
+        executor = ThreadPoolExecutor(
+            max_workers=settings.PASSWORD_HASHING_THREADS * 4
+        )
+        futures = [
+            executor.submit(hasher.verify, password, encoded)
+            for password in ['password', 'wrong'] * 8
+        ]
+        done, not_done = wait(futures, timeout=30)
+        executor.shutdown(wait=False)
+        self.assertFalse(not_done, 'Пул хеширования завис')
+        self.assertEqual(
+            [future.result() for future in futures], [True, False] * 8
+        )
+
+    def test_full_queue_throttled(self):
+        hasher = FastPBKDF2PasswordHasher()
+        encoded = hasher.encode('password', hasher.salt())
+        _, slots = get_pool()
+        held = 0
+        while slots.acquire(blocking=False):
+            held += 1
+        try:
+            with self.assertRaises(Throttled):
+                hasher.verify('password', encoded)
+        finally:
+            for _ in range(held):
+                slots.release()
+        self.assertTrue(hasher.verify('password', encoded))